@@ -0,0 +1,153 @@
+"""Persistent headless-Chromium pool shared by the browser fetch tier and vision screenshots.
+
+Playwright's sync API binds a browser to the thread that launched it, so each pool worker is a
+thread that owns one browser and renders one page at a time. Callers hand a job (a function of
+a Playwright page) to the pool and block on its result. Browsers are recycled after
+MAX_PAGES_PER_BROWSER pages and relaunched when they crash.
+"""
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+BROWSER_POOL_SIZE = 2        # browsers (and so pages) open at once
+MAX_PAGES_PER_BROWSER = 50   # recycle a browser after this many pages to cap memory growth
+
+
+def launch_chromium():
+    """Start Playwright and launch headless Chromium. Returns (browser, stop_callable)."""
+    from playwright.sync_api import sync_playwright
+    playwright = sync_playwright().start()
+    try:
+        browser = playwright.chromium.launch(headless=True)
+    except Exception:
+        playwright.stop()
+        raise
+    return browser, playwright.stop
+
+
+class BrowserPool:
+    """Fixed set of worker threads, each owning a long-lived browser.
+    run(job, **context_options) renders job(page) in a fresh context on a pooled browser."""
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages_per_browser=MAX_PAGES_PER_BROWSER, launcher=None):
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self._launcher = launcher or launch_chromium
+        self._jobs = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"launches": 0, "recycles": 0, "crashes": 0, "pages": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _start(self):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("browser pool is shut down")
+            while len(self._workers) < self.size:
+                worker = threading.Thread(target=self._work, name=f"browser-pool-{len(self._workers)}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def run(self, job, timeout=None, **context_options):
+        """Run job(page) on a pooled browser and return its result (re-raising its exception).
+        context_options are passed to browser.new_context (user_agent, extra_http_headers...)."""
+        self._start()
+        future = Future()
+        self._jobs.put((job, context_options, future))
+        return future.result(timeout)
+
+    def _work(self):
+        browser, stop, served = None, None, 0
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                break
+            job, options, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            for attempt in (1, 2):
+                if browser is not None and (served >= self.max_pages_per_browser or not browser.is_connected()):
+                    if served >= self.max_pages_per_browser:
+                        self._count("recycles")
+                    self._close(browser, stop)
+                    browser = None
+                if browser is None:
+                    try:
+                        browser, stop = self._launcher()
+                    except Exception as e:
+                        future.set_exception(e)
+                        break
+                    served = 0
+                    self._count("launches")
+                    logger.info("Launched pooled headless Chromium")
+                served += 1
+                try:
+                    result = self._render(browser, job, options)
+                except Exception as e:
+                    if attempt == 1 and not browser.is_connected():
+                        self._count("crashes")
+                        logger.warning(f"Pooled browser crashed ({e}); relaunching and retrying")
+                        continue
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+                break
+        self._close(browser, stop)
+
+    def _render(self, browser, job, options):
+        context = browser.new_context(**options)
+        try:
+            page = context.new_page()
+            self._count("pages")
+            return job(page)
+        finally:
+            try:
+                context.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _close(browser, stop):
+        if browser is None:
+            return
+        try:
+            browser.close()
+        except Exception:
+            pass
+        try:
+            stop()
+        except Exception:
+            pass
+
+    def shutdown(self, timeout=10):
+        """Stop the workers and close their browsers."""
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._jobs.put(None)
+        for worker in workers:
+            worker.join(timeout)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide BrowserPool, created on first use and shut down at exit."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+                atexit.register(_pool.shutdown)
+    return _pool
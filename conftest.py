@@ -1 +1,25 @@
 # Ensures the project root is on sys.path for tests
+import pytest
+
+import scrape
+from crawl_store import CrawlStore
+from jsdetect import JSVerdictCache
+from proxies import ProxyRotator
+from ratelimit import HostRateLimiter
+from singleflight import SingleFlight
+from storage_state import StorageStateStore
+from tier_affinity import TierAffinity
+
+
+@pytest.fixture(autouse=True)
+def isolated_fetch_state(tmp_path, monkeypatch):
+    """Give each test fresh per-host fetch state, kept out of the working tree."""
+    monkeypatch.setattr(scrape, "_tier_affinity", TierAffinity(str(tmp_path / "tier_affinity.db"), probe_rate=0))
+    monkeypatch.setattr(scrape, "_negative_cache", {})
+    monkeypatch.setattr(scrape, "_page_flights", SingleFlight())
+    monkeypatch.setattr(scrape, "_rate_limiter", HostRateLimiter(sleep=lambda seconds: None))
+    monkeypatch.setattr(scrape, "_proxy_rotator", ProxyRotator([]))
+    monkeypatch.setattr(scrape, "_js_verdicts", JSVerdictCache())
+    monkeypatch.setattr(scrape, "_browser_states", StorageStateStore(str(tmp_path / "browser_state")))
+    monkeypatch.setattr(scrape, "_crawl_store", CrawlStore(str(tmp_path / "crawl_jobs.db")))
+    monkeypatch.setattr(scrape, "_running_crawls", {})
@@ -0,0 +1,226 @@
+"""Persistent crawl jobs: a crawl's frontier, visited pages and documents kept in SQLite.
+
+A crawl started with a job ID journals every URL it queues, every page it visits (or skips)
+and every document it finds. Writes are buffered and committed in batches of FLUSH_EVERY
+pages, plus once when the crawl stops or raises. If the process dies, running the same job again
+reloads that state: visited pages are not fetched again, the frontier picks up in its
+original order, and documents found so far are kept. Pages visited after the last batch
+commit, and fetches that were in flight, are simply fetched again.
+
+Job status is "running" while a crawl is active (and after a crash), "paused" when it was
+stopped on purpose, and "done" when it finished. Running a done job starts it afresh.
+"""
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "crawl_jobs.db"
+FLUSH_EVERY = 25  # visited pages per batch commit
+
+RUNNING = "running"
+PAUSED = "paused"
+DONE = "done"
+
+QUEUED = "queued"
+VISITED = "visited"
+SKIPPED = "skipped"
+
+
+class CrawlStore:
+    """SQLite-backed crawl jobs. Each call opens its own connection."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawl_jobs (job_id TEXT PRIMARY KEY, kind TEXT, start_url TEXT, "
+            "status TEXT, created_at REAL, updated_at REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawl_frontier (job_id TEXT, url TEXT, depth INTEGER, seq INTEGER, "
+            "state TEXT, visit_seq INTEGER, PRIMARY KEY (job_id, url))"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawl_documents (job_id TEXT, url TEXT, seq INTEGER, "
+            "PRIMARY KEY (job_id, url))"
+        )
+        return conn
+
+    def job(self, job_id, kind, start_url):
+        """Open job_id, creating it (or restarting it if it finished) as needed."""
+        return CrawlJob(self, job_id, kind, start_url)
+
+    def status(self, job_id):
+        """The job's status, or None if there is no such job."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT status FROM crawl_jobs WHERE job_id = ?", (job_id,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read crawl job {job_id}: {str(e)}")
+            return None
+        return row[0] if row else None
+
+    def delete(self, job_id):
+        """Forget a job and everything it recorded."""
+        try:
+            conn = self._connect()
+            try:
+                for table in ("crawl_jobs", "crawl_frontier", "crawl_documents"):
+                    conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not delete crawl job {job_id}: {str(e)}")
+
+
+class CrawlJob:
+    """Journal for one crawl (the `journal` a crawler.Crawler writes to)."""
+
+    def __init__(self, store, job_id, kind, start_url):
+        self.store = store
+        self.job_id = job_id
+        self.kind = kind
+        self.start_url = start_url
+        self._lock = threading.Lock()
+        self._queued = []     # (url, depth, seq)
+        self._finished = []   # (state, visit_seq, url)
+        self._documents = []  # (url, seq)
+        self._seq = 0
+        self._visit_seq = 0
+        self._doc_seq = 0
+        self._since_flush = 0
+        self.url_count = 0    # URLs the job had queued before this run
+        self.frontier, self.pages, self.documents = self._open()
+        self._known_documents = set(self.documents)
+
+    def _open(self):
+        """Create or reload the job. Returns (frontier, pages, documents)."""
+        try:
+            conn = self.store._connect()
+            try:
+                row = conn.execute("SELECT status FROM crawl_jobs WHERE job_id = ?", (self.job_id,)).fetchone()
+                if row and row[0] == DONE:
+                    for table in ("crawl_frontier", "crawl_documents"):
+                        conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (self.job_id,))
+                    row = None
+                now = time.time()
+                conn.execute("INSERT OR REPLACE INTO crawl_jobs VALUES (?, ?, ?, ?, "
+                             "COALESCE((SELECT created_at FROM crawl_jobs WHERE job_id = ?), ?), ?)",
+                             (self.job_id, self.kind, self.start_url, RUNNING, self.job_id, now, now))
+                conn.commit()
+                if row is None:
+                    return [], [], []
+                count, max_seq, max_visit_seq = conn.execute(
+                    "SELECT COUNT(*), MAX(seq), MAX(visit_seq) FROM crawl_frontier WHERE job_id = ?",
+                    (self.job_id,)).fetchone()
+                frontier = conn.execute("SELECT url, depth FROM crawl_frontier WHERE job_id = ? AND state = ? "
+                                        "ORDER BY seq", (self.job_id, QUEUED)).fetchall()
+                pages = conn.execute("SELECT url FROM crawl_frontier WHERE job_id = ? AND state = ? "
+                                     "ORDER BY visit_seq", (self.job_id, VISITED)).fetchall()
+                documents = conn.execute("SELECT url, seq FROM crawl_documents WHERE job_id = ? ORDER BY seq",
+                                         (self.job_id,)).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not open crawl job {self.job_id}: {str(e)}")
+            return [], [], []
+        self.url_count = count
+        self._seq = (max_seq if max_seq is not None else -1) + 1
+        self._visit_seq = (max_visit_seq or 0) + 1
+        self._doc_seq = max((seq for _, seq in documents), default=-1) + 1
+        logger.info(f"Resuming crawl {self.job_id}: {len(pages)} pages visited, {len(frontier)} queued")
+        return [tuple(r) for r in frontier], [url for url, in pages], [url for url, _ in documents]
+
+    @property
+    def resumed(self):
+        """True if the job reloaded earlier progress."""
+        return self.url_count > 0
+
+    def seen_urls(self):
+        """Yield every URL the job had queued before this run, streamed from the database so a
+        large job's URLs never sit in memory at once (the crawler keeps only fingerprints)."""
+        if not self.resumed:
+            return
+        try:
+            conn = self.store._connect()
+            try:
+                for url, in conn.execute("SELECT url FROM crawl_frontier WHERE job_id = ?", (self.job_id,)):
+                    yield url
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read crawl job {self.job_id}: {str(e)}")
+
+    def queued(self, url, depth):
+        with self._lock:
+            self._queued.append((url, depth, self._seq))
+            self._seq += 1
+
+    def visited(self, url):
+        with self._lock:
+            self._finished.append((VISITED, self._visit_seq, url))
+            self._visit_seq += 1
+            self._since_flush += 1
+            flush = self._since_flush >= FLUSH_EVERY
+        if flush:
+            self.flush()
+
+    def skipped(self, url):
+        with self._lock:
+            self._finished.append((SKIPPED, None, url))
+
+    def add_documents(self, urls):
+        with self._lock:
+            for url in urls:
+                if url in self._known_documents:
+                    continue
+                self._known_documents.add(url)
+                self._documents.append((url, self._doc_seq))
+                self._doc_seq += 1
+
+    def flush(self):
+        """Commit buffered progress in one transaction."""
+        with self._lock:
+            queued, finished, documents = self._queued, self._finished, self._documents
+            self._queued, self._finished, self._documents = [], [], []
+            self._since_flush = 0
+        if not (queued or finished or documents):
+            return
+        try:
+            conn = self.store._connect()
+            try:
+                conn.executemany("INSERT OR IGNORE INTO crawl_frontier VALUES (?, ?, ?, ?, ?, NULL)",
+                                 [(self.job_id, url, depth, seq, QUEUED) for url, depth, seq in queued])
+                conn.executemany("UPDATE crawl_frontier SET state = ?, visit_seq = ? WHERE job_id = ? AND url = ?",
+                                 [(state, visit_seq, self.job_id, url) for state, visit_seq, url in finished])
+                conn.executemany("INSERT OR IGNORE INTO crawl_documents VALUES (?, ?, ?)",
+                                 [(self.job_id, url, seq) for url, seq in documents])
+                conn.execute("UPDATE crawl_jobs SET updated_at = ? WHERE job_id = ?", (time.time(), self.job_id))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not checkpoint crawl {self.job_id}: {str(e)}")
+
+    def finish(self, status=DONE):
+        """Flush and record the job's final status (DONE, or PAUSED when stopped early)."""
+        self.flush()
+        try:
+            conn = self.store._connect()
+            try:
+                conn.execute("UPDATE crawl_jobs SET status = ?, updated_at = ? WHERE job_id = ?",
+                             (status, time.time(), self.job_id))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not update crawl {self.job_id}: {str(e)}")
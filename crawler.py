@@ -0,0 +1,137 @@
+"""Frontier crawler: breadth-first crawling with N concurrent fetch workers.
+
+The frontier is a FIFO deque of (url, depth), so pages are dispatched in breadth-first order.
+Up to `concurrency` fetches run at once on a thread pool; everything else (the seen set, the
+frontier and the caller's expand() callback) stays on the calling thread, so callbacks need no
+locking. Per-host politeness is the fetcher's job: scrape's fetches already go through the
+shared per-host rate limiter, which holds a worker back rather than letting it hammer a host.
+
+Budgets are exact. A page is only dispatched while pages fetched + fetches in flight is under
+max_pages, so a crawl never fetches more pages than asked for; a fetch that fails or is
+disallowed frees its slot for the next URL. Links found on a page at max_depth are dropped.
+At concurrency 1 the crawl visits exactly the pages, in exactly the order, of a serial BFS.
+
+A `journal` (crawl_store.CrawlJob) makes the crawl resumable: the crawler starts from the
+journal's saved frontier and pages, streams its earlier URLs into the seen set, and reports
+every URL it queues, visits or skips. stop() pauses a crawl: nothing new is dispatched and in-flight fetches finish. If the
+crawl raises, the journal is flushed (but not finished), so the job can be resumed.
+"""
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from crawl_store import DONE, PAUSED
+from dedupe import SeenSet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 4
+
+
+class Crawler:
+    """Crawl from a start URL.
+
+    fetch(url) -> html; raising skips the page.
+    expand(url, depth, html) -> iterable of URLs to visit at depth + 1 (ignored at max_depth).
+    allow(url) -> bool, checked in the worker before fetching (e.g. robots.txt).
+    journal: optional CrawlJob to resume from and record progress to.
+    seen: the visited-URL set (default: an exact dedupe.SeenSet of URL fingerprints).
+    key(url) -> the identity a URL is deduplicated by (e.g. its canonical form).
+    """
+
+    def __init__(self, fetch, expand, max_depth=1, max_pages=20, concurrency=DEFAULT_CONCURRENCY,
+                 allow=None, journal=None, seen=None, key=None):
+        self.fetch = fetch
+        self.expand = expand
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        self.allow = allow
+        self.journal = journal
+        self.frontier = deque(journal.frontier if journal else ())
+        self.key = key or (lambda url: url)
+        self.seen = SeenSet() if seen is None else seen
+        for url in (journal.seen_urls() if journal else ()):
+            self.seen.add(self.key(url))
+        self.pages = list(journal.pages) if journal else []
+        self.stopped = False
+
+    def add(self, url, depth=0):
+        """Queue url unless it (or a URL with the same key) has been queued before. Returns True
+        if it was added."""
+        if not self.seen.add(self.key(url)):
+            return False
+        self.frontier.append((url, depth))
+        if self.journal is not None:
+            self.journal.queued(url, depth)
+        return True
+
+    def was_seen(self, url):
+        """Whether url, or a URL with the same key, has been queued."""
+        return self.key(url) in self.seen
+
+    def stats(self):
+        """Pages fetched, URLs still queued and the seen set's size and memory."""
+        return {"pages": len(self.pages), "queued": len(self.frontier), "seen": self.seen.stats()}
+
+    def stop(self):
+        """Stop dispatching new fetches; run() returns once in-flight ones finish."""
+        self.stopped = True
+
+    def _work(self, url):
+        """Runs on a worker: (allowed, html)."""
+        if self.allow is not None and not self.allow(url):
+            return False, None
+        return True, self.fetch(url)
+
+    def run(self, start_url=None):
+        """Crawl until the frontier is empty, max_pages pages were fetched or stop() is called.
+        Returns the fetched URLs in the order they completed (a resumed crawl's earlier pages
+        first). start_url is ignored when resuming."""
+        if start_url is not None and not self.seen:
+            self.add(start_url)
+        in_flight = {}  # future -> (url, depth), in dispatch order
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                while True:
+                    while (self.frontier and not self.stopped and len(in_flight) < self.concurrency
+                           and len(self.pages) + len(in_flight) < self.max_pages):
+                        url, depth = self.frontier.popleft()
+                        in_flight[pool.submit(self._work, url)] = (url, depth)
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in [f for f in in_flight if f in done]:
+                        url, depth = in_flight.pop(future)
+                        self._finish(future, url, depth)
+        except BaseException:
+            # Keep what was journaled so far; the job stays "running" and resumes from here
+            if self.journal is not None:
+                self.journal.flush()
+            raise
+        if self.journal is not None:
+            self.journal.finish(PAUSED if self.stopped else DONE)
+        return self.pages
+
+    def _finish(self, future, url, depth):
+        try:
+            allowed, html = future.result()
+        except Exception as e:
+            logger.warning(f"Failed to fetch {url}: {str(e)}")
+            self._skipped(url)
+            return
+        if not allowed:
+            logger.info(f"Skipping (robots.txt): {url}")
+            self._skipped(url)
+            return
+        self.pages.append(url)
+        children = self.expand(url, depth, html) or ()
+        if depth < self.max_depth:
+            for child in children:
+                self.add(child, depth + 1)
+        if self.journal is not None:
+            self.journal.visited(url)
+
+    def _skipped(self, url):
+        if self.journal is not None:
+            self.journal.skipped(url)
@@ -0,0 +1,162 @@
+"""Compact visited-URL sets for large crawls.
+
+A crawl's seen set used to hold every URL string it ever queued, which on faceted sites (one
+URL per filter combination) grows without bound. Here a URL is reduced to a 64-bit BLAKE2b
+fingerprint and kept in one of two structures:
+
+- FingerprintSet: an open-addressing hash table over a flat array of unsigned 64-bit ints.
+  About 8-16 bytes per URL instead of 100+, exact up to 64-bit collisions (~1 in 10^10 at a
+  million URLs), and it grows as needed.
+- BloomFilter: a fixed-size bit array sized for an expected count and false-positive rate.
+  Memory is bounded up front; a false positive makes the crawler skip a URL it never saw.
+
+SeenSet picks one of them and reports its size so crawl stats can show the memory per job.
+"""
+import hashlib
+import math
+from array import array
+
+DEFAULT_EXPECTED = 100_000   # URLs a Bloom-backed seen set is sized for
+INITIAL_SLOTS = 1024
+MAX_LOAD = 0.5               # grow the fingerprint table beyond this fill ratio
+
+
+def fingerprint(url):
+    """64-bit fingerprint of url (never 0, which marks an empty slot)."""
+    value = int.from_bytes(hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+    return value or 1
+
+
+class FingerprintSet:
+    """Set of URL fingerprints in an array('Q') hash table with linear probing."""
+
+    def __init__(self, slots=INITIAL_SLOTS):
+        size = 1
+        while size < slots:
+            size <<= 1
+        self._slots = array('Q', bytes(8 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _find(self, value):
+        """Index of value's slot, or of the empty slot where it would go."""
+        slots, mask = self._slots, self._mask
+        i = value & mask
+        while True:
+            current = slots[i]
+            if current == 0 or current == value:
+                return i
+            i = (i + 1) & mask
+
+    def __contains__(self, url):
+        value = fingerprint(url)
+        return self._slots[self._find(value)] == value
+
+    def add(self, url):
+        """Add url. Returns True if it was new."""
+        value = fingerprint(url)
+        i = self._find(value)
+        if self._slots[i] == value:
+            return False
+        self._slots[i] = value
+        self._count += 1
+        if self._count > MAX_LOAD * len(self._slots):
+            self._grow()
+        return True
+
+    def _grow(self):
+        old = self._slots
+        self._slots = array('Q', bytes(16 * len(old)))
+        self._mask = len(self._slots) - 1
+        for value in old:
+            if value:
+                self._slots[self._find(value)] = value
+
+    @property
+    def nbytes(self):
+        return len(self._slots) * self._slots.itemsize
+
+
+class BloomFilter:
+    """Bloom filter over URLs: no false negatives, false positives at about `error_rate`
+    while it holds at most `capacity` items."""
+
+    def __init__(self, capacity=DEFAULT_EXPECTED, error_rate=0.001):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def __len__(self):
+        """Number of distinct-looking items added (false positives are not counted)."""
+        return self._count
+
+    def _positions(self, url):
+        digest = hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, url):
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(url))
+
+    def add(self, url):
+        """Add url. Returns True if it was (as far as the filter can tell) new."""
+        new = False
+        bits = self._bits
+        for p in self._positions(url):
+            mask = 1 << (p & 7)
+            if not bits[p >> 3] & mask:
+                bits[p >> 3] |= mask
+                new = True
+        if new:
+            self._count += 1
+        return new
+
+    @property
+    def nbytes(self):
+        return len(self._bits)
+
+    def current_error_rate(self):
+        """Expected false-positive rate at the current fill."""
+        return (1 - math.exp(-self.num_hashes * self._count / self.num_bits)) ** self.num_hashes
+
+
+class SeenSet:
+    """Visited-URL set for a crawl: exact fingerprints by default, or a Bloom filter with a
+    fixed memory budget when `false_positive_rate` is given."""
+
+    def __init__(self, urls=(), false_positive_rate=None, expected=DEFAULT_EXPECTED):
+        if false_positive_rate:
+            self._set = BloomFilter(expected, false_positive_rate)
+        else:
+            self._set = FingerprintSet()
+        for url in urls:
+            self._set.add(url)
+
+    def __contains__(self, url):
+        return url in self._set
+
+    def __len__(self):
+        return len(self._set)
+
+    def add(self, url):
+        """Add url. Returns True if it was new."""
+        return self._set.add(url)
+
+    def stats(self):
+        """{'kind', 'items', 'bytes'} (plus 'error_rate' for a Bloom filter)."""
+        stats = {"kind": "bloom" if isinstance(self._set, BloomFilter) else "fingerprints",
+                 "items": len(self._set), "bytes": self._set.nbytes}
+        if isinstance(self._set, BloomFilter):
+            stats["error_rate"] = self._set.current_error_rate()
+        return stats
@@ -0,0 +1,182 @@
+"""HTML parser backends: html.parser by default, faster C backends on request.
+
+Three backends are supported:
+
+- "html.parser": BeautifulSoup on the pure-Python stdlib parser (always available, the default)
+- "lxml":        BeautifulSoup on the libxml2 tree builder
+- "selectolax":  the lexbor engine via selectolax (C, HTML5 tree building)
+
+parse_document() returns a Document with the few operations the scraper needs: the title,
+a document-order walk over elements (tag name, attributes, stripped text) and the visible
+text. Both wrappers follow BeautifulSoup's conventions (text excludes <script>/<style> and
+comments, a valueless attribute reads as "", an empty <title> has a None title), so on
+well-formed pages every backend extracts the same results.
+
+Malformed markup is another matter: lxml and lexbor repair the tree the way browsers do, so
+an unclosed <p> or <li> ends at the next block, a <p> inside a heading is moved out of it (by
+lxml, not by lexbor), and a fragment without <body> gets one, while html.parser keeps the
+markup as written. Extraction results would then depend on which packages happen to be
+installed, so the C backends are opt-in: pass a backend name (or set scrape.HTML_PARSER) to
+use one. make_soup() is for callers that need a real BeautifulSoup tree; selectolax is not a
+BeautifulSoup tree builder, so asking for it there gives lxml.
+"""
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401  (BeautifulSoup loads it by name)
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+INVISIBLE_TAGS = ("script", "style")
+
+
+def available_backends():
+    """Installed backends, fastest first. "html.parser" is always last."""
+    installed = {"selectolax": SELECTOLAX_AVAILABLE, "lxml": LXML_AVAILABLE, "html.parser": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def resolve_backend(backend=None):
+    """`backend` if it is installed, else "html.parser". None means "html.parser"."""
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend!r} (expected one of {BACKENDS})")
+    if backend in available_backends():
+        return backend
+    return "html.parser"
+
+
+def soup_features(backend=None):
+    """The BeautifulSoup tree builder for `backend`: lxml for an installed C backend, else html.parser."""
+    backend = resolve_backend(backend)
+    if backend == "html.parser" or not LXML_AVAILABLE:
+        return "html.parser"
+    return "lxml"
+
+
+def make_soup(html, backend=None):
+    """A BeautifulSoup tree built with `backend`'s tree builder (default: html.parser)."""
+    return BeautifulSoup(html or "", soup_features(backend))
+
+
+def _lines(strings):
+    return "\n".join(line.strip() for s in strings for line in s.splitlines() if line.strip())
+
+
+class SoupElement:
+    __slots__ = ("_tag",)
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def name(self):
+        return self._tag.name
+
+    def get(self, attr, default=None):
+        return self._tag.get(attr, default)
+
+    def text(self):
+        """Text of the element with each string stripped and joined without separators."""
+        return self._tag.get_text(strip=True)
+
+
+class SoupDocument:
+    """Document over a BeautifulSoup tree (lxml or html.parser)."""
+
+    def __init__(self, html, features):
+        self.backend = "lxml" if features == "lxml" else "html.parser"
+        self._soup = BeautifulSoup(html or "", features)
+
+    @property
+    def title(self):
+        """Text of the first <title>: '' when there is none, None when it is empty."""
+        title = self._soup.title
+        return title.string if title else ''
+
+    def elements(self):
+        """Every element in document order."""
+        return (SoupElement(tag) for tag in self._soup.find_all(True))
+
+    def text(self, body_only=True):
+        """Visible text, one stripped line per text line. body_only=False includes <head>."""
+        root = self._soup.body if body_only else self._soup
+        if root is None:
+            return ""
+        return _lines(s for s in root.strings if s.parent.name not in INVISIBLE_TAGS)
+
+
+class LexborElement:
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    def name(self):
+        return self._node.tag
+
+    def get(self, attr, default=None):
+        attributes = self._node.attributes
+        if attr not in attributes:
+            return default
+        value = attributes[attr]
+        return '' if value is None else value
+
+    def text(self):
+        """Text of the element with each string stripped and joined without separators."""
+        return "".join(s.strip() for s in _lexbor_strings(self._node) if s.strip())
+
+
+def _lexbor_strings(node):
+    """Text node contents under node, skipping script/style bodies and comments."""
+    for child in node.traverse(include_text=True):
+        if child.tag == '-text' and child.parent is not None and child.parent.tag not in INVISIBLE_TAGS:
+            yield child.text_content
+
+
+class LexborDocument:
+    """Document over a selectolax/lexbor tree."""
+    backend = "selectolax"
+
+    def __init__(self, html):
+        self._html = html or ""
+        self._tree = LexborHTMLParser(self._html)
+
+    @property
+    def title(self):
+        """Text of the first <title>: '' when there is none, None when it is empty."""
+        title = self._tree.css_first('title')
+        if title is None:
+            return ''
+        return title.text() or None
+
+    def elements(self):
+        """Every element in document order."""
+        root = self._tree.root
+        if root is None or not self._html:
+            return iter(())
+        return (LexborElement(node) for node in root.traverse(include_text=False)
+                if not node.tag.startswith('-'))
+
+    def text(self, body_only=True):
+        """Visible text, one stripped line per text line. body_only=False includes <head>."""
+        root = self._tree.body if body_only else self._tree.root
+        if root is None or not self._html:
+            return ""
+        return _lines(_lexbor_strings(root))
+
+
+def parse_document(html, backend=None):
+    """Parse html with `backend` (default: html.parser) into a Document."""
+    backend = resolve_backend(backend)
+    if backend == "selectolax":
+        return LexborDocument(html)
+    return SoupDocument(html, soup_features(backend))
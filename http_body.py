@@ -0,0 +1,104 @@
+"""Bounded response bodies: stream a body with a size cap and decode it once, cheaply.
+
+read_body() refuses a body whose Content-Length is over the cap and otherwise streams it in
+chunks, aborting (and closing the connection) as soon as the cap is crossed, so a runaway
+endpoint can't exhaust memory. decode_body() picks the charset from the Content-Type header,
+a BOM or an early <meta charset>, then falls back to UTF-8 and Windows-1252, never to
+statistical detection, and decodes the bytes exactly once.
+"""
+import codecs
+import re
+
+MAX_BODY_BYTES = 10 * 1024 * 1024   # pages larger than this are refused
+CHUNK_SIZE = 64 * 1024
+META_SCAN_BYTES = 4096              # <meta charset> must appear this early (HTML spec: 1024)
+
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+class BodyTooLarge(Exception):
+    """Raised by read_body when a response body exceeds the size cap."""
+    def __init__(self, size, limit):
+        super().__init__(f"response body {'over' if size is None else size} bytes exceeds {limit}-byte cap")
+        self.size = size
+        self.limit = limit
+
+
+def read_body(response, max_bytes=MAX_BODY_BYTES):
+    """Return the body as bytes, streaming with a cap. Works with requests and curl_cffi
+    responses made with stream=True; responses without iter_content are read as-is."""
+    length = response.headers.get('Content-Length')
+    if length and length.isdigit() and int(length) > max_bytes:
+        close_response(response)
+        raise BodyTooLarge(int(length), max_bytes)
+    if not hasattr(response, 'iter_content'):
+        content = getattr(response, 'content', None)
+        if not isinstance(content, bytes):
+            content = (response.text or '').encode('utf-8')
+        if len(content) > max_bytes:
+            raise BodyTooLarge(len(content), max_bytes)
+        return content
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        if not chunk:
+            continue
+        size += len(chunk)
+        if size > max_bytes:
+            close_response(response)
+            raise BodyTooLarge(None, max_bytes)
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def close_response(response):
+    """Release a streamed response's connection without reading the rest of its body."""
+    try:
+        response.close()
+    except Exception:
+        pass
+
+
+def _known(encoding):
+    try:
+        return codecs.lookup(encoding).name
+    except (LookupError, TypeError):
+        return None
+
+
+def detect_charset(data, content_type=''):
+    """Charset for a body: Content-Type header, then BOM, then <meta charset>; None if unstated."""
+    match = _HEADER_CHARSET_RE.search(content_type or '')
+    if match and _known(match.group(1)):
+        return match.group(1)
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+    match = _META_CHARSET_RE.search(data[:META_SCAN_BYTES])
+    if match:
+        encoding = match.group(1).decode('ascii', 'ignore')
+        if _known(encoding):
+            return encoding
+    return None
+
+
+def decode_body(data, content_type=''):
+    """Decode body bytes once: the declared/sniffed charset, else UTF-8, else Windows-1252."""
+    encoding = detect_charset(data, content_type)
+    if encoding:
+        return data.decode(encoding, errors='replace')
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('cp1252', errors='replace')
+
+
+def response_text(response, max_bytes=MAX_BODY_BYTES):
+    """read_body + decode_body. Raises BodyTooLarge over the cap."""
+    return decode_body(read_body(response, max_bytes), response.headers.get('Content-Type', ''))
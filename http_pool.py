@@ -0,0 +1,175 @@
+"""Shared HTTP sessions: keep-alive connection pools reused by every fetch tier and download.
+
+requests: one process-wide Session whose urllib3 PoolManager keeps a connection pool per host,
+so repeat requests to a host skip the TCP+TLS handshake. urllib3 pools are thread-safe. The
+session shares connections only, not state: its cookie jar stores nothing, so one caller's
+server-set cookies are never sent on another's fetch. Cookies a caller passes explicitly (and
+those set during one request's redirects) still apply to that request.
+curl_cffi: sessions wrap a single curl handle and are not thread-safe, so they are checked out
+of a pool kept per (proxy, domain) and returned after each request. Sessions in one pool share
+a cookie jar, so challenge clearance earned through a proxy is reused on that site's next
+request along with the warm connection.
+"""
+import logging
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10  # keep-alive connections per host
+MAX_HOST_POOLS = 100    # host pools kept before the least recently used one is dropped
+MAX_IDLE_IMPERSONATE = 4       # idle curl_cffi sessions kept per (proxy, domain)
+MAX_IMPERSONATE_POOLS = 64     # (proxy, domain) pools kept before the least recently used is closed
+
+_lock = threading.Lock()
+_session = None
+_pool_size = DEFAULT_POOL_SIZE
+_cffi_lock = threading.Lock()
+_cffi_pools = OrderedDict()  # (proxy, domain) -> _ImpersonatePool, least recently used first
+
+
+class _ImpersonatePool:
+    __slots__ = ("idle", "cookies")
+
+    def __init__(self):
+        self.idle = deque()
+        self.cookies = {}   # name -> value, shared by every session for this (proxy, domain)
+
+
+class _NoStoreCookiePolicy(DefaultCookiePolicy):
+    """Cookie policy for the shared session: never store a response's cookies."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def _mount_adapter(session, pool_size):
+    adapter = HTTPAdapter(pool_connections=MAX_HOST_POOLS, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def get_session():
+    """Return the shared requests.Session (created on first use)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = requests.Session()
+                session.cookies.set_policy(_NoStoreCookiePolicy())
+                _mount_adapter(session, _pool_size)
+                _session = session
+    return _session
+
+
+def pool_size():
+    """Current max keep-alive connections per host."""
+    return _pool_size
+
+
+def ensure_pool_size(size):
+    """Grow per-host pools to hold at least `size` connections, e.g. a downloader's max_workers,
+    so concurrent workers don't open and discard connections. Never shrinks."""
+    global _pool_size
+    with _lock:
+        if size <= _pool_size:
+            return
+        _pool_size = size
+        if _session is not None:
+            _mount_adapter(_session, size)
+    logger.info(f"HTTP pool resized to {size} connections per host")
+
+
+def _new_impersonate_session(proxy):
+    try:
+        from curl_cffi import requests as cffi_requests
+    except ImportError:
+        return None
+    proxies = {"http": proxy, "https": proxy} if proxy else None
+    return cffi_requests.Session(impersonate="chrome", proxies=proxies)
+
+
+def _close_quietly(session):
+    try:
+        session.close()
+    except Exception:
+        pass
+
+
+@contextmanager
+def impersonate_session(proxy=None, domain=None):
+    """Check out a curl_cffi Session (Chrome TLS fingerprint) for `proxy` and `domain`, or
+    yield None if curl_cffi is not installed. The session goes back to its pool afterwards,
+    with its cookies merged into the pool's shared jar."""
+    key = (proxy, domain)
+    with _cffi_lock:
+        pool = _cffi_pools.get(key)
+        session = pool.idle.pop() if pool is not None and pool.idle else None
+        cookies = dict(pool.cookies) if pool is not None else {}
+    if session is None:
+        session = _new_impersonate_session(proxy)
+        if session is None:
+            yield None
+            return
+    jar = getattr(session, "cookies", None)
+    if jar is not None and cookies:
+        jar.update(cookies)
+    try:
+        yield session
+    finally:
+        _checkin(key, session)
+
+
+def _checkin(key, session):
+    jar = getattr(session, "cookies", None)
+    cookies = dict(jar.items()) if jar is not None else {}
+    evicted = []
+    with _cffi_lock:
+        pool = _cffi_pools.get(key)
+        if pool is None:
+            pool = _cffi_pools[key] = _ImpersonatePool()
+        _cffi_pools.move_to_end(key)
+        pool.cookies.update(cookies)
+        if len(pool.idle) < MAX_IDLE_IMPERSONATE:
+            pool.idle.append(session)
+        else:
+            evicted.append(session)
+        while len(_cffi_pools) > MAX_IMPERSONATE_POOLS:
+            _, old = _cffi_pools.popitem(last=False)
+            evicted.extend(old.idle)
+    for old_session in evicted:
+        _close_quietly(old_session)
+
+
+def discard_impersonate_sessions(proxy=None, domain=None):
+    """Drop the pooled sessions and cookies for (proxy, domain), e.g. after a ban."""
+    with _cffi_lock:
+        pool = _cffi_pools.pop((proxy, domain), None)
+    for session in (pool.idle if pool is not None else ()):
+        _close_quietly(session)
+
+
+def impersonate_pool_stats():
+    """{(proxy, domain): idle session count} for the pooled curl_cffi sessions."""
+    with _cffi_lock:
+        return {key: len(pool.idle) for key, pool in _cffi_pools.items()}
+
+
+def close_sessions():
+    """Close the shared session and every pooled curl_cffi session."""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+    with _cffi_lock:
+        pools = list(_cffi_pools.values())
+        _cffi_pools.clear()
+    for pool in pools:
+        for session in pool.idle:
+            _close_quietly(session)
@@ -0,0 +1,143 @@
+"""JS-dependence detection: decide from plain-HTTP HTML whether a page needs a real browser.
+
+classify_html() is a few regex passes, no DOM parse. It flags bot-challenge interstitials,
+near-empty bodies that ship scripts, empty SPA roots (React/Vue/Angular/Next/Nuxt shells)
+and "please enable JavaScript" <noscript> walls; anything else is usable as fetched.
+
+JSVerdictCache remembers the outcome per (domain, path pattern) so pages shaped like one
+already classified skip the heuristics: a static section is accepted as-is, a JS section goes
+straight to the browser. Verdicts are confirmed by the render itself (see confirm_verdict).
+"""
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+STATIC = "static"
+NEEDS_JS = "needs_js"
+CHALLENGE = "challenge"
+
+# Lowercased fingerprints of bot-challenge interstitials (Cloudflare, Imperva, PerimeterX, DataDome)
+CHALLENGE_MARKERS = (
+    '<title>just a moment...</title>',
+    '<title>attention required! | cloudflare</title>',
+    'cf_chl_opt',
+    'cf-chl-',
+    '_incapsula_resource',
+    'px-captcha',
+    'captcha-delivery.com',
+)
+SPA_ROOT_MARKERS = (
+    'id="root"', "id='root'",
+    'id="app"', "id='app'",
+    'id="__next"',
+    'id="__nuxt"',
+    'ng-app', 'ng-version', '<app-root',
+    'data-reactroot',
+    'window.__nuxt__',
+)
+NOSCRIPT_WALL_PHRASES = (
+    'enable javascript',
+    'javascript is disabled',
+    'javascript is required',
+    'requires javascript',
+    'turn on javascript',
+    'javascript to run this app',
+)
+MIN_TEXT_CHARS = 200      # less visible text than this, with scripts present, is an empty shell
+SPA_TEXT_CHARS = 500      # an SPA root with less text than this was not server-rendered
+WALL_TEXT_CHARS = 1000    # a noscript wall on a page with less text than this hides the content
+SCAN_CHARS = 300000       # only the head of very large documents is inspected
+RENDER_GAIN = 2.0         # rendered text must be this many times larger to confirm NEEDS_JS
+VERDICT_TTL = 6 * 3600
+
+_INVISIBLE_RE = re.compile(r'<(script|style|noscript|template|svg)\b.*?</\1\s*>', re.I | re.S)
+_NOSCRIPT_RE = re.compile(r'<noscript\b[^>]*>(.*?)</noscript\s*>', re.I | re.S)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+_SCRIPT_RE = re.compile(r'<script\b', re.I)
+_ID_SEGMENT_RE = re.compile(r'^(?=.*\d)[0-9a-f-]{8,}$', re.I)
+
+
+def visible_text_length(html):
+    """Approximate length of the text a reader would see, ignoring scripts, styles and markup."""
+    text = _INVISIBLE_RE.sub(' ', _COMMENT_RE.sub(' ', html[:SCAN_CHARS]))
+    text = _TAG_RE.sub(' ', text)
+    return len(_SPACE_RE.sub(' ', text).strip())
+
+
+def classify_html(html):
+    """Return (verdict, reason): CHALLENGE, NEEDS_JS or STATIC."""
+    head = (html or "")[:SCAN_CHARS]
+    lower = head.lower()
+    if any(marker in lower[:20000] for marker in CHALLENGE_MARKERS):
+        return CHALLENGE, "challenge page"
+    text_chars = visible_text_length(head)
+    has_scripts = _SCRIPT_RE.search(head) is not None
+    if has_scripts and text_chars < MIN_TEXT_CHARS:
+        return NEEDS_JS, f"near-empty body ({text_chars} chars of text)"
+    if text_chars < SPA_TEXT_CHARS and any(marker in lower for marker in SPA_ROOT_MARKERS):
+        return NEEDS_JS, "empty SPA root"
+    if text_chars < WALL_TEXT_CHARS:
+        for noscript in _NOSCRIPT_RE.findall(head):
+            if any(phrase in noscript.lower() for phrase in NOSCRIPT_WALL_PHRASES):
+                return NEEDS_JS, "noscript wall"
+    return STATIC, f"{text_chars} chars of text"
+
+
+def confirm_verdict(static_html, rendered_html):
+    """After rendering a page the heuristics flagged: NEEDS_JS if rendering revealed much more
+    text, else STATIC (the plain HTML was already the whole page)."""
+    before = visible_text_length(static_html or "")
+    after = visible_text_length(rendered_html or "")
+    return NEEDS_JS if after >= max(before * RENDER_GAIN, before + MIN_TEXT_CHARS) else STATIC
+
+
+def path_pattern(url):
+    """Group URLs whose pages likely share a template: the first path segment is kept, numeric
+    and hex/UUID-like segments become placeholders, and deeper segments become '*'.
+    /products/123 -> /products/{n}; /blog/some-post -> /blog/*; / -> /"""
+    segments = [s for s in urlparse(url).path.split('/') if s]
+    pattern = []
+    for i, segment in enumerate(segments):
+        if segment.isdigit():
+            pattern.append('{n}')
+        elif _ID_SEGMENT_RE.match(segment):
+            pattern.append('{id}')
+        elif i == 0:
+            pattern.append(segment.lower())
+        else:
+            pattern.append('*')
+    return '/' + '/'.join(pattern)
+
+
+class JSVerdictCache:
+    """In-memory verdicts per (domain, path pattern), expiring after `ttl` seconds."""
+
+    def __init__(self, ttl=VERDICT_TTL, clock=time.time):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._verdicts = {}  # (domain, pattern) -> (verdict, expires_at)
+
+    @staticmethod
+    def key(url):
+        return urlparse(url).netloc.lower(), path_pattern(url)
+
+    def get(self, url):
+        """Cached STATIC / NEEDS_JS verdict for url's pattern, or None."""
+        key = self.key(url)
+        with self._lock:
+            entry = self._verdicts.get(key)
+            if entry is None:
+                return None
+            verdict, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._verdicts[key]
+                return None
+            return verdict
+
+    def put(self, url, verdict):
+        with self._lock:
+            self._verdicts[self.key(url)] = (verdict, self._clock() + self.ttl)
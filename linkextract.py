@@ -0,0 +1,103 @@
+"""Streaming link extraction: every href in a page, without building a DOM tree.
+
+LinkExtractor is an html.parser.HTMLParser that only listens for start tags carrying an href
+(<a>, <area>, <link>, ...). Text is ignored and no tree is kept, so memory stays at the
+parser's small look-ahead buffer however large the page is. iter_links() feeds a page (or an
+iterable of decoded chunks, e.g. a streamed body) through it in CHUNK_CHARS slices and yields
+each link as soon as its tag has been read.
+
+Links come out in document order with the same hrefs ParsedPage.hrefs reports: resolved
+against the page URL, empty hrefs dropped, fragments kept.
+
+With collect_text=True the same pass also gathers the page's visible body text (no <head>,
+<script> or <style>), normalized like clean_body_content, for content fingerprinting. That
+text is kept in memory, so only ask for it when it is needed.
+"""
+from collections import deque, namedtuple
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+CHUNK_CHARS = 64 * 1024
+
+Link = namedtuple("Link", "url tag download")
+
+
+class LinkExtractor(HTMLParser):
+    """Collects Links from fed HTML. `resolve(base_url, href)` makes hrefs absolute (None
+    drops one); `classify(url)` sets Link.download; `collect_text` also gathers body text."""
+
+    def __init__(self, base_url, resolve=None, classify=None, collect_text=False):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self._resolve = resolve or urljoin
+        self._classify = classify
+        self._pending = deque()
+        self._collect_text = collect_text
+        self._text = []
+        self._hidden = None    # the <script>/<style> whose contents are being skipped
+        self._in_head = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._collect_text:
+            if tag in ('script', 'style'):
+                self._hidden = tag
+            elif tag == 'head':
+                self._in_head = True
+            elif tag == 'body':
+                self._in_head = False
+        self.handle_startendtag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == self._hidden:
+            self._hidden = None
+        elif tag == 'head':
+            self._in_head = False
+
+    def handle_data(self, data):
+        if self._collect_text and self._hidden is None and not self._in_head:
+            self._text.append(data)
+
+    def handle_startendtag(self, tag, attrs):
+        href = None
+        for name, value in attrs:
+            if name == "href":
+                href = value  # like BeautifulSoup, the last duplicate wins
+        if not href:
+            return
+        url = self._resolve(self.base_url, href)
+        if url:
+            download = bool(self._classify(url)) if self._classify else False
+            self._pending.append(Link(url, tag, download))
+
+    def drain(self):
+        """Yield and forget the links found since the last drain."""
+        while self._pending:
+            yield self._pending.popleft()
+
+    def links(self, source):
+        """Feed `source` (HTML or an iterable of chunks) and yield its Links as they are read."""
+        for chunk in _chunks(source or ""):
+            if chunk:
+                self.feed(chunk)
+                yield from self.drain()
+        self.close()
+        yield from self.drain()
+
+    @property
+    def text(self):
+        """Visible body text read so far, one stripped line per text line (collect_text only)."""
+        return "\n".join(line.strip() for data in self._text for line in data.splitlines() if line.strip())
+
+
+def _chunks(source):
+    if isinstance(source, str):
+        for start in range(0, len(source), CHUNK_CHARS):
+            yield source[start:start + CHUNK_CHARS]
+    else:
+        yield from source
+
+
+def iter_links(source, base_url, resolve=None, classify=None):
+    """Yield Link(url, tag, download) for every href in `source`, a page's HTML or an
+    iterable of HTML chunks, as the parser reaches it."""
+    return LinkExtractor(base_url, resolve, classify).links(source)
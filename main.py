@@ -1,5 +1,5 @@
 import streamlit as st
-from scrape import scrape_website, download_pdf, scrape_website_content, scrape_for_pdf, crawl_website, smart_crawl, download_pdfs_concurrent, fetch_sitemap_urls, is_download_link
+from scrape import scrape_website, download_pdf, scrape_website_content, scrape_for_pdf, crawl_website, smart_crawl, download_pdfs_concurrent, fetch_sitemap_urls, is_download_link, crawl_job_id
 from parse import (
     sync_parse_with_deepseek as parse_with_ollama,
     get_ollama_status,
@@ -565,13 +565,19 @@ def scraping_section():
                         pdf_links = [u for u in sitemap_urls if is_download_link(u)]
                         st.info(f"Sitemap listed {len(sitemap_urls)} URLs")
                     elif crawl_depth > 0:
+                        # Same settings -> same job, so a rerun mid-crawl resumes instead of restarting
                         if crawl_goal.strip():
+                            job_id = crawl_job_id('smart', url, depth=crawl_depth, goal=crawl_goal.strip())
                             crawl_result = smart_crawl(url, crawl_goal, max_depth=crawl_depth,
-                                                       model=st.session_state.get('ollama_model'))
+                                                       model=st.session_state.get('ollama_model'), job_id=job_id)
                         else:
-                            crawl_result = crawl_website(url, max_depth=crawl_depth)
+                            job_id = crawl_job_id('crawl', url, depth=crawl_depth)
+                            crawl_result = crawl_website(url, max_depth=crawl_depth, job_id=job_id)
                         pdf_links = crawl_result['pdf_links']
-                        st.info(f"Crawled {len(crawl_result['pages'])} pages")
+                        seen = crawl_result['stats']['seen']
+                        st.info(f"Crawled {len(crawl_result['pages'])} pages "
+                                f"(seen set: {seen['items']} URLs, {seen['bytes'] // 1024} KB; "
+                                f"{crawl_result['stats']['near_duplicates']} near-duplicates not expanded)")
                     else:
                         pdf_links = scrape_website(url)
                     st.session_state.pdf_links = pdf_links
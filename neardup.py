@@ -0,0 +1,108 @@
+"""Near-duplicate page detection with SimHash.
+
+simhash() turns a page's normalized text into a 64-bit fingerprint: every 3-word shingle is
+hashed, and each fingerprint bit is the sign of that bit's count over all shingles. Pages
+that share most of their text (print views, archive pages that differ by a date line,
+session-parameter variants) end up a few bits apart, unrelated pages about 32 apart.
+
+SimHashIndex answers "have I seen a page within max_distance bits of this one?" without
+comparing against every page: the fingerprint is cut into max_distance + 1 bands, and by
+the pigeonhole principle two fingerprints within max_distance bits agree exactly on at least
+one band. Each band is a dict lookup, so a query only checks the few pages sharing a band.
+"""
+import hashlib
+import re
+from collections import Counter
+
+BITS = 64
+MAX_DISTANCE = 3          # fingerprints this many bits apart (or fewer) are near-duplicates
+SHINGLE_WORDS = 3
+MIN_WORDS = 50            # shorter texts are too small to fingerprint reliably
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+
+
+def words(text):
+    """Lowercased word tokens of text."""
+    return _WORD_RE.findall((text or "").lower())
+
+
+def simhash(text, min_words=MIN_WORDS):
+    """64-bit SimHash of text's word shingles, or None if it has fewer than min_words words."""
+    tokens = words(text)
+    if len(tokens) < max(1, min_words):
+        return None
+    size = min(SHINGLE_WORDS, len(tokens))
+    values = [_hash(" ".join(tokens[i:i + size])) for i in range(len(tokens) - size + 1)]
+    # Tally one byte of every shingle hash at a time, then spread each byte value's count
+    # over its 8 bits: 8 Counter passes instead of 64 Python steps per shingle
+    counts = [0] * BITS
+    for shift in range(0, BITS, 8):
+        for byte, n in Counter(value >> shift & 0xFF for value in values).items():
+            for bit in range(8):
+                counts[shift + bit] += n if byte >> bit & 1 else -n
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a, b):
+    """Number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """Banded index of page fingerprints for near-duplicate lookups."""
+
+    def __init__(self, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = BITS // bands
+        # (shift, mask) per band; the last band takes any leftover bits
+        self._bands = [(i * width, (1 << (width if i < bands - 1 else BITS - i * width)) - 1)
+                       for i in range(bands)]
+        self._tables = [{} for _ in self._bands]
+        self._keys = []
+        self._fingerprints = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def find(self, fingerprint):
+        """(key, distance) of the closest indexed page within max_distance bits, or None."""
+        best = None
+        checked = set()
+        for (shift, mask), table in zip(self._bands, self._tables):
+            for i in table.get(fingerprint >> shift & mask, ()):
+                if i in checked:
+                    continue
+                checked.add(i)
+                distance = hamming(fingerprint, self._fingerprints[i])
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (self._keys[i], distance)
+        return best
+
+    def add(self, key, fingerprint):
+        i = len(self._keys)
+        self._keys.append(key)
+        self._fingerprints.append(fingerprint)
+        for (shift, mask), table in zip(self._bands, self._tables):
+            table.setdefault(fingerprint >> shift & mask, []).append(i)
+
+    def check(self, key, text):
+        """Index key's page text and return the key of an earlier near-duplicate, if any.
+        Texts too short to fingerprint are never duplicates."""
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return None
+        match = self.find(fingerprint)
+        if match is not None:
+            return match[0]
+        self.add(key, fingerprint)
+        return None
@@ -2,7 +2,7 @@
 import logging
 import os
 
-import requests
+from http_pool import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +32,7 @@ def notify_webhook(webhook_url, message, timeout=10):
     if not webhook_url:
         return False
     try:
-        response = requests.post(webhook_url, json={"text": message, "content": message}, timeout=timeout)
+        response = get_session().post(webhook_url, json={"text": message, "content": message}, timeout=timeout)
         response.raise_for_status()
         return True
     except Exception as e:
@@ -0,0 +1,267 @@
+"""Page cache: compressed, size-bounded disk store with an in-memory LRU in front.
+
+Layout: <root>/<h[:2]>/<h[2:4]>/<h>.cache where h = md5(url). Each file is one JSON metadata
+line followed by the compressed HTML, written atomically (temp file + os.replace). File mtime
+is the freshness clock, so a revalidated entry is simply rewritten. When the disk tier grows
+past max_bytes the least recently used entries are deleted. The memory tier is checked against
+the file's mtime, so it never serves a page another process has replaced or expired.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Prefer zstd when installed; zlib is always available
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+DEFAULT_TTL = 3600                     # seconds
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # disk budget
+MEMORY_ITEMS = 128                     # pages kept in the in-process LRU
+MEMORY_MAX_BYTES = 32 * 1024 * 1024
+ENTRY_SUFFIX = ".cache"
+
+
+def compress(data):
+    """Compress bytes. Returns (codec, payload)."""
+    if ZSTD_AVAILABLE:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def decompress(codec, payload):
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    return payload
+
+
+class PageCache:
+    """URL -> (HTML, metadata) store with TTL, byte budget, LRU eviction and a memory tier."""
+
+    def __init__(self, root, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES,
+                 memory_items=MEMORY_ITEMS, memory_max_bytes=MEMORY_MAX_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory_max_bytes = memory_max_bytes
+        self._lock = threading.RLock()
+        self._index = None              # path -> size on disk, least recently used first
+        self._disk_bytes = 0
+        self._memory = OrderedDict()    # path -> (mtime_ns, html, meta)
+        self._memory_bytes = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def path(self, url):
+        digest = hashlib.md5(url.encode()).hexdigest()
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + ENTRY_SUFFIX)
+
+    # --- disk index ---------------------------------------------------------------------
+
+    def _load_index(self):
+        """Scan the cache directory once, oldest first. Caller holds the lock."""
+        if self._index is not None:
+            return
+        entries = []
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for name in filenames:
+                    full = os.path.join(dirpath, name)
+                    if name.endswith(ENTRY_SUFFIX):
+                        try:
+                            st = os.stat(full)
+                        except OSError:
+                            continue
+                        entries.append((st.st_mtime, full, st.st_size))
+                    elif dirpath == self.root and name.endswith((".html", ".json")):
+                        _remove(full)  # flat files from the old uncompressed cache layout
+        entries.sort()
+        self._index = OrderedDict((full, size) for _, full, size in entries)
+        self._disk_bytes = sum(self._index.values())
+
+    def _touch_index(self, path, size=None):
+        self._load_index()
+        if size is not None:
+            self._disk_bytes += size - self._index.get(path, 0)
+            self._index[path] = size
+        if path in self._index:
+            self._index.move_to_end(path)
+
+    def _forget(self, path):
+        self._load_index()
+        self._disk_bytes -= self._index.pop(path, 0)
+        self._drop_memory(path)
+
+    def _evict(self, keep):
+        while self._disk_bytes > self.max_bytes and len(self._index) > 1:
+            oldest = next(iter(self._index))
+            if oldest == keep:
+                self._index.move_to_end(oldest)
+                continue
+            self._forget(oldest)
+            _remove(oldest)
+            self.counters["evictions"] += 1
+
+    # --- memory tier --------------------------------------------------------------------
+
+    def _remember(self, path, mtime_ns, html, meta):
+        self._drop_memory(path)
+        size = len(html)
+        if size > self.memory_max_bytes:
+            return
+        self._memory[path] = (mtime_ns, html, meta)
+        self._memory_bytes += size
+        while len(self._memory) > self.memory_items or self._memory_bytes > self.memory_max_bytes:
+            _, (_, old_html, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_html)
+
+    def _drop_memory(self, path):
+        entry = self._memory.pop(path, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1])
+
+    # --- entries ------------------------------------------------------------------------
+
+    def _cached(self, path, mtime_ns):
+        """(html, meta) from the memory tier if it holds the entry written at mtime_ns, else None.
+        Caller holds the lock."""
+        entry = self._memory.get(path)
+        if entry is None or entry[0] != mtime_ns:
+            return None
+        self._memory.move_to_end(path)
+        return entry[1], entry[2]
+
+    @staticmethod
+    def _load(path):
+        """Read and decompress the entry at path: (mtime_ns, html, meta). Needs no lock; the
+        mtime is taken from the open file, so it always matches the content read."""
+        with open(path, "rb") as f:
+            mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+            header, _, payload = f.read().partition(b"\n")
+        info = json.loads(header.decode("utf-8"))
+        return mtime_ns, decompress(info.get("codec"), payload).decode("utf-8"), info.get("meta")
+
+    def _read(self, path, mtime_ns):
+        """Return (html, meta) for the entry at path, via the memory tier when current.
+        Caller holds the lock."""
+        cached = self._cached(path, mtime_ns)
+        if cached is not None:
+            return cached
+        mtime_ns, html, meta = self._load(path)
+        self._remember(path, mtime_ns, html, meta)
+        return html, meta
+
+    def _write(self, path, meta, payload_info):
+        codec, payload = payload_info
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps({"codec": codec, "meta": meta}).encode("utf-8") + b"\n")
+            f.write(payload)
+        os.replace(tmp, path)
+        return os.stat(path)
+
+    def get(self, url):
+        """Return the cached HTML if present and younger than ttl, else None. The file read and
+        decompression run outside the lock, so concurrent lookups don't queue behind each other."""
+        path = self.path(url)
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._forget(path)
+                self.counters["misses"] += 1
+            return None
+        if time.time() - st.st_mtime >= self.ttl:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+        with self._lock:
+            cached = self._cached(path, st.st_mtime_ns)
+            if cached is not None:
+                self.counters["memory_hits"] += 1
+                self._touch_index(path)
+                return cached[0]
+        try:
+            mtime_ns, html, meta = self._load(path)
+        except Exception as e:
+            logger.warning(f"Cache read failed: {str(e)}")
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+        with self._lock:
+            current = self._memory.get(path)
+            if current is None or current[0] <= mtime_ns:  # a put may have landed meanwhile
+                self._remember(path, mtime_ns, html, meta)
+            self.counters["disk_hits"] += 1
+            self._touch_index(path)
+        return html
+
+    def meta(self, url):
+        """Metadata stored with an entry (fresh or stale), or None."""
+        path = self.path(url)
+        with self._lock:
+            try:
+                entry = self._memory.get(path)
+                if entry is not None and entry[0] == os.stat(path).st_mtime_ns:
+                    return entry[2] or None
+                with open(path, "rb") as f:
+                    return json.loads(f.readline().decode("utf-8")).get("meta") or None
+            except (OSError, ValueError):
+                return None
+
+    def put(self, url, html, meta=None):
+        """Store a page (and optional response metadata), evicting LRU entries over budget."""
+        path = self.path(url)
+        meta = dict(meta, url=url, stored_at=time.time()) if meta is not None else {}
+        payload = compress(html.encode("utf-8"))
+        with self._lock:
+            st = self._write(path, meta, payload)
+            self.counters["writes"] += 1
+            self._remember(path, st.st_mtime_ns, html, meta)
+            self._touch_index(path, st.st_size)
+            self._evict(keep=path)
+
+    def refresh(self, url, meta=None):
+        """Mark an entry fresh again (after a 304), merging new metadata. Returns its HTML or None."""
+        path = self.path(url)
+        with self._lock:
+            try:
+                st = os.stat(path)
+                html, stored = self._read(path, st.st_mtime_ns)
+            except (OSError, ValueError):
+                return None
+            stored = dict(stored or {}, url=url, stored_at=time.time())
+            stored.update({k: v for k, v in (meta or {}).items() if v})
+            with open(path, "rb") as f:
+                header, _, payload = f.read().partition(b"\n")
+            codec = json.loads(header.decode("utf-8")).get("codec")
+            st = self._write(path, stored, (codec, payload))
+            self._remember(path, st.st_mtime_ns, html, stored)
+            self._touch_index(path, st.st_size)
+            return html
+
+    def stats(self):
+        """Hit/miss/eviction counters plus current disk and memory usage."""
+        with self._lock:
+            self._load_index()
+            return dict(self.counters, disk_entries=len(self._index), disk_bytes=self._disk_bytes,
+                        memory_entries=len(self._memory), memory_bytes=self._memory_bytes)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,266 @@
+"""Proxy pool: health-weighted rotation with a circuit breaker per proxy.
+
+Each proxy keeps an exponentially weighted success rate and latency. next() spreads picks over
+healthy proxies in proportion to their score (smooth weighted round-robin, so equal scores
+rotate in order). A proxy that fails FAILURE_THRESHOLD times in a row is benched; once its
+cooldown passes it is handed out for a single trial request, and another failure benches it
+again for twice as long. Health can be persisted in SQLite so a dead proxy stays benched
+across runs: a proxy being benched or recovering is saved at once, other changes at most every
+SAVE_INTERVAL seconds per proxy, and flush() writes the rest (scrape calls it at exit).
+
+for_domain() makes assignments sticky: a site keeps its proxy (and so its cookies, clearance
+and pooled connection) until the proxy is banned there, benched, has served sticky_requests
+requests for the site, or has held it for sticky_age seconds.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "proxy_health.db"
+EWMA_ALPHA = 0.3          # weight of the newest outcome in the running averages
+LATENCY_REF = 5.0         # seconds of latency that halve a proxy's score
+MIN_SCORE = 0.05          # even a poor (but not benched) proxy gets the odd pick
+FAILURE_THRESHOLD = 3     # consecutive failures that bench a proxy
+COOLDOWN = 300            # seconds benched after the first trip
+MAX_COOLDOWN = 3600
+STICKY_REQUESTS = 200     # requests to one site before it is moved to another proxy
+STICKY_AGE = 1800         # seconds a site keeps the same proxy
+SAVE_INTERVAL = 30.0      # seconds between persisted health updates per proxy (breaker changes excepted)
+
+
+def load_proxies(path="proxies.txt"):
+    """Load a proxy list (one per line, # comments allowed). Missing file -> []."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+
+class ProxyHealth:
+    """Running health of one proxy."""
+    __slots__ = ("success", "latency", "failures", "trips", "bans", "open_until", "trial", "current")
+
+    def __init__(self, success=1.0, latency=None, failures=0, trips=0, bans=0, open_until=0.0):
+        self.success = success        # EWMA of outcomes, 1.0 = always worked
+        self.latency = latency        # EWMA seconds, None until measured
+        self.failures = failures      # consecutive failures
+        self.trips = trips            # times benched in a row, sets the cooldown
+        self.bans = bans
+        self.open_until = open_until  # benched until this time
+        self.trial = False            # a half-open trial request is in flight
+        self.current = 0.0            # smooth weighted round-robin accumulator
+
+    def score(self):
+        latency_factor = 1.0 / (1.0 + (self.latency or 0.0) / LATENCY_REF)
+        return max(MIN_SCORE, self.success * latency_factor)
+
+
+class ProxyHealthStore:
+    """SQLite-backed proxy health. Each call opens its own connection."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS proxy_health (proxy TEXT PRIMARY KEY, success REAL, latency REAL, "
+            "failures INTEGER, trips INTEGER, bans INTEGER, open_until REAL, updated_at REAL)"
+        )
+        return conn
+
+    def load(self):
+        """Return {proxy: ProxyHealth} for every stored proxy."""
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT proxy, success, latency, failures, trips, bans, open_until FROM proxy_health"
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read proxy health: {str(e)}")
+            return {}
+        return {row[0]: ProxyHealth(*row[1:]) for row in rows}
+
+    def save(self, proxy, health):
+        self.save_many([(proxy, health.success, health.latency, health.failures, health.trips,
+                         health.bans, health.open_until)])
+
+    def save_many(self, rows):
+        """Store (proxy, success, latency, failures, trips, bans, open_until) rows in one transaction."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany("INSERT OR REPLACE INTO proxy_health VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [tuple(row) + (now,) for row in rows])
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not save proxy health: {str(e)}")
+
+
+class ProxyRotator:
+    """Health-weighted rotation over a proxy pool. next() returns None when the pool is empty
+    or every proxy is benched; report() feeds each request's outcome back."""
+
+    def __init__(self, proxies, store=None, clock=time.time, sticky_requests=STICKY_REQUESTS,
+                 sticky_age=STICKY_AGE, rotate_on_ban=True, save_interval=SAVE_INTERVAL):
+        self.proxies = list(dict.fromkeys(proxies))
+        self.store = store
+        self.save_interval = save_interval
+        self.sticky_requests = sticky_requests
+        self.sticky_age = sticky_age
+        self.rotate_on_ban = rotate_on_ban
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sticky = {}  # domain -> [proxy, assigned_at, requests]
+        stored = store.load() if store is not None and self.proxies else {}
+        self._health = {proxy: stored.get(proxy) or ProxyHealth() for proxy in self.proxies}
+        now = clock()
+        self._saved_at = dict.fromkeys(self.proxies, now)  # proxy -> when its health was last saved
+        self._dirty = set()                                # proxies with unsaved health changes
+
+    def _available(self, now):
+        """Proxies that may take a request now: closed breakers, plus benched ones whose
+        cooldown has passed and that have no trial in flight."""
+        available = []
+        for proxy in self.proxies:
+            health = self._health[proxy]
+            if health.open_until <= 0:
+                available.append(proxy)
+            elif health.open_until <= now and not health.trial:
+                available.append(proxy)
+        return available
+
+    def next(self):
+        with self._lock:
+            return self._next(self._clock())
+
+    def _next(self, now):
+        available = self._available(now)
+        if not available:
+            if self.proxies:
+                logger.info("All proxies are benched; going direct")
+            return None
+        # Half-open proxies get their single trial before anything else
+        for proxy in available:
+            health = self._health[proxy]
+            if health.open_until > 0:
+                health.trial = True
+                logger.info(f"Re-testing benched proxy {proxy}")
+                return proxy
+        total = 0.0
+        best = None
+        for proxy in available:
+            health = self._health[proxy]
+            weight = health.score()
+            health.current += weight
+            total += weight
+            if best is None or health.current > self._health[best].current:
+                best = proxy
+        self._health[best].current -= total
+        return best
+
+    def for_domain(self, domain):
+        """Sticky pick: the proxy already serving domain, unless a rotation trigger has fired."""
+        with self._lock:
+            now = self._clock()
+            sticky = self._sticky.get(domain)
+            if sticky is not None:
+                proxy, assigned_at, requests = sticky
+                health = self._health[proxy]
+                if (health.open_until <= 0 and requests < self.sticky_requests
+                        and now - assigned_at < self.sticky_age):
+                    sticky[2] += 1
+                    return proxy
+                del self._sticky[domain]
+            proxy = self._next(now)
+            if proxy is not None:
+                self._sticky[domain] = [proxy, now, 1]
+            return proxy
+
+    def rotate(self, domain):
+        """Forget domain's sticky proxy so its next request gets a fresh pick."""
+        with self._lock:
+            self._sticky.pop(domain, None)
+
+    def report(self, proxy, ok, latency=None, banned=False, domain=None):
+        """Record one request made through proxy. A ban counts as a failure and, for the
+        domain it happened on, ends the sticky assignment."""
+        with self._lock:
+            health = self._health.get(proxy)
+            if health is None:
+                return
+            if banned and domain is not None and self.rotate_on_ban:
+                sticky = self._sticky.get(domain)
+                if sticky is not None and sticky[0] == proxy:
+                    del self._sticky[domain]
+                    logger.info(f"Rotating {domain} off proxy {proxy} after a ban")
+            ok = ok and not banned
+            health.success = (1 - EWMA_ALPHA) * health.success + EWMA_ALPHA * (1.0 if ok else 0.0)
+            if latency is not None:
+                health.latency = latency if health.latency is None else \
+                    (1 - EWMA_ALPHA) * health.latency + EWMA_ALPHA * latency
+            if banned:
+                health.bans += 1
+            was_trial = health.trial
+            health.trial = False
+            breaker_changed = False
+            if ok:
+                breaker_changed = health.open_until > 0
+                health.failures = 0
+                health.trips = 0
+                health.open_until = 0.0
+            else:
+                health.failures += 1
+                if was_trial or health.failures >= FAILURE_THRESHOLD:
+                    health.trips += 1
+                    cooldown = min(MAX_COOLDOWN, COOLDOWN * 2 ** (health.trips - 1))
+                    health.open_until = self._clock() + cooldown
+                    breaker_changed = True
+                    logger.warning(f"Benching proxy {proxy} for {cooldown}s after {health.failures} failures")
+            row = None
+            if self.store is not None:
+                now = self._clock()
+                if breaker_changed or now - self._saved_at[proxy] >= self.save_interval:
+                    row = self._row(proxy)
+                    self._saved_at[proxy] = now
+                    self._dirty.discard(proxy)
+                else:
+                    self._dirty.add(proxy)
+        if row is not None:
+            self.store.save_many([row])
+
+    def _row(self, proxy):
+        """proxy's health as a store row. Caller holds the lock."""
+        health = self._health[proxy]
+        return (proxy, health.success, health.latency, health.failures, health.trips, health.bans,
+                health.open_until)
+
+    def flush(self):
+        """Save every proxy's health that changed since it was last saved."""
+        if self.store is None:
+            return
+        with self._lock:
+            now = self._clock()
+            rows = [self._row(proxy) for proxy in self._dirty]
+            for proxy in self._dirty:
+                self._saved_at[proxy] = now
+            self._dirty.clear()
+        if rows:
+            self.store.save_many(rows)
+
+    def health(self, proxy):
+        """Snapshot of a proxy's health as a dict (for stats and tests)."""
+        with self._lock:
+            health = self._health[proxy]
+            return {"success": health.success, "latency": health.latency, "failures": health.failures,
+                    "bans": health.bans, "benched": health.open_until > self._clock(), "score": health.score()}
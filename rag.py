@@ -5,7 +5,7 @@ import math
 import os
 import sqlite3
 
-import requests
+from http_pool import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -69,8 +69,9 @@ class RagStore:
 def embed_texts(texts, model=DEFAULT_EMBED_MODEL):
     """Embed each text via Ollama. Raises on API failure."""
     embeddings = []
+    session = get_session()
     for text in texts:
-        response = requests.post(OLLAMA_EMBED_URL, json={"model": model, "prompt": text}, timeout=60)
+        response = session.post(OLLAMA_EMBED_URL, json={"model": model, "prompt": text}, timeout=60)
         response.raise_for_status()
         embeddings.append(response.json()["embedding"])
     return embeddings
@@ -0,0 +1,258 @@
+"""Per-host politeness: a token bucket plus a cap on requests in flight, per origin.
+
+Requests to different hosts never wait on each other; requests to one host are spaced to
+that host's rate (after an initial burst) with at most `max_in_flight` running at once.
+The bucket is implemented as GCRA: each host keeps a theoretical arrival time, and a caller
+reserves its send time under the lock and sleeps outside it.
+
+Each host's rate adapts (AIMD): a 429/503 halves it and honors Retry-After, slow responses
+ease it down, and fast healthy responses raise it a step at a time. Learned rates are kept in
+SQLite so the next run starts at the pace each site tolerated last time. A backoff is saved at
+once; other changes are saved at most every SAVE_INTERVAL seconds per host, and flush() writes
+whatever is left (scrape calls it at exit), so healthy responses don't write to disk per request.
+"""
+import email.utils
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE = 0.5        # requests per second per host
+DEFAULT_BURST = 2         # requests a quiet host may receive back to back
+DEFAULT_MAX_IN_FLIGHT = 2
+
+DB_PATH = "host_rates.db"
+MIN_RATE = 0.05           # never slower than one request per 20s
+MAX_RATE = 5.0
+INCREASE_STEP = 0.05      # requests/second added per fast healthy response
+BACKOFF_FACTOR = 0.5      # multiplier on 429/503
+SLOW_FACTOR = 0.9         # multiplier when a response takes longer than SLOW_LATENCY
+SLOW_LATENCY = 2.0        # seconds
+MAX_RETRY_AFTER = 600     # cap on a server-requested pause
+SAVE_INTERVAL = 30.0      # seconds between persisted rate changes per host (backoffs excepted)
+BACKOFF_STATUSES = (429, 503)
+
+
+def host_of(url_or_host):
+    """Lowercased netloc of a URL (or the string itself if it has no scheme)."""
+    netloc = urlparse(url_or_host).netloc if "//" in url_or_host else url_or_host
+    return netloc.lower()
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        seconds = when.timestamp() - (time.time() if now is None else now)
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class RateStore:
+    """SQLite-backed learned rate per host. Each call opens its own connection."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.execute("CREATE TABLE IF NOT EXISTS host_rates (host TEXT PRIMARY KEY, rate REAL, updated_at REAL)")
+        return conn
+
+    def load(self, host):
+        """Return the stored rate for host, or None."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT rate FROM host_rates WHERE host = ?", (host,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read host rate: {str(e)}")
+            return None
+        return row[0] if row else None
+
+    def save(self, host, rate):
+        self.save_many([(host, rate)])
+
+    def save_many(self, rates):
+        """Store (host, rate) pairs in one transaction."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany("INSERT OR REPLACE INTO host_rates VALUES (?, ?, ?)",
+                                 [(host, rate, now) for host, rate in rates])
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not save host rate: {str(e)}")
+
+
+class _HostState:
+    __slots__ = ("tat", "in_flight", "rate", "not_before", "saved_rate", "saved_at")
+
+    def __init__(self, rate, now):
+        self.tat = 0.0          # theoretical arrival time of the next request
+        self.in_flight = 0
+        self.rate = rate        # requests per second, adapted from responses
+        self.not_before = 0.0   # no request may start before this (Retry-After)
+        self.saved_rate = rate  # what the store holds for this host
+        self.saved_at = now
+
+
+class _Slot:
+    """Handle yielded by HostRateLimiter.slot(); report the response through observe()."""
+
+    def __init__(self, limiter, host, started):
+        self.limiter = limiter
+        self.host = host
+        self.started = started
+
+    def observe(self, status=None, retry_after=None):
+        latency = self.limiter._clock() - self.started
+        return self.limiter.observe(self.host, status, latency, retry_after)
+
+
+class HostRateLimiter:
+    """Adaptive token bucket + max-in-flight per host, shared by every fetch and download path.
+    `rate` is the starting rate for hosts with no stored history; `store` (a RateStore)
+    persists what each host tolerates."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 clock=time.monotonic, sleep=time.sleep, store=None, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 save_interval=SAVE_INTERVAL):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.store = store
+        self.save_interval = save_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._cond = threading.Condition()
+        self._hosts = {}
+
+    def _state(self, host):
+        """host's state. A new host's stored rate is read outside the lock, so a slow or locked
+        database never holds up requests to other hosts."""
+        with self._cond:
+            state = self._hosts.get(host)
+        if state is None:
+            stored = self.store.load(host) if self.store is not None else None
+            rate = self.rate if stored is None else min(max(stored, self.min_rate), self.max_rate)
+            with self._cond:
+                state = self._hosts.setdefault(host, _HostState(rate, self._clock()))
+        return state
+
+    def host_rate(self, url_or_host):
+        """Current requests/second allowed for a host."""
+        state = self._state(host_of(url_or_host))
+        with self._cond:
+            return state.rate
+
+    def reserve(self, host):
+        """Reserve the next send slot for host. Returns seconds to wait before sending."""
+        state = self._state(host)
+        with self._cond:
+            return self._reserve(state)
+
+    def _reserve(self, state):
+        interval = 1.0 / state.rate
+        now = self._clock()
+        earliest = max(now, state.not_before)
+        tat = max(state.tat, earliest)
+        send_at = max(earliest, tat - (self.burst - 1) * interval)
+        state.tat = tat + interval
+        return send_at - now
+
+    def observe(self, url_or_host, status=None, latency=None, retry_after=None):
+        """Adapt host's rate to one response: back off on 429/503 (honoring Retry-After),
+        ease off when slow, ramp up while fast and healthy. Returns the new rate."""
+        host = host_of(url_or_host)
+        pause = parse_retry_after(retry_after)
+        state = self._state(host)
+        with self._cond:
+            old = state.rate
+            backoff = status in BACKOFF_STATUSES
+            if backoff:
+                state.rate = max(self.min_rate, state.rate * BACKOFF_FACTOR)
+                if pause:
+                    state.not_before = max(state.not_before, self._clock() + pause)
+            elif latency is not None and latency >= SLOW_LATENCY:
+                state.rate = max(self.min_rate, state.rate * SLOW_FACTOR)
+            elif status is not None and status < 400:
+                state.rate = min(self.max_rate, state.rate + INCREASE_STEP)
+            rate = state.rate
+            now = self._clock()
+            save = (self.store is not None and rate != state.saved_rate
+                    and (backoff or now - state.saved_at >= self.save_interval))
+            if save:
+                state.saved_rate, state.saved_at = rate, now
+        if rate < old:
+            logger.info(f"Slowing {host} to {rate:.2f} req/s (status={status}, latency={latency})")
+        if save:
+            self.store.save(host, rate)
+        return rate
+
+    def flush(self):
+        """Save every host rate that changed since it was last saved."""
+        if self.store is None:
+            return
+        with self._cond:
+            now = self._clock()
+            changed = [(host, state.rate) for host, state in self._hosts.items() if state.rate != state.saved_rate]
+            for host, rate in changed:
+                self._hosts[host].saved_rate, self._hosts[host].saved_at = rate, now
+        if changed:
+            self.store.save_many(changed)
+
+    def acquire(self, url_or_host):
+        """Block until host has a free in-flight slot and a token. Pair with release()."""
+        host = host_of(url_or_host)
+        state = self._state(host)
+        with self._cond:
+            while state.in_flight >= self.max_in_flight:
+                self._cond.wait()
+            state.in_flight += 1
+            wait = self._reserve(state)
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.2f}s for {host}")
+            self._sleep(wait)
+        return host
+
+    def release(self, url_or_host):
+        state = self._state(host_of(url_or_host))
+        with self._cond:
+            state.in_flight = max(0, state.in_flight - 1)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, url_or_host):
+        """`with limiter.slot(url) as slot:` wraps one polite request to url's host; call
+        slot.observe(status, retry_after) with the response to adapt the host's rate."""
+        host = self.acquire(url_or_host)
+        try:
+            yield _Slot(self, host, self._clock())
+        finally:
+            self.release(host)
+
+    def in_flight(self, url_or_host):
+        state = self._state(host_of(url_or_host))
+        with self._cond:
+            return state.in_flight
@@ -0,0 +1,221 @@
+"""Browser rendering profile: skip heavy resources and wait only as long as a page needs.
+
+block_resources() routes every request through a filter that aborts images, media, fonts and
+known analytics/ad hosts, which the scraper never reads. wait_until_ready() replaces a fixed
+sleep with a readiness strategy:
+
+- "selector":   wait for a CSS selector configured for the page's domain (ready_selectors.json)
+- "settled":    the default: wait until no requests are in flight (network idle) and then until
+                the DOM stops changing for QUIET_MS, the two together capped at SETTLE_CAP_MS.
+                An SPA showing a spinner while its fetch/XHR data loads is not "quiet" yet.
+- "networkidle": wait until the network has been quiet for 500 ms
+- "mutations":  wait until the DOM stops changing for QUIET_MS, capped at SETTLE_CAP_MS
+- "fixed":      the old fixed FIXED_WAIT_MS sleep
+
+Every wait is bounded; a strategy that times out just lets the page be read as it is.
+
+NetworkRecorder watches a page's responses while it renders and reports the document URLs it
+saw: responses that are themselves documents (by Content-Type), and document links inside the
+JSON payloads that JS-heavy portals fetch to build their listings.
+"""
+import json
+import logging
+import os
+import time
+from collections import deque
+from urllib.parse import urljoin, urlparse
+
+logger = logging.getLogger(__name__)
+
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+TRACKER_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "clarity.ms",
+    "newrelic.com",
+    "nr-data.net",
+    "scorecardresearch.com",
+    "adservice.google.com",
+)
+
+STRATEGIES = ("selector", "settled", "networkidle", "mutations", "fixed")
+DEFAULT_STRATEGY = "settled"
+QUIET_MS = 300          # DOM quiet period that counts as settled
+SETTLE_CAP_MS = 2000    # never wait longer than the old fixed sleep for the page to settle
+READY_TIMEOUT_MS = 10000
+FIXED_WAIT_MS = 2000
+
+# Resolves once no DOM mutation has happened for quietMs, or after capMs regardless
+_QUIESCENCE_JS = """([quietMs, capMs]) => new Promise(resolve => {
+    let timer = null, cap = null, observer = null;
+    const done = () => { if (observer) observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(); };
+    observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(done, quietMs); });
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    timer = setTimeout(done, quietMs);
+    cap = setTimeout(done, capMs);
+})"""
+
+
+def is_tracker(url):
+    """True if url's host is (a subdomain of) a known analytics or ad domain."""
+    host = urlparse(url).hostname or ""
+    return any(host == d or host.endswith("." + d) for d in TRACKER_DOMAINS)
+
+
+def should_block(resource_type, url):
+    """Whether a browser request is dead weight for scraping."""
+    return resource_type in BLOCKED_RESOURCE_TYPES or is_tracker(url)
+
+
+def block_resources(page, stats=None):
+    """Abort image/media/font and tracker requests on page. `stats`, if given, counts them."""
+    def handle(route):
+        request = route.request
+        if should_block(request.resource_type, request.url):
+            if stats is not None:
+                stats["blocked"] = stats.get("blocked", 0) + 1
+            return route.abort()
+        return route.continue_()
+
+    page.route("**/*", handle)
+
+
+def load_ready_selectors(path="ready_selectors.json"):
+    """Load {domain: css_selector} readiness rules. Missing or malformed file -> {}."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return {str(k).lower(): str(v) for k, v in data.items()} if isinstance(data, dict) else {}
+    except Exception as e:
+        logger.warning(f"Could not load ready selectors from {path}: {str(e)}")
+        return {}
+
+
+def selector_for(url, selectors):
+    """The readiness selector for url's host (or a parent domain), or None."""
+    host = (urlparse(url).hostname or "").lower()
+    while host:
+        if host in selectors:
+            return selectors[host]
+        host = host.partition(".")[2]
+    return None
+
+
+def wait_until_ready(page, url, strategy=None, selectors=None, timeout=READY_TIMEOUT_MS):
+    """Wait for page to be ready using `strategy` (default: the domain's selector if one is
+    configured, else network idle plus DOM quiescence). Returns the strategy used."""
+    selector = selector_for(url, selectors or {})
+    if strategy is None:
+        strategy = "selector" if selector else DEFAULT_STRATEGY
+    try:
+        if strategy == "selector" and selector:
+            page.wait_for_selector(selector, timeout=timeout)
+        elif strategy == "networkidle":
+            page.wait_for_load_state("networkidle", timeout=timeout)
+        elif strategy == "fixed":
+            page.wait_for_timeout(FIXED_WAIT_MS)
+        elif strategy == "mutations":
+            page.evaluate(_QUIESCENCE_JS, [QUIET_MS, SETTLE_CAP_MS])
+        else:
+            strategy = "settled"
+            _wait_settled(page)
+    except Exception as e:
+        logger.info(f"Readiness wait ({strategy}) for {url} ended early: {str(e)}")
+    return strategy
+
+
+def _wait_settled(page, cap_ms=SETTLE_CAP_MS):
+    """Wait for network idle, then for the DOM to go quiet, within cap_ms overall. Data that
+    arrives late is usually rendered right after its request finishes, so the DOM check runs
+    second."""
+    started = time.monotonic()
+    page.wait_for_load_state("networkidle", timeout=cap_ms)
+    remaining = int(cap_ms - (time.monotonic() - started) * 1000)
+    if remaining > 0:
+        page.evaluate(_QUIESCENCE_JS, [QUIET_MS, remaining])
+
+
+# Content types that mark a network response as a downloadable document
+DOCUMENT_CONTENT_TYPES = (
+    "application/pdf",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument",
+    "application/vnd.ms-excel",
+    "text/csv",
+)
+MAX_JSON_RESPONSES = 50           # JSON payloads inspected per page
+MAX_JSON_BYTES = 2 * 1024 * 1024  # larger payloads are skipped
+MAX_URL_LENGTH = 2048
+
+
+def iter_json_strings(value):
+    """Yield every string value nested anywhere in a decoded JSON document."""
+    pending = deque([value])
+    while pending:
+        item = pending.popleft()
+        if isinstance(item, str):
+            yield item
+        elif isinstance(item, dict):
+            pending.extend(item.values())
+        elif isinstance(item, list):
+            pending.extend(item)
+
+
+def document_links_in_json(payload, base_url, is_document):
+    """Absolute document URLs found in a JSON payload. Relative paths resolve against base_url."""
+    links = []
+    for text in iter_json_strings(payload):
+        text = text.strip()
+        if not text or len(text) > MAX_URL_LENGTH or any(c.isspace() for c in text):
+            continue
+        url = urljoin(base_url, text)
+        if urlparse(url).scheme in ("http", "https") and is_document(url):
+            links.append(url)
+    return links
+
+
+class NetworkRecorder:
+    """Record a page's network responses and extract document URLs from them.
+
+    The response handler only notes headers; JSON bodies are read afterwards in documents(),
+    once the page has settled, so no Playwright round trip happens inside an event callback.
+    """
+
+    def __init__(self, page):
+        self.documents_seen = []
+        self._json_responses = []
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        try:
+            content_type = (response.headers.get("content-type") or "").lower()
+        except Exception:
+            return
+        if any(content_type.startswith(t) for t in DOCUMENT_CONTENT_TYPES):
+            self.documents_seen.append(response.url)
+        elif "json" in content_type and len(self._json_responses) < MAX_JSON_RESPONSES:
+            self._json_responses.append(response)
+
+    def documents(self, is_document):
+        """Unique document URLs, in the order they were seen. `is_document(url)` decides which
+        URLs inside JSON payloads count."""
+        found = list(self.documents_seen)
+        for response in self._json_responses:
+            try:
+                body = response.body()
+                if len(body) > MAX_JSON_BYTES:
+                    continue
+                payload = json.loads(body)
+            except Exception:
+                continue
+            found.extend(document_links_in_json(payload, response.url, is_document))
+        return list(dict.fromkeys(found))
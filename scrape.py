@@ -1,4 +1,6 @@
-from bs4 import BeautifulSoup as BeautifulSoup
+import asyncio
+import atexit
+import functools
 import time
 import os
 import requests
@@ -15,6 +17,25 @@ from datetime import datetime
 import random
 import platform
 import sys
+import threading
+from http_pool import get_session, impersonate_session, discard_impersonate_sessions, ensure_pool_size
+from browser_pool import get_browser_pool
+from tier_affinity import TierAffinity
+from page_cache import PageCache
+from singleflight import SingleFlight
+from ratelimit import HostRateLimiter, RateStore
+from proxies import ProxyHealthStore, ProxyRotator, load_proxies
+from jsdetect import CHALLENGE, CHALLENGE_MARKERS, NEEDS_JS, STATIC, JSVerdictCache, classify_html, confirm_verdict
+from storage_state import StorageStateStore
+from http_body import MAX_BODY_BYTES, BodyTooLarge, close_response, response_text
+from html_backend import make_soup, parse_document
+from linkextract import LinkExtractor, iter_links
+from crawler import Crawler
+from crawl_store import CrawlStore
+from dedupe import SeenSet
+from urlcanon import Canonicalizer, load_canon_rules
+from neardup import SimHashIndex
+from render import NetworkRecorder, block_resources, load_ready_selectors, wait_until_ready
 
 # Configure logging with more detailed format
 logging.basicConfig(
@@ -33,7 +54,7 @@ logger.info(f"Architecture: {platform.architecture()}")
 logger.info("="*50)
 
 # Rate limiting configuration
-RATE_LIMIT_DELAY = 2  # seconds between requests
+RATE_LIMIT_DELAY = 2  # starting seconds between requests to a host with no learned rate
 MAX_RETRIES = 3
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36',
@@ -46,21 +67,17 @@ def get_random_user_agent():
     """Get a random user agent from the list"""
     return random.choice(USER_AGENTS)
 
-def rate_limit():
-    """Add a random delay between requests to avoid rate limiting"""
-    delay = RATE_LIMIT_DELAY + random.uniform(0, 1)
-    time.sleep(delay)
-
 def load_auth(path="cookies.json"):
-    """Load auth cookies/headers from JSON. Returns {'cookies': {...}, 'headers': {...}}.
-    Missing or malformed file -> empty dicts."""
+    """Load auth cookies/headers from JSON. Returns {'cookies': {...}, 'headers': {...}}, plus
+    'updated_at' (the file's mtime). Missing or malformed file -> empty dicts."""
     empty = {"cookies": {}, "headers": {}}
     if not os.path.exists(path):
         return empty
     try:
         with open(path, encoding='utf-8') as f:
             data = json.load(f)
-        return {"cookies": data.get("cookies", {}) or {}, "headers": data.get("headers", {}) or {}}
+        return {"cookies": data.get("cookies", {}) or {}, "headers": data.get("headers", {}) or {},
+                "updated_at": os.path.getmtime(path)}
     except Exception as e:
         logger.warning(f"Could not load auth from {path}: {str(e)}")
         return empty
@@ -68,68 +85,205 @@ def load_auth(path="cookies.json"):
 # Module-level auth, populated from cookies.json at import
 _auth = load_auth()
 
-def fetch_html(url, timeout=15):
-    """Fetch page HTML with plain requests (fast path). Applies any configured auth.
-    Returns HTML string, or None if the caller should fall back to the next tier."""
+# Per-domain browser storage state (cookies + localStorage) saved by the browser tier
+_browser_states = StorageStateStore()
+
+def _auth_is_newer(url):
+    """True if cookies.json was written after url's domain's browser state was saved (or there is
+    no saved state), so its cookies should replace the browser's, e.g. a renewed session."""
+    saved_at = _browser_states.saved_at(url)
+    return saved_at is None or (_auth.get("updated_at") or 0) > saved_at
+
+def _request_cookies(url):
+    """Cookies for the requests/curl_cffi tiers: cookies.json plus any the browser tier has been
+    given for url's domain. Whichever was written last wins. None if there are none."""
+    auth, browser = _auth.get("cookies") or {}, _browser_states.cookies_for(url)
+    if _auth_is_newer(url):
+        return {**browser, **auth} or None
+    return {**auth, **browser} or None
+
+# Per-host politeness shared by every fetch tier and the downloader. RATE_LIMIT_DELAY sets the
+# starting pace for unknown hosts; each host's rate then adapts and is remembered across runs.
+_rate_limiter = HostRateLimiter(rate=1.0 / RATE_LIMIT_DELAY, store=RateStore())
+atexit.register(lambda: _rate_limiter.flush())
+
+# Fetch outcome kinds. get_page_html escalates to a heavier tier only when one could help.
+FETCH_OK = "ok"
+FETCH_NOT_MODIFIED = "not_modified"  # 304 to a conditional GET: the cached copy is current
+FETCH_BLOCKED = "blocked"     # 403/429, bot-challenge page, dropped connection: escalate
+FETCH_TIMEOUT = "timeout"     # escalate: slow-walls often target non-browser clients
+FETCH_ERROR = "error"         # unclassified failure: escalate
+FETCH_HTTP_5XX = "http_5xx"   # retry the tier once, then fail
+FETCH_HTTP_4XX = "http_4xx"   # fail fast: a browser gets the same 404
+FETCH_NON_HTML = "non_html"   # fail fast: JSON/PDF/etc. endpoints
+FETCH_NETWORK = "network"     # fail fast: DNS failure or connection refused
+FETCH_TOO_LARGE = "too_large" # fail fast: body over MAX_PAGE_BYTES, aborted mid-stream
+
+ESCALATE_KINDS = {FETCH_BLOCKED, FETCH_TIMEOUT, FETCH_ERROR}
+RETRY_KINDS = {FETCH_HTTP_5XX}
+RETRY_DELAY = 1  # seconds before retrying a 5xx
+MAX_PAGE_BYTES = MAX_BODY_BYTES  # larger HTML bodies are aborted mid-stream
+ERROR_BODY_BYTES = 256 * 1024     # enough of an error page to spot a challenge
+# Outcomes that count against the proxy a request went through (5xx includes proxy 502/503s)
+PROXY_FAILURE_KINDS = {FETCH_BLOCKED, FETCH_TIMEOUT, FETCH_ERROR, FETCH_NETWORK, FETCH_HTTP_5XX}
+
+NETWORK_ERROR_MARKERS = (
+    'name or service not known',
+    'nodename nor servname',
+    'failed to resolve',
+    'could not resolve host',
+    'getaddrinfo failed',
+    'temporary failure in name resolution',
+    'connection refused',
+)
+
+class FetchResult:
+    """Outcome of one fetch tier: the HTML on success, otherwise a FETCH_* failure kind.
+    meta holds the response's cache validators and Content-Type, when known."""
+    def __init__(self, kind, html=None, status=None, detail="", meta=None):
+        self.kind = kind
+        self.html = html
+        self.status = status
+        self.detail = detail
+        self.meta = meta or {}
+
+    @property
+    def ok(self):
+        return self.kind == FETCH_OK
+
+    def __repr__(self):
+        status = f" HTTP {self.status}" if self.status else ""
+        detail = f": {self.detail}" if self.detail else ""
+        return f"<FetchResult {self.kind}{status}{detail}>"
+
+class FetchError(Exception):
+    """Raised by get_page_html when a page cannot be fetched and no heavier tier would help."""
+    def __init__(self, url, result):
+        status = f" (HTTP {result.status})" if result.status else ""
+        super().__init__(f"Fetch failed for {url}: {result.kind}{status}")
+        self.url = url
+        self.result = result
+
+def looks_like_challenge(text):
+    """True if the body looks like a bot-challenge interstitial rather than the real page."""
+    head = (text or "")[:20000].lower()
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+def classify_exception(e):
+    """Map a requests/curl_cffi exception to a FETCH_* kind."""
+    message = str(e).lower()
+    if 'timeout' in type(e).__name__.lower() or 'timed out' in message:
+        return FETCH_TIMEOUT
+    if any(marker in message for marker in NETWORK_ERROR_MARKERS):
+        return FETCH_NETWORK
+    if isinstance(e, requests.exceptions.ConnectionError) or 'connection' in message:
+        return FETCH_BLOCKED  # resets / TLS handshake drops are a common fingerprint block
+    return FETCH_ERROR
+
+def response_meta(response):
+    """Cache-relevant response headers: ETag, Last-Modified and Content-Type."""
+    headers = response.headers
+    return {
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+        'content_type': headers.get('Content-Type'),
+    }
+
+def classify_response(response):
+    """Classify an HTTP response (requests or curl_cffi) into a FetchResult. The body is
+    streamed with a MAX_PAGE_BYTES cap and decoded once (see http_body); bodies that are not
+    needed are not read."""
+    status = response.status_code
+    if status == 304:
+        close_response(response)
+        return FetchResult(FETCH_NOT_MODIFIED, status=status, meta=response_meta(response))
+    if status >= 400:
+        try:
+            text = response_text(response, ERROR_BODY_BYTES)
+        except BodyTooLarge:
+            text = ""
+        if status in (403, 429) or looks_like_challenge(text):
+            return FetchResult(FETCH_BLOCKED, status=status)
+        return FetchResult(FETCH_HTTP_5XX if status >= 500 else FETCH_HTTP_4XX, status=status)
+    content_type = response.headers.get('Content-Type', '')
+    if 'html' not in content_type.lower():
+        close_response(response)
+        return FetchResult(FETCH_NON_HTML, status=status, detail=content_type)
+    try:
+        text = response_text(response, MAX_PAGE_BYTES)
+    except BodyTooLarge as e:
+        logger.warning(f"Aborted oversized page: {str(e)}")
+        return FetchResult(FETCH_TOO_LARGE, status=status, detail=str(e))
+    if looks_like_challenge(text):
+        return FetchResult(FETCH_BLOCKED, status=status, detail="challenge page")
+    return FetchResult(FETCH_OK, html=text, status=status, meta=response_meta(response))
+
+def fetch_html_result(url, timeout=15, headers=None):
+    """Fetch page HTML with plain requests (fast path). Applies any configured auth, then
+    `headers` (e.g. conditional-GET validators). Returns a FetchResult saying whether the
+    caller should escalate, retry or give up."""
+    extra_headers = headers
     try:
         headers = {
             'User-Agent': get_random_user_agent(),
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
         }
         headers.update(_auth.get("headers", {}))
-        cookies = _auth.get("cookies") or None
-        response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True, cookies=cookies)
-        response.raise_for_status()
-        if 'html' not in response.headers.get('Content-Type', '').lower():
-            return None
-        return response.text
+        headers.update(extra_headers or {})
+        cookies = _request_cookies(url)
+        with _rate_limiter.slot(url) as slot:
+            response = get_session().get(url, headers=headers, timeout=timeout, allow_redirects=True,
+                                         cookies=cookies, stream=True)
+            slot.observe(response.status_code, response.headers.get('Retry-After'))
+        result = classify_response(response)
     except Exception as e:
-        logger.info(f"requests fetch failed ({e}); trying TLS-impersonation tier")
-        return None
+        result = FetchResult(classify_exception(e), detail=str(e))
+    if not result.ok:
+        logger.info(f"requests fetch failed: {result}")
+    return result
 
-def fetch_html_impersonate(url, proxy=None):
-    """Fetch HTML impersonating a real browser's TLS fingerprint via curl_cffi. Applies auth.
-    Returns HTML string, or None to fall back to the headless browser."""
-    try:
-        from curl_cffi import requests as cffi_requests
-    except ImportError:
-        logger.info("curl_cffi not installed; skipping impersonation tier")
-        return None
-    try:
-        proxies = {"http": proxy, "https": proxy} if proxy else None
-        headers = _auth.get("headers") or None
-        cookies = _auth.get("cookies") or None
-        response = cffi_requests.get(url, impersonate="chrome", timeout=20, proxies=proxies,
-                                     headers=headers, cookies=cookies)
-        response.raise_for_status()
-        if 'html' not in response.headers.get('Content-Type', '').lower():
-            return None
-        return response.text
-    except Exception as e:
-        logger.info(f"impersonation fetch failed ({e}); falling back to headless browser")
-        return None
+def fetch_html(url, timeout=15):
+    """Fetch page HTML with plain requests. Returns HTML string, or None on any failure."""
+    return fetch_html_result(url, timeout).html
+
+def fetch_html_impersonate_result(url, proxy=None, headers=None):
+    """Fetch HTML impersonating a real browser's TLS fingerprint via curl_cffi. Applies auth
+    and any extra `headers`. Returns a FetchResult; an ERROR result if curl_cffi is missing.
+    The session comes from the (proxy, domain) pool, so a site's cookies and connection carry
+    over between calls. When a proxy is used, the outcome is reported to the proxy rotator."""
+    domain = urlparse(url).netloc
+    latency = None
+    with impersonate_session(proxy, domain) as session:
+        if session is None:
+            logger.info("curl_cffi not installed; skipping impersonation tier")
+            return FetchResult(FETCH_ERROR, detail="curl_cffi not installed")
+        try:
+            headers = {**_auth.get("headers", {}), **(headers or {})} or None
+            cookies = _request_cookies(url)
+            with _rate_limiter.slot(url) as slot:
+                started = time.monotonic()
+                response = session.get(url, timeout=20, headers=headers, cookies=cookies, stream=True)
+                latency = time.monotonic() - started
+                slot.observe(response.status_code, response.headers.get('Retry-After'))
+            result = classify_response(response)
+        except Exception as e:
+            result = FetchResult(classify_exception(e), detail=str(e))
+    if result.kind == FETCH_BLOCKED:
+        discard_impersonate_sessions(proxy, domain)  # don't replay a banned identity's cookies
+    if proxy is not None:
+        _proxy_rotator.report(proxy, ok=result.kind not in PROXY_FAILURE_KINDS, latency=latency,
+                              banned=result.kind == FETCH_BLOCKED, domain=domain)
+    if not result.ok:
+        logger.info(f"impersonation fetch failed: {result}")
+    return result
 
-def load_proxies(path="proxies.txt"):
-    """Load a proxy list (one per line, # comments allowed). Missing file -> []."""
-    if not os.path.exists(path):
-        return []
-    with open(path, encoding='utf-8') as f:
-        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
-
-class ProxyRotator:
-    """Round-robin over a proxy pool. next() returns None when the pool is empty."""
-    def __init__(self, proxies):
-        self.proxies = list(proxies)
-        self._i = 0
-    def next(self):
-        if not self.proxies:
-            return None
-        proxy = self.proxies[self._i % len(self.proxies)]
-        self._i += 1
-        return proxy
+def fetch_html_impersonate(url, proxy=None):
+    """Fetch HTML via curl_cffi TLS impersonation. Returns HTML string, or None on any failure."""
+    return fetch_html_impersonate_result(url, proxy).html
 
-# Module-level rotator, populated from proxies.txt at import
-_proxy_rotator = ProxyRotator(load_proxies())
+# Module-level rotator, populated from proxies.txt at import; proxy health persists across runs
+_proxy_rotator = ProxyRotator(load_proxies(), store=ProxyHealthStore())
+atexit.register(lambda: _proxy_rotator.flush())
 
 def create_download_folder(base_folder="downloads"):
     """Create the download folder if it doesn't exist"""
@@ -204,6 +358,77 @@ def is_download_link(href):
         logger.error(f"Error checking download link: {str(e)}")
         return False
 
+# HTML parser backend: None is html.parser; "lxml" or "selectolax" opts into a faster C parser
+# (see html_backend for how they differ on malformed markup)
+HTML_PARSER = None
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+class ParsedPage:
+    """Everything the scraper reads from a page, collected in one parse and one traversal:
+    title, headings, paragraphs, images, links, download links, every href (for crawling)
+    and same-domain (url, text) candidates for link ranking. `domain` defaults to base_url's."""
+    def __init__(self, html, base_url, domain=None):
+        self.base_url = base_url
+        self.domain = domain or urlparse(base_url).netloc
+        self._document = parse_document(html, HTML_PARSER)
+        self.title = self._document.title
+        self.headings = []
+        self.paragraphs = []
+        self.images = []
+        self.links = []
+        self.hrefs = []
+        self.download_links = []
+        self.candidates = []
+        downloads, candidates = set(), set()
+        for element in self._document.elements():
+            name = element.name
+            if name in HEADING_TAGS:
+                self.headings.append({'level': name, 'text': element.text()})
+            elif name == 'p':
+                text = element.text()
+                if text:
+                    self.paragraphs.append(text)
+            elif name == 'img':
+                src = element.get('src', '')
+                if src:
+                    self.images.append({'src': get_absolute_url(base_url, src), 'alt': element.get('alt', '')})
+            raw_href = element.get('href')
+            if raw_href is None:
+                continue
+            href = get_absolute_url(base_url, raw_href)
+            if name == 'a' and raw_href:
+                self.links.append({'url': href, 'text': element.text()})
+            if not href:
+                continue
+            self.hrefs.append(href)
+            if is_download_link(href) and href not in downloads:
+                downloads.add(href)
+                self.download_links.append(href)
+            if name == 'a':
+                clean = href.split('#')[0]
+                if clean and urlparse(clean).netloc == self.domain and clean not in candidates:
+                    candidates.add(clean)
+                    self.candidates.append((clean, element.text()[:120]))
+
+    @property
+    def text(self):
+        """Visible body text, one stripped line per text node (scripts and styles dropped)."""
+        return self._document.text()
+
+def parse_page(html, base_url, domain=None):
+    """Parse a page once into a ParsedPage."""
+    return ParsedPage(html, base_url, domain)
+
+def iter_page_links(html, base_url):
+    """Fast path for link-only work: stream Link(url, tag, download) for every href in html
+    (or an iterable of HTML chunks) without building a DOM. Same URLs as ParsedPage.hrefs."""
+    return iter_links(html, base_url, resolve=get_absolute_url, classify=is_download_link)
+
+def page_link_scanner(base_url, collect_text=False):
+    """A LinkExtractor configured like iter_page_links; with collect_text its .text holds the
+    page's visible body text once its links() have been read."""
+    return LinkExtractor(base_url, resolve=get_absolute_url, classify=is_download_link, collect_text=collect_text)
+
 def get_filename_from_url(url, response):
     """Extract filename from URL or Content-Disposition header"""
     try:
@@ -244,88 +469,328 @@ def get_filename_from_url(url, response):
         logger.error(f"Error getting filename: {str(e)}")
         return f"error_{hash(url)}.pdf"
 
-# Page cache: URL hash -> HTML on disk, with TTL
+# Canonical URLs key the page cache, negative cache, single-flight and crawl seen-sets, so
+# spelling variants of one page (tracking params, query order, default port...) share them
+_canonicalizer = Canonicalizer(load_canon_rules())
+
+def canonical_url(url):
+    """The canonical form of url under the per-domain rules in canon_rules.json (see urlcanon)."""
+    return _canonicalizer.canonical(url)
+
+# Page cache: compressed, sharded, size-bounded disk store with an in-memory LRU (see page_cache)
 CACHE_DIR = ".page_cache"
 CACHE_TTL = 3600  # seconds
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+_page_caches = {}
+
+def _page_cache():
+    """The PageCache for the current CACHE_DIR / CACHE_TTL / CACHE_MAX_BYTES settings."""
+    key = (CACHE_DIR, CACHE_TTL, CACHE_MAX_BYTES)
+    if key not in _page_caches:
+        _page_caches.setdefault(key, PageCache(CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES))
+    return _page_caches[key]
 
 def _cache_path(url):
-    return os.path.join(CACHE_DIR, hashlib.md5(url.encode()).hexdigest() + ".html")
+    return _page_cache().path(canonical_url(url))
 
 def _cache_get(url):
-    try:
-        path = _cache_path(url)
-        if os.path.exists(path) and time.time() - os.path.getmtime(path) < CACHE_TTL:
-            with open(path, 'r', encoding='utf-8') as f:
-                logger.info(f"Cache hit: {url}")
-                return f.read()
-    except Exception as e:
-        logger.warning(f"Cache read failed: {str(e)}")
-    return None
+    html = _page_cache().get(canonical_url(url))
+    if html is not None:
+        logger.info(f"Cache hit: {url}")
+    return html
 
-def _cache_put(url, html):
+def _cache_put(url, html, meta=None):
+    """Store a page; meta (status, etag, last_modified, content_type, tier) enables revalidation."""
     try:
-        os.makedirs(CACHE_DIR, exist_ok=True)
-        with open(_cache_path(url), 'w', encoding='utf-8') as f:
-            f.write(html)
+        _page_cache().put(canonical_url(url), html, meta)
     except Exception as e:
         logger.warning(f"Cache write failed: {str(e)}")
 
+def _cache_meta(url):
+    """Response metadata stored with a cached page (fresh or stale), or None."""
+    return _page_cache().meta(canonical_url(url))
+
+def _cache_refresh(url, meta=None):
+    """Mark a cached page fresh again after a 304 and return its HTML (None if it vanished)."""
+    html = _page_cache().refresh(canonical_url(url), meta)
+    if html is not None:
+        logger.info(f"Cache revalidated (304): {url}")
+    return html
+
+def cache_stats():
+    """Page-cache counters: memory/disk hits, misses, writes, evictions and current usage."""
+    return _page_cache().stats()
+
+def conditional_headers(meta):
+    """If-None-Match / If-Modified-Since headers from stored cache metadata."""
+    headers = {}
+    if meta and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta and meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+# Browser rendering profile: skip images/media/fonts/trackers, and wait with a readiness
+# strategy (None = the domain's selector from ready_selectors.json, else network idle + DOM quiescence)
+BROWSER_BLOCK_RESOURCES = True
+BROWSER_READY_STRATEGY = None
+BROWSER_HARVEST_NETWORK = True  # record document URLs from XHR/JSON and document responses
+BROWSER_REUSE_STATE = True      # keep cookies/localStorage per domain between renders and runs
+_ready_selectors = load_ready_selectors()
+
+def _browser_fetch_result(url):
+    """Fetch fully rendered HTML with headless Chromium, on a page leased from the shared browser
+    pool. With BROWSER_HARVEST_NETWORK, document URLs seen in the page's network traffic (PDF
+    responses, links inside XHR/JSON payloads) are returned in the result's meta['documents'].
+    With BROWSER_REUSE_STATE, the context starts from the domain's saved storage state and the
+    state is saved again after rendering (cookies then also flow to the cheaper tiers). cookies.json
+    is applied on top of a saved state that is older than it."""
+    state = _browser_states.load(url) if BROWSER_REUSE_STATE else None
+    apply_auth = state is None or _auth_is_newer(url)
+
+    def render(page):
+        cookies = _auth.get("cookies") or {}
+        if cookies and apply_auth:
+            page.context.add_cookies([{"name": n, "value": v, "url": url} for n, v in cookies.items()])
+        if BROWSER_BLOCK_RESOURCES:
+            block_resources(page)
+        recorder = NetworkRecorder(page) if BROWSER_HARVEST_NETWORK else None
+        page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        wait_until_ready(page, url, BROWSER_READY_STRATEGY, _ready_selectors)
+        html = page.content()
+        if BROWSER_REUSE_STATE:
+            try:
+                _browser_states.save(url, page.context.storage_state())
+            except Exception as e:
+                logger.warning(f"Could not read browser storage state: {str(e)}")
+        meta = {}
+        if recorder is not None:
+            documents = recorder.documents(is_download_link)
+            if documents:
+                logger.info(f"Harvested {len(documents)} document links from network traffic")
+                meta['documents'] = documents
+        return FetchResult(FETCH_OK, html=html, meta=meta)
+
+    logger.info("Rendering with pooled headless Chromium (Playwright)...")
+    options = {"storage_state": state} if state else {}
+    with _rate_limiter.slot(url):
+        return _as_result(get_browser_pool().run(render, user_agent=get_random_user_agent(),
+                                                 extra_http_headers=_auth.get("headers") or {}, **options))
+
 def _browser_fetch(url):
-    """Fetch fully rendered HTML with headless Chromium via Playwright."""
-    from playwright.sync_api import sync_playwright
-    logger.info("Launching headless Chromium (Playwright)...")
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        try:
-            context = browser.new_context(
-                user_agent=get_random_user_agent(),
-                extra_http_headers=_auth.get("headers") or {},
-            )
-            cookies = _auth.get("cookies") or {}
-            if cookies:
-                context.add_cookies([{"name": n, "value": v, "url": url} for n, v in cookies.items()])
-            page = context.new_page()
-            page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(2000)  # let dynamic content load
-            return page.content()
-        finally:
-            browser.close()
+    """Fetch fully rendered HTML with headless Chromium. Returns the HTML string."""
+    return _browser_fetch_result(url).html
+
+def get_page_documents(url):
+    """Document URLs the browser tier saw in url's network traffic, from the page cache
+    (empty if the page was fetched without the browser or is not cached)."""
+    return list((_cache_meta(url) or {}).get('documents') or [])
+
+# Per-host tier affinity, persisted across runs
+_tier_affinity = TierAffinity()
+atexit.register(lambda: _tier_affinity.flush())
+
+# Short-lived memory of URLs that failed in a way no heavier tier can fix
+NEGATIVE_CACHE_TTL = 300  # seconds
+_negative_cache = {}
+_negative_lock = threading.Lock()
+
+def _negative_cache_get(url):
+    with _negative_lock:
+        entry = _negative_cache.get(canonical_url(url))
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.time() >= expires_at:
+            del _negative_cache[canonical_url(url)]
+            return None
+        return result
+
+def _negative_cache_put(url, result):
+    with _negative_lock:
+        _negative_cache[canonical_url(url)] = (time.time() + NEGATIVE_CACHE_TTL, result)
+
+def _as_result(value):
+    """Normalize a tier's return value: injected fetchers may return HTML text or None."""
+    if isinstance(value, FetchResult):
+        return value
+    if value is None:
+        return FetchResult(FETCH_ERROR, detail="no content")
+    return FetchResult(FETCH_OK, html=value)
+
+# Concurrent fetches of the same URL (threads or get_page_html_many tasks) share one cascade
+_page_flights = SingleFlight()
+
+# JS-dependence verdicts per (domain, path pattern): static pages never reach the browser,
+# JS-rendered sections skip the plain-HTTP tiers
+_js_verdicts = JSVerdictCache()
 
 def get_page_html(website, use_cache=True, browser_fetcher=None):
-    """Get page HTML through tiers: cache -> requests -> TLS impersonation -> headless browser."""
+    """Get page HTML through tiers: cache -> requests -> TLS impersonation -> headless browser.
+    Tiers that keep failing for this host are skipped (see tier_affinity). Plain HTML that looks
+    JS-dependent (empty SPA shell, noscript wall) goes to the browser (see jsdetect). Escalates on
+    blocks, timeouts and unknown errors; 4xx, non-HTML and DNS failures raise FetchError at once
+    and are remembered for NEGATIVE_CACHE_TTL seconds. Concurrent calls for the same URL wait
+    for a single fetch and share its result."""
     if use_cache:
         cached = _cache_get(website)
         if cached is not None:
             return cached
+        failure = _negative_cache_get(website)
+        if failure is not None:
+            raise FetchError(website, failure)
+    return _page_flights.do(canonical_url(website), lambda: _fetch_page(website, browser_fetcher))
+
+def _fetch_page(website, browser_fetcher=None):
+    """Network part of get_page_html: revalidate or run the tier cascade, then cache the page.
+    Runs once per URL at a time; concurrent callers share its result via _page_flights."""
+    # A stale (or, with use_cache=False, any) cached page that has an ETag/Last-Modified is
+    # revalidated with a conditional GET on the tier that fetched it; a 304 refreshes the
+    # entry without transferring the body.
+    meta = _cache_meta(website)
+    validators = conditional_headers(meta)
+    revalidate_tier = meta.get('tier') if validators else None
+
+    def conditional(name):
+        return {'headers': validators} if name == revalidate_tier else {}
+
+    fetcher = browser_fetcher or _browser_fetch_result
+    host = urlparse(website).netloc
+    tiers = [
+        ("requests", lambda: fetch_html_result(website, **conditional("requests"))),
+        ("impersonate", lambda: fetch_html_impersonate_result(website, proxy=_proxy_rotator.for_domain(host),
+                                                              **conditional("impersonate"))),
+        ("browser", lambda: fetcher(website)),
+    ]
+    verdict = _js_verdicts.get(website)
+    start = _tier_affinity.start_tier(host)
+    if verdict == NEEDS_JS:
+        start = len(tiers) - 1
+        logger.info(f"{website} matches a JS-rendered page pattern; going straight to the browser")
+    elif start:
+        logger.info(f"Tier affinity: starting {host} at the {tiers[start][0]} tier")
+
+    result = None
+    static = None  # (tier, result) of plain HTML the JS heuristics sent on to the browser
+    for name, fetch in tiers[start:]:
+        if static is not None and name != "browser":
+            continue
+        try:
+            result = _as_result(fetch())
+            if result.kind in RETRY_KINDS:
+                logger.info(f"{name} tier got {result}; retrying once")
+                time.sleep(RETRY_DELAY)
+                result = _as_result(fetch())
+        except Exception:
+            _tier_affinity.record(host, name, False)
+            if static is None:
+                raise
+            logger.warning(f"Rendering {website} failed; keeping the plain HTML")
+            result = FetchResult(FETCH_ERROR, detail="render failed")
+            break
+        if result.kind == FETCH_NOT_MODIFIED:
+            _tier_affinity.record(host, name, True)
+            html = _cache_refresh(website, result.meta)
+            if html is not None:
+                return html
+            result = FetchResult(FETCH_ERROR, detail="cached copy missing after 304")
+        if result.ok and name != "browser" and verdict != STATIC:
+            js_verdict, reason = classify_html(result.html)
+            if js_verdict == CHALLENGE:
+                result = FetchResult(FETCH_BLOCKED, status=result.status, detail=reason)
+            elif js_verdict == NEEDS_JS:
+                logger.info(f"{name} tier HTML for {website} looks JS-dependent ({reason}); rendering")
+                static = (name, result)
+                continue
+            else:
+                _js_verdicts.put(website, STATIC)
+        if result.ok or result.kind in ESCALATE_KINDS:
+            _tier_affinity.record(host, name, result.ok)
+        if result.ok:
+            logger.info(f"Fetched page via {name} tier")
+            break
+        if result.kind not in ESCALATE_KINDS:
+            logger.info(f"Not escalating {website}: {result}")
+            break
 
-    html = fetch_html(website)
-    if html is not None:
-        logger.info("Fetched page via requests (fast path)")
-    else:
-        html = fetch_html_impersonate(website, proxy=_proxy_rotator.next())
-        if html is not None:
-            logger.info("Fetched page via TLS impersonation")
+    if static is not None:
+        if name == "browser" and result.ok:
+            _js_verdicts.put(website, confirm_verdict(static[1].html, result.html))
         else:
-            fetcher = browser_fetcher or _browser_fetch
-            html = fetcher(website)
+            name, result = static
+    if not result.ok:
+        _negative_cache_put(website, result)
+        raise FetchError(website, result)
+    _cache_put(website, result.html, dict(result.meta, status=result.status, tier=name))
+    return result.html
+
+# Batch fetch limits: total pages in flight, and pages in flight per host
+MAX_CONCURRENT_FETCHES = 16
+MAX_CONCURRENT_PER_HOST = 4
+CRAWL_CONCURRENCY = 4  # pages a crawl fetches at once; per-host pacing still comes from _rate_limiter
+# Crawl seen sets hold 64-bit URL fingerprints; set a false-positive rate to use a fixed-size
+# Bloom filter sized for CRAWL_SEEN_EXPECTED URLs instead (see dedupe)
+CRAWL_SEEN_FALSE_POSITIVE_RATE = None
+CRAWL_SEEN_EXPECTED = 100_000
+# Pages whose text SimHash is within NEAR_DUPLICATE_DISTANCE bits of a page already crawled
+# (print views, archive pages, parameter variants) have their outlinks skipped (see neardup)
+CRAWL_SKIP_NEAR_DUPLICATES = True
+NEAR_DUPLICATE_DISTANCE = 3
+
+async def get_page_html_many_async(urls, use_cache=True, browser_fetcher=None,
+                                   max_concurrency=MAX_CONCURRENT_FETCHES, per_host=MAX_CONCURRENT_PER_HOST):
+    """Fetch many pages at once through the same cascade as get_page_html.
+    The tiers are blocking (requests, curl_cffi, sync Playwright), so each fetch runs on a
+    worker thread; a global and a per-host semaphore bound how many are in flight, and a URL
+    already being fetched elsewhere is awaited rather than fetched again. The page and negative
+    caches are checked once per URL, before the fetch is dispatched.
+    Returns {url: html} in input order, with None for pages that failed."""
+    urls = list(dict.fromkeys(urls))
+    global_slots = asyncio.Semaphore(max_concurrency)
+    host_slots = {}
+    ensure_pool_size(per_host)
+
+    async def fetch_one(pool, url):
+        if use_cache:
+            cached = _cache_get(url)
+            if cached is not None:
+                return cached
+            failure = _negative_cache_get(url)
+            if failure is not None:
+                logger.info(f"Skipping {url}: it failed recently ({failure.kind})")
+                return None
+        host = host_slots.setdefault(urlparse(url).netloc, asyncio.Semaphore(per_host))
+        async with host, global_slots:
+            try:
+                fetch = functools.partial(get_page_html, url, use_cache=False, browser_fetcher=browser_fetcher)
+                return await _page_flights.do_async(canonical_url(url), fetch, pool)
+            except Exception as e:
+                logger.warning(f"Failed to fetch {url}: {str(e)}")
+                return None
 
-    _cache_put(website, html)
-    return html
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        pages = await asyncio.gather(*(fetch_one(pool, url) for url in urls))
+    return dict(zip(urls, pages))
 
-@retry(stop_max_attempt_number=3, wait_exponential_multiplier=1000, wait_exponential_max=10000)
+def get_page_html_many(urls, use_cache=True, browser_fetcher=None,
+                       max_concurrency=MAX_CONCURRENT_FETCHES, per_host=MAX_CONCURRENT_PER_HOST):
+    """Synchronous wrapper for get_page_html_many_async. Returns {url: html or None}."""
+    return asyncio.run(get_page_html_many_async(urls, use_cache, browser_fetcher, max_concurrency, per_host))
+
+def _is_retryable(e):
+    """Retry scrapes on transient errors, not on classified fetch failures."""
+    return not isinstance(e, FetchError)
+
+@retry(stop_max_attempt_number=3, wait_exponential_multiplier=1000, wait_exponential_max=10000,
+       retry_on_exception=_is_retryable)
 def scrape_website(website):
     """Scrape website for PDF download links (requests first, headless browser fallback)"""
     try:
         logger.info(f"Starting scraping process for: {website}")
         html = get_page_html(website)
-        soup = BeautifulSoup(html, 'html.parser')
-
-        download_links = set()
         # Any element with an href (not just <a>) that looks like a PDF/download link
-        for element in soup.find_all(href=True):
-            href = get_absolute_url(website, element.get('href'))
-            if href and is_download_link(href):
-                download_links.add(href)
+        download_links = {link.url for link in iter_page_links(html, website) if link.download}
+        download_links.update(get_page_documents(website))
 
         logger.info(f"Scraping completed. Found {len(download_links)} PDF links")
         return list(download_links)
@@ -354,45 +819,103 @@ def is_allowed_by_robots(url, user_agent='*'):
     except Exception:
         return True
 
-def crawl_website(start_url, max_depth=1, max_pages=20):
-    """BFS crawl of same-domain links up to max_depth, collecting PDF links.
-    Respects robots.txt. Returns {'pages': [urls visited], 'pdf_links': [...]}"""
+def crawl_website(start_url, max_depth=1, max_pages=20, concurrency=None, job_id=None):
+    """BFS crawl of same-domain links up to max_depth, collecting PDF links, with up to
+    `concurrency` pages fetched at once (default CRAWL_CONCURRENCY; 1 = serial BFS).
+    With a job_id the crawl is checkpointed to SQLite and running the same job_id again
+    resumes it (see crawl_store). Respects robots.txt.
+    Returns {'pages': [urls visited], 'pdf_links': [...], 'job_id': job_id, 'stats': {...}}"""
     domain = urlparse(start_url).netloc
-    seen = {start_url}
-    queue = [(start_url, 0)]
-    pdf_links = set()
-    pages = []
-
-    while queue and len(pages) < max_pages:
-        url, depth = queue.pop(0)
-        if not is_allowed_by_robots(url):
-            logger.info(f"Skipping (robots.txt): {url}")
-            continue
-        try:
-            html = get_page_html(url)
-        except Exception as e:
-            logger.warning(f"Failed to fetch {url}: {str(e)}")
-            continue
-        pages.append(url)
+    job = _open_crawl_job(job_id, 'crawl', start_url)
+    pdf_links = set(job.documents) if job else set()
+    duplicates = _NearDuplicates()
+
+    def expand(url, depth, html):
         logger.info(f"Crawled ({depth}): {url}")
+        children, found = [], []
+        scanner = page_link_scanner(url, collect_text=duplicates.enabled)
+        for link in scanner.links(html):
+            if link.download:
+                found.append(link.url)
+            elif depth < max_depth and urlparse(link.url).netloc == domain:
+                children.append(link.url.split('#')[0])
+        found.extend(get_page_documents(url))
+        _record_documents(pdf_links, found, job)
+        return [] if duplicates.seen(url, scanner.text) else children
+
+    crawler = _crawler(expand, max_depth, max_pages, concurrency, job)
+    pages = _run_crawler(crawler, start_url, job_id)
+    stats = dict(crawler.stats(), near_duplicates=duplicates.count)
+    logger.info(f"Crawl done: {len(pages)} pages, {len(pdf_links)} PDF links, "
+                f"seen set {stats['seen']['items']} URLs in {stats['seen']['bytes']} bytes")
+    return {'pages': pages, 'pdf_links': list(pdf_links), 'job_id': job_id, 'stats': stats}
+
+# Crawl jobs: checkpointed frontiers that survive restarts (see crawl_store)
+_crawl_store = CrawlStore()
+_running_crawls = {}  # job_id -> Crawler
+
+class _NearDuplicates:
+    """Per-crawl near-duplicate check over page text (off when CRAWL_SKIP_NEAR_DUPLICATES is False)."""
+
+    def __init__(self):
+        self.enabled = CRAWL_SKIP_NEAR_DUPLICATES
+        self.index = SimHashIndex(NEAR_DUPLICATE_DISTANCE)
+        self.count = 0
+
+    def seen(self, url, text):
+        """True if url's text nearly matches a page crawled earlier (url is then not indexed)."""
+        if not self.enabled:
+            return False
+        original = self.index.check(url, text)
+        if original is None:
+            return False
+        self.count += 1
+        logger.info(f"Near-duplicate of {original}, not following its links: {url}")
+        return True
 
-        soup = BeautifulSoup(html, 'html.parser')
-        for element in soup.find_all(href=True):
-            href = get_absolute_url(url, element.get('href'))
-            if not href:
-                continue
-            if is_download_link(href):
-                pdf_links.add(href)
-            elif depth < max_depth and urlparse(href).netloc == domain:
-                clean = href.split('#')[0]
-                if clean not in seen:
-                    seen.add(clean)
-                    queue.append((clean, depth + 1))
-        if queue:
-            rate_limit()
+def _open_crawl_job(job_id, kind, start_url):
+    return _crawl_store.job(job_id, kind, start_url) if job_id else None
+
+def _record_documents(pdf_links, found, job):
+    pdf_links.update(found)
+    if job is not None:
+        job.add_documents(found)
+
+def _crawler(expand, max_depth, max_pages, concurrency, job=None):
+    """A Crawler that fetches with get_page_html and honours robots.txt."""
+    concurrency = CRAWL_CONCURRENCY if concurrency is None else concurrency
+    ensure_pool_size(concurrency)
+    return Crawler(lambda url: get_page_html(url), expand, max_depth=max_depth, max_pages=max_pages,
+                   concurrency=concurrency, allow=lambda url: is_allowed_by_robots(url), journal=job,
+                   seen=SeenSet(false_positive_rate=CRAWL_SEEN_FALSE_POSITIVE_RATE, expected=CRAWL_SEEN_EXPECTED),
+                   key=canonical_url)
+
+def _run_crawler(crawler, start_url, job_id):
+    if job_id:
+        _running_crawls[job_id] = crawler
+    try:
+        return crawler.run(start_url)
+    finally:
+        if job_id:
+            _running_crawls.pop(job_id, None)
+
+def pause_crawl(job_id):
+    """Ask a running crawl job to stop after its in-flight pages; rerun the job to resume it.
+    Returns False if no crawl with that job_id is running in this process."""
+    crawler = _running_crawls.get(job_id)
+    if crawler is None:
+        return False
+    crawler.stop()
+    return True
+
+def crawl_job_id(kind, start_url, **params):
+    """A stable job ID for a crawl's settings, so rerunning the same crawl resumes it."""
+    key = json.dumps([kind, start_url, params], sort_keys=True, default=str)
+    return f"{kind}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
 
-    logger.info(f"Crawl done: {len(pages)} pages, {len(pdf_links)} PDF links")
-    return {'pages': pages, 'pdf_links': list(pdf_links)}
+def crawl_job_status(job_id):
+    """'running', 'paused' or 'done' for a crawl job, or None if it does not exist."""
+    return _crawl_store.status(job_id)
 
 def parse_sitemap_xml(xml_text):
     """Parse sitemap XML. Returns (page_urls, sub_sitemap_urls).
@@ -436,19 +959,7 @@ def fetch_sitemap_urls(url, max_urls=2000, _depth=0):
 
 def extract_candidate_links(html, base_url, domain):
     """Extract same-domain links as (url, link_text) pairs, deduped, fragments stripped."""
-    soup = BeautifulSoup(html, 'html.parser')
-    seen = set()
-    candidates = []
-    for a in soup.find_all('a', href=True):
-        href = get_absolute_url(base_url, a.get('href'))
-        if not href:
-            continue
-        href = href.split('#')[0]
-        if not href or urlparse(href).netloc != domain or href in seen:
-            continue
-        seen.add(href)
-        candidates.append((href, a.get_text(strip=True)[:120]))
-    return candidates
+    return parse_page(html, base_url, domain).candidates
 
 def parse_ranked_indices(text, n_candidates):
     """Parse an LLM response like '[2, 0, 5]' into valid, deduped candidate indices."""
@@ -479,55 +990,47 @@ Return ONLY a JSON array of the indices (integers) of up to {top_n} links most l
     response = asyncio.run(parse_mod._generate(prompt, model or parse_mod.MODEL_NAME))
     return parse_ranked_indices(response, len(candidates))
 
-def smart_crawl(start_url, goal, max_depth=1, max_pages=15, ranker=None, model=None):
+def smart_crawl(start_url, goal, max_depth=1, max_pages=15, ranker=None, model=None, concurrency=None,
+                job_id=None):
     """Goal-directed crawl: at each page the LLM picks which same-domain links to follow.
-    Returns {'pages': [urls visited], 'pdf_links': [...]}"""
+    Pages are fetched up to `concurrency` at a time (default CRAWL_CONCURRENCY); a job_id
+    makes the crawl resumable, as in crawl_website.
+    Returns {'pages': [urls visited], 'pdf_links': [...], 'job_id': job_id, 'stats': {...}}"""
     if ranker is None:
         ranker = lambda g, cands: llm_rank_links(g, cands, model)
     domain = urlparse(start_url).netloc
-    seen = {start_url}
-    queue = [(start_url, 0)]
-    pdf_links = set()
-    pages = []
-
-    while queue and len(pages) < max_pages:
-        url, depth = queue.pop(0)
-        if not is_allowed_by_robots(url):
-            logger.info(f"Skipping (robots.txt): {url}")
-            continue
-        try:
-            html = get_page_html(url)
-        except Exception as e:
-            logger.warning(f"Failed to fetch {url}: {str(e)}")
-            continue
-        pages.append(url)
-
-        soup = BeautifulSoup(html, 'html.parser')
-        for element in soup.find_all(href=True):
-            href = get_absolute_url(url, element.get('href'))
-            if href and is_download_link(href):
-                pdf_links.add(href)
-
-        if depth < max_depth:
-            candidates = [(u, t) for u, t in extract_candidate_links(html, url, domain)
-                          if u not in seen and not is_download_link(u)]
-            if candidates:
-                for idx in ranker(goal, candidates):
-                    chosen = candidates[idx][0]
-                    if chosen not in seen:
-                        seen.add(chosen)
-                        queue.append((chosen, depth + 1))
-        if queue:
-            rate_limit()
-
+    job = _open_crawl_job(job_id, 'smart', start_url)
+    pdf_links = set(job.documents) if job else set()
+    duplicates = _NearDuplicates()
+
+    def expand(url, depth, html):
+        page = parse_page(html, url, domain)
+        _record_documents(pdf_links, page.download_links + get_page_documents(url), job)
+        if duplicates.seen(url, page.text) or depth >= max_depth:
+            return []
+        candidates = [(u, t) for u, t in page.candidates
+                      if not crawler.was_seen(u) and not is_download_link(u)]
+        if not candidates:
+            return []
+        return [candidates[idx][0] for idx in ranker(goal, candidates)]
+
+    crawler = _crawler(expand, max_depth, max_pages, concurrency, job)
+    pages = _run_crawler(crawler, start_url, job_id)
     logger.info(f"Smart crawl done: {len(pages)} pages, {len(pdf_links)} PDF links")
-    return {'pages': pages, 'pdf_links': list(pdf_links)}
+    return {'pages': pages, 'pdf_links': list(pdf_links), 'job_id': job_id,
+            'stats': dict(crawler.stats(), near_duplicates=duplicates.count)}
 
 def download_pdfs_concurrent(pdf_links, download_folder="downloads", max_workers=4, progress_callback=None):
-    """Download PDFs concurrently. Returns (successful_filepaths, failed_links)."""
+    """Download PDFs concurrently. Links that canonicalize to the same URL are downloaded once.
+    Returns (successful_filepaths, failed_links)."""
     successful, failed = [], []
     if not pdf_links:
         return successful, failed
+    unique = {}
+    for link in pdf_links:
+        unique.setdefault(canonical_url(link), link)
+    pdf_links = list(unique.values())
+    ensure_pool_size(max_workers)
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
         futures = {pool.submit(download_pdf, link, download_folder): link for link in pdf_links}
         done = 0
@@ -566,35 +1069,38 @@ def download_pdf(pdf_url, download_folder="downloads"):
             'Referer': pdf_url
         }
         
-        # First, make a HEAD request to check the content type
-        logger.info("Checking content type...")
-        head_response = requests.head(pdf_url, headers=headers, allow_redirects=True, timeout=10)
-        content_type = head_response.headers.get('Content-Type', '').lower()
+        # One polite slot per download: the HEAD, the GET and the streamed body
+        with _rate_limiter.slot(pdf_url) as slot:
+            # First, make a HEAD request to check the content type
+            logger.info("Checking content type...")
+            session = get_session()
+            head_response = session.head(pdf_url, headers=headers, allow_redirects=True, timeout=10)
+            content_type = head_response.headers.get('Content-Type', '').lower()
         
-        # If it's not a PDF, try to follow the redirect
-        if 'application/pdf' not in content_type and 'application/octet-stream' not in content_type:
-            logger.info(f"Following redirect for: {pdf_url}")
-            response = requests.get(pdf_url, headers=headers, stream=True, allow_redirects=True, timeout=30)
-        else:
-            response = requests.get(pdf_url, headers=headers, stream=True, timeout=30)
-            
-        response.raise_for_status()
+            # If it's not a PDF, try to follow the redirect
+            if 'application/pdf' not in content_type and 'application/octet-stream' not in content_type:
+                logger.info(f"Following redirect for: {pdf_url}")
+                response = session.get(pdf_url, headers=headers, stream=True, allow_redirects=True, timeout=30)
+            else:
+                response = session.get(pdf_url, headers=headers, stream=True, timeout=30)
+            slot.observe(response.status_code, response.headers.get('Retry-After'))
+            response.raise_for_status()
         
-        # Get filename from URL or response headers
-        filename = get_filename_from_url(pdf_url, response)
-        logger.info(f"Downloading file as: {filename}")
+            # Get filename from URL or response headers
+            filename = get_filename_from_url(pdf_url, response)
+            logger.info(f"Downloading file as: {filename}")
         
-        filepath = os.path.join(download_folder, filename)
+            filepath = os.path.join(download_folder, filename)
         
-        # Download the file in chunks
-        logger.info("Downloading file content...")
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
+            # Download the file in chunks
+            logger.info("Downloading file content...")
+            with open(filepath, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=8192):
+                    if chunk:
+                        f.write(chunk)
                     
-        logger.info(f"✅ Successfully downloaded: {filename}")
-        return filepath
+            logger.info(f"✅ Successfully downloaded: {filename}")
+            return filepath
 
     except requests.exceptions.RequestException as e:
         logger.error(f"❌ Error downloading {pdf_url}: {e}")
@@ -604,7 +1110,7 @@ def download_pdf(pdf_url, download_folder="downloads"):
         return None
 
 def extract_body_content(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = make_soup(html_content, HTML_PARSER)
     body_content = soup.body
     if body_content:
         return str(body_content)
@@ -612,7 +1118,7 @@ def extract_body_content(html_content):
 
 
 def clean_body_content(body_content):
-    soup = BeautifulSoup(body_content, 'html.parser')
+    soup = make_soup(body_content, HTML_PARSER)
     for script_or_style in soup(['script', 'style']):
         script_or_style.extract()
 
@@ -635,15 +1141,15 @@ def scrape_website_content(url):
         logger.info(f"Starting website content scraping for: {url}")
 
         html = get_page_html(url)
-        soup = BeautifulSoup(html, 'html.parser')
+        page = parse_page(html, url)
 
-        # Extract structured data
+        # Extract structured data (one parse, one traversal)
         data = {
-            'title': soup.title.string if soup.title else '',
-            'headings': [],
-            'paragraphs': [],
-            'images': [],
-            'links': [],
+            'title': page.title,
+            'headings': page.headings,
+            'paragraphs': page.paragraphs,
+            'images': page.images,
+            'links': page.links,
             'metadata': {
                 'url': url,
                 'scraped_date': datetime.now().isoformat(),
@@ -651,39 +1157,6 @@ def scrape_website_content(url):
             }
         }
         
-        # Extract headings
-        for heading in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            data['headings'].append({
-                'level': heading.name,
-                'text': heading.get_text(strip=True)
-            })
-        
-        # Extract paragraphs
-        for p in soup.find_all('p'):
-            text = p.get_text(strip=True)
-            if text:
-                data['paragraphs'].append(text)
-        
-        # Extract images
-        for img in soup.find_all('img'):
-            src = img.get('src', '')
-            alt = img.get('alt', '')
-            if src:
-                data['images'].append({
-                    'src': get_absolute_url(url, src),
-                    'alt': alt
-                })
-        
-        # Extract links
-        for a in soup.find_all('a', href=True):
-            href = a.get('href')
-            text = a.get_text(strip=True)
-            if href:
-                data['links'].append({
-                    'url': get_absolute_url(url, href),
-                    'text': text
-                })
-        
         return data
 
     except Exception as e:
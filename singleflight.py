@@ -0,0 +1,87 @@
+"""Single-flight: collapse concurrent calls for the same key into one execution.
+
+The first caller for a key runs the work; every caller that arrives while it is running (from
+another thread or another asyncio task) waits for and shares that result or exception.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Per-key deduplication of in-flight work, shared by threads and asyncio tasks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> Future of the running call
+        self._local = threading.local()
+        self.stats = {"leaders": 0, "shared": 0}
+
+    def _leading(self):
+        keys = getattr(self._local, "keys", None)
+        if keys is None:
+            keys = self._local.keys = set()
+        return keys
+
+    def _join(self, key):
+        """Return (future, is_leader) for key."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.stats["shared"] += 1
+                return future, False
+            future = self._flights[key] = Future()
+            self.stats["leaders"] += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._lock:
+            self._flights.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _run(self, key, fn):
+        leading = self._leading()
+        leading.add(key)
+        try:
+            return fn()
+        finally:
+            leading.discard(key)
+
+    def do(self, key, fn):
+        """Run fn() once per concurrent burst of calls for key; return (or raise) its outcome.
+        Re-entrant: a call made from inside the running flight for key just runs fn()."""
+        if key in self._leading():
+            return fn()
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = self._run(key, fn)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, fn, executor=None):
+        """Async variant: waiters await without blocking the loop; the leader runs the blocking
+        fn on `executor`. Shares flights with do()."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(executor, self._run, key, fn)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def in_flight(self):
+        """Number of keys currently being fetched."""
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,117 @@
+"""Per-domain Playwright storage state (cookies + localStorage), reused across renders and runs.
+
+The browser tier loads a domain's saved state into each new context and saves the context's
+state after rendering, so session cookies and localStorage tokens set by the first render
+survive to the next page. The same cookies are handed to the requests/curl_cffi tiers, which
+lets later fetches of a site that only needed the browser to log in or pass a check stay on
+the cheap tiers.
+
+States are JSON files under <root>/<domain>.json, written atomically. saved_at() reports when
+a domain's state was last written, so callers can tell whether cookies.json changed since.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = ".browser_state"
+_UNSAFE_RE = re.compile(r'[^a-z0-9.\-]')
+
+
+def domain_of(url):
+    """Lowercased host (with port) of url: the key states are stored under."""
+    return urlparse(url).netloc.lower()
+
+
+def cookie_matches(cookie, host):
+    """True if a Playwright cookie's domain covers host."""
+    domain = (cookie.get("domain") or "").lower().lstrip(".")
+    host = host.split(":")[0]
+    return bool(domain) and (host == domain or host.endswith("." + domain))
+
+
+class StorageStateStore:
+    """Saved storage state per domain, cached in memory after the first read."""
+
+    def __init__(self, root=STATE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._states = {}  # domain -> state dict (or None when nothing is saved)
+        self._saved_at = {}  # domain -> when its state was written
+
+    def path(self, domain):
+        return os.path.join(self.root, _UNSAFE_RE.sub('_', domain) + ".json")
+
+    def load(self, url):
+        """The saved storage state for url's domain, or for its nearest parent domain with one
+        (so www.example.com can reuse example.com's session). None if there is none."""
+        with self._lock:
+            domain = self._find(url)
+            return None if domain is None else self._states[domain]
+
+    def saved_at(self, url):
+        """When the state load(url) returns was saved (a Unix timestamp), or None."""
+        with self._lock:
+            domain = self._find(url)
+            return None if domain is None else self._saved_at.get(domain)
+
+    def _find(self, url):
+        """The domain whose state applies to url, or None. Called with the lock held."""
+        candidate = domain_of(url)
+        while candidate.count(".") >= 1:
+            if candidate not in self._states:
+                self._states[candidate] = self._read(candidate)
+            if self._states[candidate] is not None:
+                return candidate
+            candidate = candidate.partition(".")[2]
+        return None
+
+    def _read(self, domain):
+        path = self.path(domain)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self._saved_at[domain] = os.path.getmtime(path)
+            return state if isinstance(state, dict) else None
+        except Exception as e:
+            logger.warning(f"Could not load browser state for {domain}: {str(e)}")
+            return None
+
+    def save(self, url, state):
+        """Persist a context's storage_state() for url's domain."""
+        domain = domain_of(url)
+        with self._lock:
+            self._states[domain] = state
+            self._saved_at[domain] = time.time()
+            try:
+                os.makedirs(self.root, exist_ok=True)
+                path = self.path(domain)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.warning(f"Could not save browser state for {domain}: {str(e)}")
+
+    def cookies_for(self, url, now=None):
+        """{name: value} of unexpired saved cookies that apply to url's host, for the HTTP tiers."""
+        state = self.load(url)
+        if not state:
+            return {}
+        now = time.time() if now is None else now
+        host = domain_of(url)
+        cookies = {}
+        for cookie in state.get("cookies") or []:
+            expires = cookie.get("expires", -1)
+            if expires not in (None, -1) and expires <= now:
+                continue
+            if cookie_matches(cookie, host) and cookie.get("name"):
+                cookies[cookie["name"]] = cookie.get("value", "")
+        return cookies
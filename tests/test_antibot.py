@@ -24,9 +24,9 @@ class TestFetchTierOrder:
     def test_impersonate_tier_before_browser(self, tmp_path, monkeypatch):
         monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
         calls = []
-        monkeypatch.setattr(scrape, "fetch_html",
+        monkeypatch.setattr(scrape, "fetch_html_result",
                             lambda url, timeout=15: calls.append("requests") or None)
-        monkeypatch.setattr(scrape, "fetch_html_impersonate",
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result",
                             lambda url, proxy=None: calls.append("impersonate") or "<html>tls</html>")
         html = scrape.get_page_html("http://t.local/x",
                                     browser_fetcher=lambda u: calls.append("browser") or "<html>b</html>")
@@ -36,9 +36,9 @@ class TestFetchTierOrder:
     def test_browser_is_last_resort(self, tmp_path, monkeypatch):
         monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
         calls = []
-        monkeypatch.setattr(scrape, "fetch_html",
+        monkeypatch.setattr(scrape, "fetch_html_result",
                             lambda url, timeout=15: calls.append("requests") or None)
-        monkeypatch.setattr(scrape, "fetch_html_impersonate",
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result",
                             lambda url, proxy=None: calls.append("impersonate") or None)
         html = scrape.get_page_html("http://t.local/y",
                                     browser_fetcher=lambda u: calls.append("browser") or "<html>b</html>")
@@ -47,7 +47,7 @@ class TestFetchTierOrder:
 
     def test_fast_path_skips_other_tiers(self, tmp_path, monkeypatch):
         monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
-        monkeypatch.setattr(scrape, "fetch_html", lambda url, timeout=15: "<html>fast</html>")
-        monkeypatch.setattr(scrape, "fetch_html_impersonate",
+        monkeypatch.setattr(scrape, "fetch_html_result", lambda url, timeout=15: "<html>fast</html>")
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result",
                             lambda url, proxy=None: (_ for _ in ()).throw(AssertionError("should not run")))
         assert scrape.get_page_html("http://t.local/z") == "<html>fast</html>"
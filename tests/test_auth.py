@@ -1,4 +1,5 @@
 import json
+from types import SimpleNamespace
 
 import scrape
 
@@ -13,6 +14,7 @@ class TestLoadAuth:
         auth = scrape.load_auth(str(p))
         assert auth["cookies"] == {"session": "abc123"}
         assert auth["headers"] == {"Authorization": "Bearer xyz"}
+        assert auth["updated_at"] == p.stat().st_mtime
 
     def test_missing_file_returns_empty(self, tmp_path):
         auth = scrape.load_auth(str(tmp_path / "nope.json"))
@@ -36,16 +38,17 @@ class TestFetchHtmlUsesAuth:
         captured = {}
 
         class FakeResp:
+            status_code = 200
             headers = {"Content-Type": "text/html"}
             text = "<html>ok</html>"
             def raise_for_status(self): pass
 
-        def fake_get(url, headers=None, timeout=None, allow_redirects=None, cookies=None):
+        def fake_get(url, headers=None, timeout=None, allow_redirects=None, cookies=None, stream=None):
             captured["headers"] = headers
             captured["cookies"] = cookies
             return FakeResp()
 
-        monkeypatch.setattr(scrape.requests, "get", fake_get)
+        monkeypatch.setattr(scrape, "get_session", lambda: SimpleNamespace(get=fake_get))
         monkeypatch.setattr(scrape, "_auth", {"cookies": {"session": "abc"}, "headers": {"X-Token": "t"}})
         scrape.fetch_html("https://x.com")
         assert captured["cookies"] == {"session": "abc"}
@@ -55,15 +58,16 @@ class TestFetchHtmlUsesAuth:
         captured = {}
 
         class FakeResp:
+            status_code = 200
             headers = {"Content-Type": "text/html"}
             text = "<html>ok</html>"
             def raise_for_status(self): pass
 
-        def fake_get(url, headers=None, timeout=None, allow_redirects=None, cookies=None):
+        def fake_get(url, headers=None, timeout=None, allow_redirects=None, cookies=None, stream=None):
             captured["cookies"] = cookies
             return FakeResp()
 
-        monkeypatch.setattr(scrape.requests, "get", fake_get)
+        monkeypatch.setattr(scrape, "get_session", lambda: SimpleNamespace(get=fake_get))
         monkeypatch.setattr(scrape, "_auth", {"cookies": {}, "headers": {}})
         scrape.fetch_html("https://x.com")
         assert not captured["cookies"]
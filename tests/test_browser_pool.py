@@ -0,0 +1,146 @@
+import threading
+import time
+
+import pytest
+
+import browser_pool
+import scrape
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+
+
+class FakeContext:
+    def __init__(self, browser, options):
+        self.browser = browser
+        self.options = options
+        self.closed = False
+
+    def new_page(self):
+        return FakePage(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self, **options):
+        context = FakeContext(self, options)
+        self.contexts.append(context)
+        return context
+
+    def close(self):
+        self.closed = True
+
+
+class FakeLauncher:
+    def __init__(self):
+        self.browsers = []
+
+    def __call__(self):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser, lambda: None
+
+
+@pytest.fixture
+def launcher():
+    return FakeLauncher()
+
+
+@pytest.fixture
+def pool(launcher):
+    p = browser_pool.BrowserPool(size=1, max_pages_per_browser=3, launcher=launcher)
+    yield p
+    p.shutdown()
+
+
+class TestBrowserPool:
+    def test_runs_job_with_context_options(self, pool):
+        options = pool.run(lambda page: page.context.options, user_agent="UA")
+        assert options == {"user_agent": "UA"}
+
+    def test_reuses_browser_across_jobs(self, pool, launcher):
+        for _ in range(3):
+            pool.run(lambda page: None)
+        assert len(launcher.browsers) == 1
+        assert all(c.closed for c in launcher.browsers[0].contexts)
+
+    def test_recycles_after_max_pages(self, pool, launcher):
+        for _ in range(4):
+            pool.run(lambda page: None)
+        assert len(launcher.browsers) == 2
+        assert launcher.browsers[0].closed
+        assert pool.stats["recycles"] == 1
+
+    def test_crash_relaunches_and_retries(self, pool, launcher):
+        def flaky(page):
+            if page.context.browser is launcher.browsers[0]:
+                page.context.browser.connected = False
+                raise RuntimeError("Target closed")
+            return "ok"
+
+        assert pool.run(flaky) == "ok"
+        assert len(launcher.browsers) == 2
+        assert pool.stats["crashes"] == 1
+
+    def test_job_error_propagates_without_relaunch(self, pool, launcher):
+        def boom(page):
+            raise ValueError("bad selector")
+
+        with pytest.raises(ValueError):
+            pool.run(boom)
+        assert pool.run(lambda page: "still up") == "still up"
+        assert len(launcher.browsers) == 1
+
+    def test_bounded_concurrent_pages(self, launcher):
+        p = browser_pool.BrowserPool(size=2, launcher=launcher)
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def slow(page):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+
+        threads = [threading.Thread(target=p.run, args=(slow,)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        p.shutdown()
+        assert state["peak"] == 2
+        assert len(launcher.browsers) == 2
+        assert all(b.closed for b in launcher.browsers)
+
+    def test_rejects_jobs_after_shutdown(self, pool):
+        pool.shutdown()
+        with pytest.raises(RuntimeError):
+            pool.run(lambda page: None)
+
+
+class TestBrowserFetchUsesPool:
+    def test_leases_page_from_pool(self, monkeypatch):
+        calls = []
+
+        class FakePool:
+            def run(self, job, **options):
+                calls.append(options)
+                return "<html>rendered</html>"
+
+        monkeypatch.setattr(scrape, "get_browser_pool", lambda: FakePool())
+        assert scrape._browser_fetch("https://x.com") == "<html>rendered</html>"
+        assert "user_agent" in calls[0]
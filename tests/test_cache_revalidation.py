@@ -0,0 +1,118 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import scrape
+
+
+def make_stale(url):
+    stale = time.time() - scrape.CACHE_TTL - 10
+    os.utime(scrape._cache_path(url), (stale, stale))
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+
+
+class RecordingTier:
+    """Fake requests tier: records the headers it was called with, returns scripted results."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def __call__(self, url, timeout=15, headers=None):
+        self.calls.append(headers)
+        return self.results.pop(0)
+
+
+class TestCacheMetadata:
+    def test_meta_roundtrip(self, cache):
+        scrape._cache_put("http://t.local/a", "<html>a</html>", {"etag": '"v1"', "tier": "requests"})
+        meta = scrape._cache_meta("http://t.local/a")
+        assert meta["etag"] == '"v1"'
+        assert meta["tier"] == "requests"
+        assert meta["url"] == "http://t.local/a"
+
+    def test_put_without_meta_drops_old_meta(self, cache):
+        scrape._cache_put("http://t.local/a", "<html>a</html>", {"etag": '"v1"'})
+        scrape._cache_put("http://t.local/a", "<html>b</html>")
+        assert scrape._cache_meta("http://t.local/a") is None
+
+    def test_conditional_headers(self):
+        headers = scrape.conditional_headers({"etag": '"v1"', "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"})
+        assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"}
+        assert scrape.conditional_headers(None) == {}
+
+    def test_classify_304_and_validators(self):
+        resp = SimpleNamespace(status_code=304, headers={"ETag": '"v2"'}, text="")
+        result = scrape.classify_response(resp)
+        assert result.kind == scrape.FETCH_NOT_MODIFIED
+        assert result.meta["etag"] == '"v2"'
+
+
+class TestRevalidation:
+    def test_stale_entry_304_serves_cache(self, cache, monkeypatch):
+        url = "http://t.local/r"
+        scrape._cache_put(url, "<html>cached</html>", {"etag": '"v1"', "tier": "requests"})
+        make_stale(url)
+        tier = RecordingTier(scrape.FetchResult(scrape.FETCH_NOT_MODIFIED, status=304))
+        monkeypatch.setattr(scrape, "fetch_html_result", tier)
+        html = scrape.get_page_html(url, browser_fetcher=lambda u: pytest.fail("no browser on 304"))
+        assert html == "<html>cached</html>"
+        assert tier.calls == [{"If-None-Match": '"v1"'}]
+        assert scrape._cache_get(url) == "<html>cached</html>"  # fresh again
+
+    def test_stale_entry_changed_is_replaced(self, cache, monkeypatch):
+        url = "http://t.local/r"
+        scrape._cache_put(url, "<html>old</html>", {"etag": '"v1"', "tier": "requests"})
+        make_stale(url)
+        monkeypatch.setattr(scrape, "fetch_html_result", RecordingTier(
+            scrape.FetchResult(scrape.FETCH_OK, html="<html>new</html>", status=200, meta={"etag": '"v2"'})))
+        assert scrape.get_page_html(url) == "<html>new</html>"
+        assert scrape._cache_meta(url)["etag"] == '"v2"'
+
+    def test_use_cache_false_still_revalidates(self, cache, monkeypatch):
+        url = "http://t.local/watched"
+        scrape._cache_put(url, "<html>same</html>",
+                          {"last_modified": "Wed, 01 Jan 2025 00:00:00 GMT", "tier": "requests"})
+        tier = RecordingTier(scrape.FetchResult(scrape.FETCH_NOT_MODIFIED, status=304))
+        monkeypatch.setattr(scrape, "fetch_html_result", tier)
+        assert scrape.get_page_html(url, use_cache=False) == "<html>same</html>"
+        assert tier.calls == [{"If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"}]
+
+    def test_no_validators_plain_fetch(self, cache, monkeypatch):
+        url = "http://t.local/plain"
+        scrape._cache_put(url, "<html>old</html>")
+        make_stale(url)
+        tier = RecordingTier(scrape.FetchResult(scrape.FETCH_OK, html="<html>new</html>"))
+        monkeypatch.setattr(scrape, "fetch_html_result", tier)
+        scrape.get_page_html(url)
+        assert tier.calls == [None]
+
+    def test_records_tier_used(self, cache, monkeypatch):
+        monkeypatch.setattr(scrape, "fetch_html_result", RecordingTier(scrape.FetchResult(scrape.FETCH_BLOCKED)))
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result",
+                            lambda url, proxy=None: scrape.FetchResult(scrape.FETCH_OK, html="<html>t</html>",
+                                                                       status=200, meta={"etag": '"e"'}))
+        scrape.get_page_html("http://t.local/tls")
+        meta = scrape._cache_meta("http://t.local/tls")
+        assert meta["tier"] == "impersonate"
+        assert meta["status"] == 200
+
+
+class TestFetchHtmlSendsValidators:
+    def test_conditional_headers_reach_session(self, monkeypatch):
+        captured = {}
+
+        def fake_get(url, headers=None, timeout=None, allow_redirects=None, cookies=None, stream=None):
+            captured.update(headers)
+            return SimpleNamespace(status_code=304, headers={}, text="")
+
+        monkeypatch.setattr(scrape, "get_session", lambda: SimpleNamespace(get=fake_get))
+        result = scrape.fetch_html_result("http://t.local/x", headers={"If-None-Match": '"v1"'})
+        assert captured["If-None-Match"] == '"v1"'
+        assert result.kind == scrape.FETCH_NOT_MODIFIED
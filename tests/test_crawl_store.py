@@ -0,0 +1,173 @@
+import pytest
+
+import crawl_store
+import scrape
+from crawl_store import DONE, PAUSED, RUNNING, CrawlStore
+from crawler import Crawler
+
+# "/" -> /0/../4/, each of which links to two leaves and back to the root
+GRAPH = {"/": [f"/{i}/" for i in range(5)]}
+for _i in range(5):
+    GRAPH[f"/{_i}/"] = [f"/{_i}/a", f"/{_i}/b", "/"]
+    GRAPH[f"/{_i}/a"] = GRAPH[f"/{_i}/b"] = []
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-crawl."""
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CrawlStore(str(tmp_path / "crawl_jobs.db"))
+
+
+def run(store, fetched, crash_at=None, max_pages=100, stop_after=None):
+    job = store.job("job-1", "crawl", "/")
+    crawler = None
+
+    def fetch(url):
+        if crash_at is not None and len(fetched) == crash_at:
+            job.flush = lambda: None  # a dead process writes nothing more
+            raise Crash()
+        fetched.append(url)
+        return url
+
+    def expand(url, depth, html):
+        job.add_documents([url + "doc.pdf"])
+        if stop_after is not None and len(crawler.pages) >= stop_after:
+            crawler.stop()
+        return GRAPH[url]
+
+    crawler = Crawler(fetch, expand, max_depth=2, max_pages=max_pages, concurrency=1, journal=job)
+    return crawler.run("/"), job
+
+
+class TestResume:
+    def test_resume_after_crash_skips_visited_pages(self, store, monkeypatch):
+        monkeypatch.setattr(crawl_store, "FLUSH_EVERY", 1)
+        uninterrupted, _ = run(CrawlStore(store.db_path + ".ref"), [])
+        first = []
+        with pytest.raises(Crash):
+            run(store, first, crash_at=6)
+        assert store.status("job-1") == RUNNING
+        second = []
+        pages, job = run(store, second)
+        assert job.resumed
+        assert not set(first) & set(second)  # nothing fetched twice
+        assert pages == uninterrupted
+        assert store.status("job-1") == DONE
+
+    def test_resumed_urls_are_kept_as_fingerprints(self, store, monkeypatch):
+        monkeypatch.setattr(crawl_store, "FLUSH_EVERY", 1)
+        with pytest.raises(Crash):
+            run(store, [], crash_at=6)
+        job = store.job("job-1", "crawl", "/")
+        assert job.url_count == 1 + 5 + 2 * 5  # the root, its children and their leaves were queued
+        assert not hasattr(job, "seen")
+        crawler = Crawler(lambda url: url, lambda url, depth, html: [], max_depth=2, journal=job)
+        assert crawler.seen.stats()["items"] == job.url_count
+        assert crawler.was_seen("/4/b") and not crawler.was_seen("/5/")
+
+    def test_unflushed_pages_are_fetched_again(self, store, monkeypatch):
+        monkeypatch.setattr(crawl_store, "FLUSH_EVERY", 4)
+        first = []
+        with pytest.raises(Crash):
+            run(store, first, crash_at=6)
+        second = []
+        pages, _ = run(store, second)
+        assert second[:2] == first[4:]  # visited after the last checkpoint
+        assert len(pages) == len(set(pages)) == len(GRAPH)
+
+    def test_error_flushes_journal_without_finishing(self, store, monkeypatch):
+        monkeypatch.setattr(crawl_store, "FLUSH_EVERY", 100)  # nothing is checkpointed on its own
+        job = store.job("job-1", "crawl", "/")
+
+        def expand(url, depth, html):
+            if url == "/2/":
+                raise RuntimeError("parser bug")
+            return GRAPH[url]
+
+        crawler = Crawler(lambda url: url, expand, max_depth=2, concurrency=1, journal=job)
+        with pytest.raises(RuntimeError):
+            crawler.run("/")
+        assert store.status("job-1") == RUNNING
+        fetched = []
+        pages, job = run(store, fetched)
+        assert job.resumed
+        assert "/0/" not in fetched and "/1/" not in fetched  # their visits were flushed
+        assert len(pages) == len(GRAPH)
+
+    def test_documents_survive_resume(self, store, monkeypatch):
+        monkeypatch.setattr(crawl_store, "FLUSH_EVERY", 1)
+        with pytest.raises(Crash):
+            run(store, [], crash_at=3)
+        job = store.job("job-1", "crawl", "/")
+        assert job.documents == ["/doc.pdf", "/0/doc.pdf", "/1/doc.pdf"]
+
+    def test_pause_then_resume(self, store):
+        first = []
+        pages, _ = run(store, first, stop_after=3)
+        assert len(pages) == 3
+        assert store.status("job-1") == PAUSED
+        second = []
+        pages, _ = run(store, second)
+        assert len(first) + len(second) == len(GRAPH)
+        assert store.status("job-1") == DONE
+
+    def test_page_budget_spans_resume(self, store):
+        run(store, [], max_pages=8, stop_after=3)
+        pages, _ = run(store, [], max_pages=8)
+        assert len(pages) == 8
+
+    def test_done_job_starts_afresh(self, store):
+        run(store, [])
+        fetched = []
+        pages, job = run(store, fetched)
+        assert not job.resumed
+        assert len(fetched) == len(pages) == len(GRAPH)
+
+    def test_delete(self, store):
+        run(store, [])
+        store.delete("job-1")
+        assert store.status("job-1") is None
+
+
+class TestCrawlWebsiteJobs:
+    SITE = {
+        "https://example.com/": '<a href="/a">A</a><a href="/b">B</a><a href="/doc.pdf">Doc</a>',
+        "https://example.com/a": '<a href="/a.pdf">A</a>',
+        "https://example.com/b": '<a href="/b.pdf">B</a>',
+    }
+
+    def test_crawl_website_resumes_job(self, monkeypatch):
+        fetched, crashed = [], []
+
+        def get_page_html(url, **kw):
+            if url.endswith("/b") and not crashed:
+                crashed.append(url)
+                raise Crash()
+            fetched.append(url)
+            return self.SITE[url]
+
+        monkeypatch.setattr(crawl_store, "FLUSH_EVERY", 1)
+        monkeypatch.setattr(scrape, "get_page_html", get_page_html)
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+        job_id = scrape.crawl_job_id("crawl", "https://example.com/", depth=1)
+        with pytest.raises(Crash):
+            scrape.crawl_website("https://example.com/", max_depth=1, concurrency=1, job_id=job_id)
+        assert scrape.crawl_job_status(job_id) == RUNNING
+        result = scrape.crawl_website("https://example.com/", max_depth=1, concurrency=1, job_id=job_id)
+        assert fetched.count("https://example.com/") == 1
+        assert result["pages"] == ["https://example.com/", "https://example.com/a", "https://example.com/b"]
+        assert sorted(result["pdf_links"]) == ["https://example.com/a.pdf", "https://example.com/b.pdf",
+                                               "https://example.com/doc.pdf"]
+        assert result["job_id"] == job_id
+
+    def test_job_ids_are_stable(self):
+        assert scrape.crawl_job_id("crawl", "https://x.com/", depth=2) == \
+            scrape.crawl_job_id("crawl", "https://x.com/", depth=2)
+        assert scrape.crawl_job_id("crawl", "https://x.com/", depth=2) != \
+            scrape.crawl_job_id("crawl", "https://x.com/", depth=3)
+
+    def test_pause_unknown_job(self):
+        assert scrape.pause_crawl("nope") is False
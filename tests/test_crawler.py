@@ -0,0 +1,114 @@
+import threading
+
+import scrape
+from crawler import Crawler
+
+
+def site(width=3, depth=3):
+    """A tree-with-cross-links site: each page links to `width` children and back to the root."""
+    graph = {}
+
+    def build(path, level):
+        children = [f"{path}{i}/" for i in range(width)] if level < depth else []
+        graph[path] = children + ["/"]
+        for child in children:
+            build(child, level + 1)
+
+    build("/", 0)
+    return graph
+
+
+def serial_bfs(graph, max_depth, max_pages, fail=(), disallow=()):
+    """The crawl loop crawl_website used before the frontier crawler."""
+    seen = {"/"}
+    queue = [("/", 0)]
+    pages = []
+    while queue and len(pages) < max_pages:
+        url, depth = queue.pop(0)
+        if url in disallow or url in fail:
+            continue
+        pages.append(url)
+        for href in graph[url]:
+            if depth < max_depth and href not in seen:
+                seen.add(href)
+                queue.append((href, depth + 1))
+    return pages
+
+
+def crawl(graph, max_depth, max_pages, concurrency, fail=(), disallow=(), fetched=None):
+    def fetch(url):
+        if fetched is not None:
+            fetched.append(url)
+        if url in fail:
+            raise RuntimeError("boom")
+        return url
+
+    crawler = Crawler(fetch, lambda url, depth, html: graph[html], max_depth=max_depth, max_pages=max_pages,
+                      concurrency=concurrency, allow=lambda url: url not in disallow)
+    return crawler.run("/")
+
+
+class TestCrawler:
+    def test_concurrency_one_matches_serial_bfs(self):
+        graph = site()
+        for max_depth, max_pages in ((0, 20), (1, 20), (2, 7), (3, 100), (3, 25)):
+            assert crawl(graph, max_depth, max_pages, 1) == serial_bfs(graph, max_depth, max_pages)
+
+    def test_failures_and_disallowed_match_serial_bfs(self):
+        graph = site()
+        fail, disallow = {"/1/"}, {"/2/0/"}
+        assert crawl(graph, 3, 15, 1, fail, disallow) == serial_bfs(graph, 3, 15, fail, disallow)
+
+    def test_concurrent_crawl_visits_same_pages(self):
+        graph = site()
+        assert sorted(crawl(graph, 2, 1000, 8)) == sorted(serial_bfs(graph, 2, 1000))
+
+    def test_page_budget_is_exact(self):
+        graph = site()
+        fetched = []
+        pages = crawl(graph, 3, 10, 8, fetched=fetched)
+        assert len(pages) == 10
+        assert len(fetched) == 10  # nothing fetched beyond the budget
+
+    def test_failed_fetch_frees_its_slot(self):
+        graph = site()
+        pages = crawl(graph, 3, 10, 4, fail={"/0/", "/1/"})
+        assert len(pages) == 10
+        assert "/0/" not in pages
+
+    def test_depth_limit(self):
+        graph = site()
+        pages = crawl(graph, 1, 1000, 4)
+        assert sorted(pages) == ["/", "/0/", "/1/", "/2/"]
+
+    def test_fetches_run_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fetch(url):
+            if url != "/":
+                barrier.wait()  # only returns once three fetches are in flight together
+            return url
+
+        graph = {"/": ["/a", "/b", "/c"], "/a": [], "/b": [], "/c": []}
+        crawler = Crawler(fetch, lambda url, depth, html: graph[url], concurrency=3)
+        assert sorted(crawler.run("/")) == ["/", "/a", "/b", "/c"]
+
+
+class TestCrawlWebsite:
+    SITE = {
+        "https://example.com/": '<a href="/a">A</a><a href="/b#x">B</a><a href="/doc.pdf">Doc</a>',
+        "https://example.com/a": '<a href="/c">C</a><a href="/a.pdf">A</a>',
+        "https://example.com/b": '<a href="/a">A again</a><a href="https://other.com/">Out</a>',
+        "https://example.com/c": '<a href="/c.pdf">C</a>',
+    }
+
+    def test_serial_and_concurrent_results(self, monkeypatch):
+        monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: self.SITE[url])
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+        serial = scrape.crawl_website("https://example.com/", max_depth=2, concurrency=1)
+        assert serial["pages"] == ["https://example.com/", "https://example.com/a",
+                                   "https://example.com/b", "https://example.com/c"]
+        concurrent = scrape.crawl_website("https://example.com/", max_depth=2, concurrency=4)
+        assert sorted(concurrent["pages"]) == sorted(serial["pages"])
+        assert sorted(concurrent["pdf_links"]) == sorted(serial["pdf_links"]) == [
+            "https://example.com/a.pdf", "https://example.com/c.pdf", "https://example.com/doc.pdf"]
@@ -0,0 +1,101 @@
+import pytest
+
+import dedupe
+import scrape
+from dedupe import BloomFilter, FingerprintSet, SeenSet, fingerprint
+
+
+def urls(n, prefix="https://shop.test/list?page="):
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+class TestFingerprint:
+    def test_stable_64_bit_nonzero(self):
+        assert fingerprint("https://a.test/") == fingerprint("https://a.test/")
+        assert 0 < fingerprint("https://a.test/") < 2 ** 64
+        assert fingerprint("https://a.test/") != fingerprint("https://a.test/x")
+
+
+class TestFingerprintSet:
+    def test_add_and_contains(self):
+        seen = FingerprintSet()
+        assert seen.add("https://a.test/") is True
+        assert seen.add("https://a.test/") is False
+        assert "https://a.test/" in seen
+        assert "https://a.test/other" not in seen
+        assert len(seen) == 1
+
+    def test_grows_and_keeps_everything(self):
+        seen = FingerprintSet(slots=8)
+        items = urls(5000)
+        for url in items:
+            assert seen.add(url)
+        assert len(seen) == 5000
+        assert all(url in seen for url in items)
+        assert not any(url in seen for url in urls(100, "https://other.test/?p="))
+        assert seen.nbytes <= 5000 * 8 / dedupe.MAX_LOAD * 2
+
+    def test_far_smaller_than_a_set_of_strings(self):
+        import sys
+        items = urls(20000)
+        seen = FingerprintSet()
+        for url in items:
+            seen.add(url)
+        strings = sys.getsizeof(set(items)) + sum(sys.getsizeof(u) for u in items)
+        assert seen.nbytes * 4 < strings
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(2000, 0.01)
+        items = urls(2000)
+        for url in items:
+            bloom.add(url)
+        assert all(url in bloom for url in items)
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter(5000, 0.01)
+        for url in urls(5000):
+            bloom.add(url)
+        probes = urls(20000, "https://absent.test/?q=")
+        rate = sum(url in bloom for url in probes) / len(probes)
+        assert rate < 0.03
+        assert bloom.current_error_rate() == pytest.approx(0.01, rel=0.5)
+
+    def test_memory_is_fixed_up_front(self):
+        bloom = BloomFilter(100_000, 0.001)
+        before = bloom.nbytes
+        for url in urls(1000):
+            bloom.add(url)
+        assert bloom.nbytes == before < 200_000  # ~1.8 bytes per expected URL
+
+    def test_bad_error_rate(self):
+        with pytest.raises(ValueError):
+            BloomFilter(10, 0)
+
+
+class TestSeenSet:
+    def test_default_is_exact_fingerprints(self):
+        seen = SeenSet(["https://a.test/"])
+        assert "https://a.test/" in seen
+        assert seen.stats()["kind"] == "fingerprints"
+        assert seen.stats()["items"] == 1
+
+    def test_bloom_when_error_rate_given(self):
+        seen = SeenSet(false_positive_rate=0.001, expected=1000)
+        seen.add("https://a.test/")
+        stats = seen.stats()
+        assert stats["kind"] == "bloom" and "error_rate" in stats
+        assert stats["bytes"] < 2000
+
+    def test_crawl_reports_seen_stats(self, monkeypatch):
+        site = {"https://e.test/": '<a href="/a">A</a><a href="/b">B</a>',
+                "https://e.test/a": "", "https://e.test/b": ""}
+        monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: site[url])
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+        monkeypatch.setattr(scrape, "CRAWL_SEEN_FALSE_POSITIVE_RATE", 0.01)
+        result = scrape.crawl_website("https://e.test/", max_depth=1)
+        assert sorted(result["pages"]) == sorted(site)
+        assert result["stats"]["seen"]["kind"] == "bloom"
+        assert result["stats"]["seen"]["items"] == 3
+        assert result["stats"]["pages"] == 3
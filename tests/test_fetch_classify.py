@@ -0,0 +1,165 @@
+import pytest
+import requests
+
+import scrape
+
+
+class FakeResp:
+    def __init__(self, status_code=200, content_type="text/html", text="<html>ok</html>"):
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type}
+        self.text = text
+
+
+class TestClassifyResponse:
+    def test_ok_html(self):
+        result = scrape.classify_response(FakeResp())
+        assert result.ok
+        assert result.html == "<html>ok</html>"
+
+    def test_not_found_is_4xx(self):
+        assert scrape.classify_response(FakeResp(404)).kind == scrape.FETCH_HTTP_4XX
+
+    def test_forbidden_and_429_are_blocked(self):
+        assert scrape.classify_response(FakeResp(403)).kind == scrape.FETCH_BLOCKED
+        assert scrape.classify_response(FakeResp(429)).kind == scrape.FETCH_BLOCKED
+
+    def test_server_error_is_5xx(self):
+        assert scrape.classify_response(FakeResp(500)).kind == scrape.FETCH_HTTP_5XX
+
+    def test_503_challenge_is_blocked(self):
+        page = "<html><head><title>Just a moment...</title></head></html>"
+        assert scrape.classify_response(FakeResp(503, text=page)).kind == scrape.FETCH_BLOCKED
+
+    def test_challenge_with_200_is_blocked(self):
+        page = "<html><script>window._cf_chl_opt={}</script></html>"
+        assert scrape.classify_response(FakeResp(200, text=page)).kind == scrape.FETCH_BLOCKED
+
+    def test_json_is_non_html(self):
+        result = scrape.classify_response(FakeResp(content_type="application/json", text="{}"))
+        assert result.kind == scrape.FETCH_NON_HTML
+
+
+class TestClassifyException:
+    def test_timeout(self):
+        assert scrape.classify_exception(requests.exceptions.ReadTimeout("read timed out")) == scrape.FETCH_TIMEOUT
+
+    def test_dns_failure(self):
+        e = requests.exceptions.ConnectionError("Failed to resolve 'nope.invalid' (Name or service not known)")
+        assert scrape.classify_exception(e) == scrape.FETCH_NETWORK
+
+    def test_curl_dns_failure(self):
+        assert scrape.classify_exception(Exception("curl: (6) Could not resolve host: nope")) == scrape.FETCH_NETWORK
+
+    def test_connection_reset_is_blocked(self):
+        e = requests.exceptions.ConnectionError("Connection aborted. ConnectionResetError(104)")
+        assert scrape.classify_exception(e) == scrape.FETCH_BLOCKED
+
+    def test_unknown(self):
+        assert scrape.classify_exception(ValueError("weird")) == scrape.FETCH_ERROR
+
+
+@pytest.fixture
+def tiers(tmp_path, monkeypatch):
+    """Script the first two tiers' results; record which tiers ran."""
+    monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(scrape, "RETRY_DELAY", 0)
+    calls = []
+    script = {"requests": [], "impersonate": []}
+
+    def scripted(name):
+        def fetch(url, **kwargs):
+            calls.append(name)
+            return script[name].pop(0) if script[name] else None
+        return fetch
+
+    monkeypatch.setattr(scrape, "fetch_html_result", scripted("requests"))
+    monkeypatch.setattr(scrape, "fetch_html_impersonate_result", scripted("impersonate"))
+    browser = lambda url: calls.append("browser") or "<html>rendered</html>"
+    return script, calls, browser
+
+
+class TestEscalationPolicy:
+    def test_404_fails_fast(self, tiers):
+        script, calls, browser = tiers
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_HTTP_4XX, status=404)]
+        with pytest.raises(scrape.FetchError) as exc:
+            scrape.get_page_html("http://t.local/missing", browser_fetcher=browser)
+        assert exc.value.result.status == 404
+        assert calls == ["requests"]
+
+    def test_dns_failure_fails_fast(self, tiers):
+        script, calls, browser = tiers
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_NETWORK)]
+        with pytest.raises(scrape.FetchError):
+            scrape.get_page_html("http://nope.local/", browser_fetcher=browser)
+        assert calls == ["requests"]
+
+    def test_non_html_fails_fast(self, tiers):
+        script, calls, browser = tiers
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_NON_HTML, status=200)]
+        with pytest.raises(scrape.FetchError):
+            scrape.get_page_html("http://t.local/api.json", browser_fetcher=browser)
+        assert calls == ["requests"]
+
+    def test_blocked_escalates(self, tiers):
+        script, calls, browser = tiers
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_BLOCKED, status=403)]
+        script["impersonate"] = [scrape.FetchResult(scrape.FETCH_TIMEOUT)]
+        assert scrape.get_page_html("http://t.local/cf", browser_fetcher=browser) == "<html>rendered</html>"
+        assert calls == ["requests", "impersonate", "browser"]
+
+    def test_5xx_retried_once(self, tiers):
+        script, calls, browser = tiers
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_HTTP_5XX, status=502),
+                              scrape.FetchResult(scrape.FETCH_OK, html="<html>back</html>")]
+        assert scrape.get_page_html("http://t.local/flaky", browser_fetcher=browser) == "<html>back</html>"
+        assert calls == ["requests", "requests"]
+
+    def test_persistent_5xx_fails_without_browser(self, tiers):
+        script, calls, browser = tiers
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_HTTP_5XX, status=500)] * 2
+        with pytest.raises(scrape.FetchError):
+            scrape.get_page_html("http://t.local/down", browser_fetcher=browser)
+        assert "browser" not in calls
+
+
+class TestNegativeCache:
+    def test_dead_url_not_refetched(self, tiers):
+        script, calls, browser = tiers
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_HTTP_4XX, status=404)]
+        for _ in range(3):
+            with pytest.raises(scrape.FetchError):
+                scrape.get_page_html("http://t.local/gone", browser_fetcher=browser)
+        assert calls == ["requests"]
+
+    def test_expires(self, tiers, monkeypatch):
+        script, calls, browser = tiers
+        monkeypatch.setattr(scrape, "NEGATIVE_CACHE_TTL", 0)
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_HTTP_4XX, status=404),
+                              scrape.FetchResult(scrape.FETCH_OK, html="<html>back</html>")]
+        with pytest.raises(scrape.FetchError):
+            scrape.get_page_html("http://t.local/later", browser_fetcher=browser)
+        assert scrape.get_page_html("http://t.local/later", browser_fetcher=browser) == "<html>back</html>"
+
+    def test_use_cache_false_bypasses(self, tiers):
+        script, calls, browser = tiers
+        script["requests"] = [scrape.FetchResult(scrape.FETCH_HTTP_4XX, status=404),
+                              scrape.FetchResult(scrape.FETCH_OK, html="<html>fresh</html>")]
+        with pytest.raises(scrape.FetchError):
+            scrape.get_page_html("http://t.local/w", browser_fetcher=browser)
+        assert scrape.get_page_html("http://t.local/w", use_cache=False, browser_fetcher=browser) == "<html>fresh</html>"
+
+
+class TestScrapeWebsiteRetry:
+    def test_fetch_error_not_retried(self, monkeypatch):
+        calls = []
+
+        def dead(url, **kwargs):
+            calls.append(url)
+            raise scrape.FetchError(url, scrape.FetchResult(scrape.FETCH_HTTP_4XX, status=404))
+
+        monkeypatch.setattr(scrape, "get_page_html", dead)
+        with pytest.raises(scrape.FetchError):
+            scrape.scrape_website("http://t.local/404")
+        assert len(calls) == 1
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import scrape
+
+
+class ConcurrencyProbe:
+    """Fake get_page_html that records peak concurrency overall and per host."""
+
+    def __init__(self, delay=0.05, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.active_by_host = {}
+        self.peak = 0
+        self.peak_by_host = {}
+        self.calls = []
+
+    def __call__(self, url, use_cache=True, browser_fetcher=None):
+        host = scrape.urlparse(url).netloc
+        with self.lock:
+            self.calls.append(url)
+            self.active += 1
+            self.active_by_host[host] = self.active_by_host.get(host, 0) + 1
+            self.peak = max(self.peak, self.active)
+            self.peak_by_host[host] = max(self.peak_by_host.get(host, 0), self.active_by_host[host])
+        try:
+            time.sleep(self.delay)
+            if url in self.fail:
+                raise RuntimeError("blocked")
+            return f"<html>{url}</html>"
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.active_by_host[host] -= 1
+
+
+class TestGetPageHtmlMany:
+    def test_returns_pages_in_input_order(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(scrape, "get_page_html", ConcurrencyProbe(delay=0))
+        urls = [f"http://h{i}.local/" for i in range(5)]
+        pages = scrape.get_page_html_many(urls)
+        assert list(pages) == urls
+        assert pages["http://h3.local/"] == "<html>http://h3.local/</html>"
+
+    def test_failures_map_to_none(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(scrape, "get_page_html", ConcurrencyProbe(delay=0, fail={"http://a.local/bad"}))
+        pages = scrape.get_page_html_many(["http://a.local/ok", "http://a.local/bad"])
+        assert pages["http://a.local/ok"]
+        assert pages["http://a.local/bad"] is None
+
+    def test_runs_concurrently(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(scrape, "get_page_html", ConcurrencyProbe(delay=0.2))
+        urls = [f"http://h{i}.local/" for i in range(8)]
+        start = time.time()
+        scrape.get_page_html_many(urls, max_concurrency=8)
+        assert time.time() - start < 0.2 * 4
+
+    def test_global_limit(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        probe = ConcurrencyProbe()
+        monkeypatch.setattr(scrape, "get_page_html", probe)
+        scrape.get_page_html_many([f"http://h{i}.local/" for i in range(12)], max_concurrency=3)
+        assert probe.peak <= 3
+        assert len(probe.calls) == 12
+
+    def test_per_host_limit(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        probe = ConcurrencyProbe()
+        monkeypatch.setattr(scrape, "get_page_html", probe)
+        urls = [f"http://same.local/{i}" for i in range(8)] + [f"http://other.local/{i}" for i in range(2)]
+        scrape.get_page_html_many(urls, max_concurrency=10, per_host=2)
+        assert probe.peak_by_host["same.local"] <= 2
+        assert probe.peak > 2  # other host was not held back by the busy one
+
+    def test_cache_hits_skip_fetch(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        scrape._cache_put("http://c.local/", "<html>cached</html>")
+        probe = ConcurrencyProbe(delay=0)
+        monkeypatch.setattr(scrape, "get_page_html", probe)
+        pages = scrape.get_page_html_many(["http://c.local/", "http://c.local/", "http://d.local/"])
+        assert pages["http://c.local/"] == "<html>cached</html>"
+        assert probe.calls == ["http://d.local/"]
+
+    def test_cache_read_once_per_url(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        reads, fetches = [], []
+        real_get = scrape._cache_get
+        monkeypatch.setattr(scrape, "_cache_get", lambda url: reads.append(url) or real_get(url))
+        monkeypatch.setattr(scrape, "_fetch_page", lambda url, browser_fetcher=None: fetches.append(url) or "<html/>")
+        scrape.get_page_html_many(["http://e.local/"])
+        assert reads == ["http://e.local/"]
+        assert fetches == ["http://e.local/"]
+
+    def test_negative_cache_skips_fetch(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        probe = ConcurrencyProbe(delay=0)
+        monkeypatch.setattr(scrape, "get_page_html", probe)
+        monkeypatch.setattr(scrape, "_negative_cache_get",
+                            lambda url: scrape.FetchResult(scrape.FETCH_HTTP_4XX, status=404)
+                            if url == "http://f.local/gone" else None)
+        pages = scrape.get_page_html_many(["http://f.local/gone", "http://f.local/ok"])
+        assert pages["http://f.local/gone"] is None
+        assert probe.calls == ["http://f.local/ok"]
@@ -0,0 +1,171 @@
+import pytest
+
+import html_backend
+import scrape
+import watch
+
+BACKENDS = html_backend.available_backends()
+
+# Pages every backend must read identically (taken from the parser/crawl/watch test pages)
+FIXTURES = {
+    "reports": """
+<html><head><title>Reports</title><link rel="alternate" href="/feed.pdf"></head>
+<body>
+  <h1>Annual reports</h1>
+  <p>Intro text.</p><p>   </p>
+  <h2>2024</h2>
+  <p>Second <b>paragraph</b>.</p>
+  <img src="/logo.png" alt="Logo"><img alt="no src">
+  <a href="/files/2024.pdf">Report 2024</a>
+  <a href="/files/2024.pdf#page=2">Same report</a>
+  <a href="/archive#top">Archive</a>
+  <a href="https://other.com/x">External</a>
+  <a href="">Empty</a>
+  <area href="/map.docx">
+  <script>var hidden = "not text";</script>
+  <style>p { color: red; }</style>
+</body></html>
+""",
+    "crawl": """
+<html><body>
+  <a href="/reports">Annual Reports</a>
+  <a href="/reports#section">Reports anchor dupe</a>
+  <a href="https://other.com/x">External</a>
+  <a href="/about">About us</a>
+</body></html>
+""",
+    "entities": """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Caf&eacute; &amp; Co</title></head>
+<body><!-- nav -->
+  <h3>Menu &ndash; 2024</h3>
+  <p>Espresso <i>&euro;2</i><br>Latte<script>document.write("x")</script></p>
+  <a href="/menu.pdf?lang=en&amp;v=2">Menu <span>(PDF)</span></a>
+  <a href>Valueless</a>
+  <noscript><p>Enable JavaScript</p></noscript>
+</body></html>
+""",
+    "empty_title": "<html><head><title></title></head><body><p>Body</p></body></html>",
+    "empty": "",
+}
+
+# Real-world markup the C backends repair like browsers do, so they may read it differently
+MALFORMED = {
+    "unclosed_p_li": "<html><body><p>a<p>b</p><ul><li>one<li>two</ul></body></html>",
+    "block_in_heading": "<html><body><h1>Head<p>para</p></h1></body></html>",
+    "fragment": "<p>frag <a href='/x.pdf'>x</a></p>",
+}
+ALL_FIXTURES = {**FIXTURES, **MALFORMED}
+
+# (backend, fixture) pairs known to read differently from html.parser, and why
+DIVERGENT = {
+    ("lxml", "unclosed_p_li"): "an unclosed <p>/<li> ends at the next block",
+    ("selectolax", "unclosed_p_li"): "an unclosed <p>/<li> ends at the next block",
+    ("lxml", "block_in_heading"): "the <p> is moved out of the <h1>",
+    ("lxml", "fragment"): "a <body> is added around the fragment",
+    ("selectolax", "fragment"): "a <body> is added around the fragment",
+}
+
+
+def parity_cases():
+    cases = []
+    for backend in BACKENDS:
+        for name in sorted(ALL_FIXTURES):
+            reason = DIVERGENT.get((backend, name))
+            marks = pytest.mark.xfail(reason=reason, strict=True) if reason else ()
+            cases.append(pytest.param(backend, name, marks=marks, id=f"{backend}-{name}"))
+    return cases
+
+
+def extract(html, backend, monkeypatch):
+    monkeypatch.setattr(scrape, "HTML_PARSER", backend)
+    page = scrape.parse_page(html, "https://example.com/reports/")
+    return {
+        "title": page.title, "headings": page.headings, "paragraphs": page.paragraphs,
+        "images": page.images, "links": page.links, "hrefs": page.hrefs,
+        "download_links": page.download_links, "candidates": page.candidates, "text": page.text,
+    }
+
+
+class TestBackendSelection:
+    def test_html_parser_always_available(self):
+        assert BACKENDS[-1] == "html.parser"
+
+    def test_html_parser_is_default(self):
+        assert html_backend.resolve_backend() == "html.parser"
+        assert html_backend.soup_features() == "html.parser"
+        assert html_backend.parse_document("<p>x</p>").backend == "html.parser"
+
+    def test_installed_backend_is_opt_in(self):
+        for backend in BACKENDS:
+            assert html_backend.resolve_backend(backend) == backend
+
+    def test_missing_backend_falls_back(self, monkeypatch):
+        monkeypatch.setattr(html_backend, "SELECTOLAX_AVAILABLE", False)
+        monkeypatch.setattr(html_backend, "LXML_AVAILABLE", False)
+        assert html_backend.resolve_backend("selectolax") == "html.parser"
+        assert html_backend.soup_features() == "html.parser"
+        assert html_backend.parse_document("<p>x</p>").backend == "html.parser"
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            html_backend.resolve_backend("regex")
+
+    def test_soup_never_selectolax(self):
+        assert html_backend.soup_features("selectolax") in ("lxml", "html.parser")
+
+
+class TestParity:
+    @pytest.mark.parametrize("backend, name", parity_cases())
+    def test_parsed_page_matches_html_parser(self, backend, name, monkeypatch):
+        html = ALL_FIXTURES[name]
+        assert extract(html, backend, monkeypatch) == extract(html, "html.parser", monkeypatch)
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    @pytest.mark.parametrize("name", sorted(ALL_FIXTURES))
+    def test_text_matches_clean_body_content(self, backend, name, monkeypatch):
+        html = ALL_FIXTURES[name]
+        monkeypatch.setattr(scrape, "HTML_PARSER", backend)
+        expected = scrape.clean_body_content(scrape.extract_body_content(html))
+        assert scrape.parse_page(html, "https://example.com/").text == expected
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    @pytest.mark.parametrize("name", sorted(FIXTURES))
+    def test_normalize_content_matches(self, backend, name, monkeypatch):
+        html = FIXTURES[name]
+        monkeypatch.setattr(html_backend, "soup_features", lambda backend=None: "html.parser")
+        expected = watch.normalize_content(html)
+        monkeypatch.undo()
+        assert html_backend.parse_document(html, backend).text(body_only=False) == expected
+
+
+class TestDefaultOnMalformedMarkup:
+    """Whatever is installed, the default reads malformed pages as html.parser always has."""
+
+    def test_unclosed_paragraphs(self):
+        page = scrape.parse_page(MALFORMED["unclosed_p_li"], "https://example.com/")
+        assert page.paragraphs == ["abonetwo", "b"]
+
+    def test_block_inside_heading(self):
+        page = scrape.parse_page(MALFORMED["block_in_heading"], "https://example.com/")
+        assert page.headings == [{"level": "h1", "text": "Headpara"}]
+
+    def test_fragment_without_body(self):
+        html = MALFORMED["fragment"]
+        assert scrape.parse_page(html, "https://example.com/").text == ""
+        assert scrape.extract_body_content(html) == ""
+        assert scrape.clean_body_content(html) == "frag\nx"
+
+
+class TestDocument:
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_text_skips_scripts_and_comments(self, backend):
+        document = html_backend.parse_document(FIXTURES["entities"], backend)
+        assert "document.write" not in document.text()
+        assert "nav" not in document.text()
+        assert document.title == "Café & Co"
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_valueless_attribute_is_empty_string(self, backend):
+        document = html_backend.parse_document('<a href>x</a><a>y</a>', backend)
+        anchors = [e for e in document.elements() if e.name == "a"]
+        assert [a.get("href") for a in anchors] == ["", None]
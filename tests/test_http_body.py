@@ -0,0 +1,99 @@
+import pytest
+
+import scrape
+from http_body import BodyTooLarge, decode_body, detect_charset, read_body
+
+
+class StreamResp:
+    def __init__(self, chunks, headers=None, status_code=200):
+        self.chunks = list(chunks)
+        self.headers = {"Content-Type": "text/html", **(headers or {})}
+        self.status_code = status_code
+        self.pulled = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=None):
+        for chunk in self.chunks:
+            self.pulled += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def text(self):
+        raise AssertionError("body must not be decoded via .text")
+
+
+class TestReadBody:
+    def test_joins_chunks(self):
+        assert read_body(StreamResp([b"<html>", b"", b"ok</html>"])) == b"<html>ok</html>"
+
+    def test_content_length_over_cap_rejected_before_reading(self):
+        resp = StreamResp([b"x"], headers={"Content-Length": "5000"})
+        with pytest.raises(BodyTooLarge):
+            read_body(resp, max_bytes=1000)
+        assert resp.pulled == 0 and resp.closed
+
+    def test_stream_aborted_once_cap_crossed(self):
+        resp = StreamResp([b"x" * 600] * 100)
+        with pytest.raises(BodyTooLarge):
+            read_body(resp, max_bytes=1000)
+        assert resp.pulled == 2 and resp.closed
+
+    def test_materialized_response(self):
+        class Plain:
+            headers = {}
+            text = "<html>ok</html>"
+        assert read_body(Plain()) == b"<html>ok</html>"
+
+
+class TestCharset:
+    def test_header_wins(self):
+        assert detect_charset(b'<meta charset="utf-8">', "text/html; charset=ISO-8859-1") == "ISO-8859-1"
+
+    def test_meta_charset(self):
+        assert detect_charset(b'<head><meta charset="windows-1251"></head>') == "windows-1251"
+        assert detect_charset(b'<meta http-equiv="Content-Type" content="text/html; charset=euc-jp">') == "euc-jp"
+
+    def test_bom(self):
+        assert detect_charset("﻿hi".encode("utf-8-sig")) == "utf-8-sig"
+
+    def test_unknown_declared_charset_ignored(self):
+        assert detect_charset(b"abc", "text/html; charset=bogus-42") is None
+
+    def test_decode_fallbacks(self):
+        assert decode_body("café".encode("utf-8")) == "café"
+        assert decode_body("café".encode("cp1252")) == "café"
+        assert decode_body("привет".encode("cp1251"), "text/html; charset=windows-1251") == "привет"
+
+
+class TestFetchTiersUseCap:
+    def test_oversized_page_fails_fast(self, monkeypatch):
+        monkeypatch.setattr(scrape, "MAX_PAGE_BYTES", 1000)
+        resp = StreamResp([b"<html>" + b"x" * 600] * 50)
+        result = scrape.classify_response(resp)
+        assert result.kind == scrape.FETCH_TOO_LARGE
+        assert scrape.FETCH_TOO_LARGE not in scrape.ESCALATE_KINDS
+        assert resp.pulled == 2
+
+    def test_non_html_body_not_read(self):
+        resp = StreamResp([b"%PDF"], headers={"Content-Type": "application/pdf"})
+        assert scrape.classify_response(resp).kind == scrape.FETCH_NON_HTML
+        assert resp.pulled == 0 and resp.closed
+
+    def test_decoded_with_meta_charset(self):
+        page = '<html><head><meta charset="iso-8859-1"></head><body>Ångström</body></html>'
+        resp = StreamResp([page.encode("iso-8859-1")])
+        assert "Ångström" in scrape.classify_response(resp).html
+
+    def test_requests_tier_streams(self, monkeypatch):
+        seen = {}
+
+        def fake_get(url, **kwargs):
+            seen.update(kwargs)
+            return StreamResp([b"<html>ok</html>"])
+
+        monkeypatch.setattr(scrape, "get_session", lambda: type("S", (), {"get": staticmethod(fake_get)})())
+        assert scrape.fetch_html("http://big.test/") == "<html>ok</html>"
+        assert seen["stream"] is True
@@ -0,0 +1,156 @@
+import sys
+import threading
+from http.client import HTTPMessage
+from types import SimpleNamespace
+
+import pytest
+import requests
+from requests.cookies import RequestsCookieJar, extract_cookies_to_jar
+
+import http_pool
+import scrape
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    http_pool.close_sessions()
+    monkeypatch.setattr(http_pool, "_pool_size", http_pool.DEFAULT_POOL_SIZE)
+    yield
+    http_pool.close_sessions()
+
+
+class TestGetSession:
+    def test_reused_across_calls(self):
+        assert http_pool.get_session() is http_pool.get_session()
+
+    def test_shared_across_threads(self):
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(http_pool.get_session())) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(s) for s in seen}) == 1
+
+    def test_server_cookies_are_not_kept(self):
+        headers = HTTPMessage()
+        headers["Set-Cookie"] = "sid=1; Path=/"
+        response = SimpleNamespace(_original_response=SimpleNamespace(msg=headers))
+        request = requests.Request("GET", "https://a.test/").prepare()
+        plain = RequestsCookieJar()
+        extract_cookies_to_jar(plain, request, response)
+        assert plain.get("sid") == "1"
+        session = http_pool.get_session()
+        extract_cookies_to_jar(session.cookies, request, response)
+        assert len(session.cookies) == 0
+
+    def test_explicit_cookies_still_sent(self):
+        prepared = http_pool.get_session().prepare_request(
+            requests.Request("GET", "https://a.test/", cookies={"sid": "1"}))
+        assert prepared.headers["Cookie"] == "sid=1"
+
+    def test_adapter_pool_size(self):
+        adapter = http_pool.get_session().get_adapter("https://example.com")
+        assert adapter._pool_maxsize == http_pool.DEFAULT_POOL_SIZE
+
+
+class TestEnsurePoolSize:
+    def test_grows_existing_session(self):
+        session = http_pool.get_session()
+        http_pool.ensure_pool_size(32)
+        assert http_pool.pool_size() == 32
+        assert session.get_adapter("https://example.com")._pool_maxsize == 32
+
+    def test_never_shrinks(self):
+        http_pool.ensure_pool_size(32)
+        http_pool.ensure_pool_size(2)
+        assert http_pool.pool_size() == 32
+
+    def test_downloader_sizes_pool_to_workers(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(scrape, "download_pdf", lambda link, folder: None)
+        scrape.download_pdfs_concurrent(["https://x.com/a.pdf"], str(tmp_path), max_workers=24)
+        assert http_pool.pool_size() == 24
+
+
+class TestImpersonateSessions:
+    @pytest.fixture
+    def fake_cffi(self, monkeypatch):
+        created = []
+
+        class FakeSession:
+            def __init__(self, impersonate=None, proxies=None):
+                self.proxies = proxies
+                self.cookies = {}
+                self.closed = False
+                created.append(self)
+
+            def close(self):
+                self.closed = True
+
+        monkeypatch.setitem(sys.modules, "curl_cffi", SimpleNamespace(requests=SimpleNamespace(Session=FakeSession)))
+        return created
+
+    def test_reused_per_proxy_and_domain(self, fake_cffi):
+        with http_pool.impersonate_session(None, "a.com") as a:
+            pass
+        with http_pool.impersonate_session(None, "a.com") as again:
+            assert again is a
+        with http_pool.impersonate_session("http://p1:8080", "a.com") as p:
+            assert p is not a
+            assert p.proxies == {"http": "http://p1:8080", "https": "http://p1:8080"}
+        with http_pool.impersonate_session(None, "b.com") as b:
+            assert b is not a
+        assert len(fake_cffi) == 3
+
+    def test_concurrent_checkouts_get_separate_sessions(self, fake_cffi):
+        with http_pool.impersonate_session(None, "a.com") as first:
+            with http_pool.impersonate_session(None, "a.com") as second:
+                assert first is not second
+        assert http_pool.impersonate_pool_stats() == {(None, "a.com"): 2}
+
+    def test_cookies_shared_within_pool(self, fake_cffi):
+        with http_pool.impersonate_session("p", "a.com") as first:
+            with http_pool.impersonate_session("p", "a.com") as second:
+                first.cookies["cf_clearance"] = "ok"
+        with http_pool.impersonate_session("p", "a.com") as session:
+            assert session.cookies["cf_clearance"] == "ok"
+        with http_pool.impersonate_session("p", "b.com") as other:
+            assert "cf_clearance" not in other.cookies
+        assert second is not None
+
+    def test_idle_sessions_bounded(self, fake_cffi, monkeypatch):
+        monkeypatch.setattr(http_pool, "MAX_IDLE_IMPERSONATE", 1)
+        with http_pool.impersonate_session(None, "a.com"):
+            with http_pool.impersonate_session(None, "a.com"):
+                pass
+        assert [s.closed for s in fake_cffi] == [True, False]
+        assert http_pool.impersonate_pool_stats() == {(None, "a.com"): 1}
+
+    def test_least_recent_pool_closed(self, fake_cffi, monkeypatch):
+        monkeypatch.setattr(http_pool, "MAX_IMPERSONATE_POOLS", 2)
+        for domain in ("a.com", "b.com", "c.com"):
+            with http_pool.impersonate_session(None, domain):
+                pass
+        assert set(http_pool.impersonate_pool_stats()) == {(None, "b.com"), (None, "c.com")}
+        assert fake_cffi[0].closed
+
+    def test_discard_drops_pool(self, fake_cffi):
+        with http_pool.impersonate_session("p", "a.com") as session:
+            session.cookies["banned"] = "1"
+        http_pool.discard_impersonate_sessions("p", "a.com")
+        assert session.closed
+        with http_pool.impersonate_session("p", "a.com") as fresh:
+            assert fresh.cookies == {}
+
+    def test_none_without_curl_cffi(self, monkeypatch):
+        import builtins
+        real_import = builtins.__import__
+
+        def no_cffi(name, *args, **kwargs):
+            if name.startswith("curl_cffi"):
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", no_cffi)
+        with http_pool.impersonate_session("http://p:1", "a.com") as session:
+            assert session is None
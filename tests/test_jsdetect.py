@@ -0,0 +1,119 @@
+import pytest
+
+import jsdetect
+import scrape
+from jsdetect import CHALLENGE, NEEDS_JS, STATIC, JSVerdictCache, classify_html, path_pattern
+
+ARTICLE = "<html><body><h1>Report</h1><p>" + "Plenty of server-rendered text. " * 40 + "</p></body></html>"
+SPA_SHELL = ('<html><head><script src="/static/js/main.js"></script></head>'
+             '<body><div id="root"></div></body></html>')
+NOSCRIPT_WALL = ('<html><body><noscript>You need to enable JavaScript to run this app.</noscript>'
+                 '<div id="main">' + "Loading the dashboard, please wait while we fetch things. " * 6 + '</div>'
+                 '<script src="/app.js"></script></body></html>')
+NEXT_SSR = ('<html><body><div id="__next"><main>' + "Server rendered product details. " * 40 +
+            '</main></div><script src="/_next/main.js"></script></body></html>')
+
+
+class TestClassifyHtml:
+    def test_static_article(self):
+        assert classify_html(ARTICLE)[0] == STATIC
+
+    def test_tiny_page_without_scripts_is_static(self):
+        assert classify_html("<html><body>OK</body></html>")[0] == STATIC
+
+    def test_empty_spa_root(self):
+        assert classify_html(SPA_SHELL)[0] == NEEDS_JS
+
+    def test_server_rendered_spa_is_static(self):
+        assert classify_html(NEXT_SSR)[0] == STATIC
+
+    def test_noscript_wall(self):
+        verdict, reason = classify_html(NOSCRIPT_WALL)
+        assert (verdict, reason) == (NEEDS_JS, "noscript wall")
+
+    def test_challenge_page(self):
+        assert classify_html("<html><title>Just a moment...</title></html>")[0] == CHALLENGE
+
+    def test_script_text_not_counted(self):
+        html = "<html><body><script>" + "var x = 1;" * 500 + "</script></body></html>"
+        assert jsdetect.visible_text_length(html) == 0
+        assert classify_html(html)[0] == NEEDS_JS
+
+    def test_confirm_verdict(self):
+        assert jsdetect.confirm_verdict(SPA_SHELL, ARTICLE) == NEEDS_JS
+        assert jsdetect.confirm_verdict(ARTICLE, ARTICLE) == STATIC
+
+
+class TestVerdictCache:
+    @pytest.mark.parametrize("url, pattern", [
+        ("https://x.com/", "/"),
+        ("https://x.com/products/123", "/products/{n}"),
+        ("https://x.com/Blog/some-post", "/blog/*"),
+        ("https://x.com/u/3f2a9c10-aa12-4b7e-9c1d-0123456789ab/edit", "/u/{id}/*"),
+    ])
+    def test_path_pattern(self, url, pattern):
+        assert path_pattern(url) == pattern
+
+    def test_shared_by_pattern_and_domain(self):
+        cache = JSVerdictCache()
+        cache.put("https://x.com/products/1", NEEDS_JS)
+        assert cache.get("https://x.com/products/2") == NEEDS_JS
+        assert cache.get("https://x.com/about") is None
+        assert cache.get("https://y.com/products/1") is None
+
+    def test_expires(self):
+        now = [0]
+        cache = JSVerdictCache(ttl=10, clock=lambda: now[0])
+        cache.put("https://x.com/a", STATIC)
+        now[0] = 10
+        assert cache.get("https://x.com/a") is None
+
+
+class TestCascadeUsesVerdicts:
+    @pytest.fixture
+    def tiers(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        calls = []
+        pages = {}
+
+        def plain(url, timeout=15):
+            calls.append("requests")
+            return pages.get(url, SPA_SHELL)
+
+        monkeypatch.setattr(scrape, "fetch_html_result", plain)
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result",
+                            lambda url, proxy=None: calls.append("impersonate") or None)
+        browser = lambda url: calls.append("browser") or ARTICLE
+        return calls, pages, browser
+
+    def test_spa_shell_rendered_and_pattern_remembered(self, tiers):
+        calls, _, browser = tiers
+        assert scrape.get_page_html("https://spa.test/app/1", browser_fetcher=browser) == ARTICLE
+        assert calls == ["requests", "browser"]
+        calls.clear()
+        scrape.get_page_html("https://spa.test/app/2", browser_fetcher=browser)
+        assert calls == ["browser"]
+
+    def test_static_pattern_never_escalates(self, tiers):
+        calls, pages, browser = tiers
+        pages["https://docs.test/guide/1"] = ARTICLE
+        pages["https://docs.test/guide/2"] = '<html><body>Short<script src="/a.js"></script></body></html>'
+        scrape.get_page_html("https://docs.test/guide/1", browser_fetcher=browser)
+        calls.clear()
+        html = scrape.get_page_html("https://docs.test/guide/2", browser_fetcher=browser)
+        assert "Short" in html
+        assert calls == ["requests"]
+
+    def test_false_positive_recorded_as_static(self, tiers):
+        calls, pages, _ = tiers
+        scrape.get_page_html("https://tiny.test/p/1", browser_fetcher=lambda url: SPA_SHELL)
+        assert scrape._js_verdicts.get("https://tiny.test/p/2") == STATIC
+
+    def test_render_failure_keeps_plain_html(self, tiers):
+        calls, _, _ = tiers
+
+        def broken(url):
+            raise RuntimeError("browser crashed")
+
+        assert scrape.get_page_html("https://spa.test/x", browser_fetcher=broken) == SPA_SHELL
+        assert scrape._js_verdicts.get("https://spa.test/x") is None
@@ -0,0 +1,81 @@
+import scrape
+from linkextract import CHUNK_CHARS, LinkExtractor, iter_links
+
+HTML = """
+<html><head><title>Reports</title><link rel="alternate" href="/feed.pdf"></head>
+<body>
+  <a href="/files/2024.pdf">Report 2024</a>
+  <a href="/files/2024.pdf#page=2">Same report</a>
+  <a href="/archive#top">Archive</a>
+  <a href="https://other.com/x">External</a>
+  <a href="">Empty</a>
+  <a name="anchor">No href</a>
+  <a href="/q?a=1&amp;b=2">Query</a>
+  <area href="/map.docx"/>
+  <script>var link = '<a href="/not-a-link">';</script>
+</body></html>
+"""
+
+
+class TestIterLinks:
+    def test_matches_parsed_page_hrefs(self):
+        urls = [link.url for link in scrape.iter_page_links(HTML, "https://example.com/reports/")]
+        assert urls == scrape.parse_page(HTML, "https://example.com/reports/").hrefs
+
+    def test_entities_resolved_and_script_ignored(self):
+        urls = [link.url for link in iter_links(HTML, "https://example.com/")]
+        assert "https://example.com/q?a=1&b=2" in urls
+        assert not any("not-a-link" in u for u in urls)
+
+    def test_classified(self):
+        links = list(scrape.iter_page_links(HTML, "https://example.com/"))
+        downloads = [link.url for link in links if link.download]
+        assert downloads == scrape.parse_page(HTML, "https://example.com/").download_links
+        assert {link.tag for link in links} == {"link", "a", "area"}
+
+    def test_chunks_split_inside_tags(self):
+        expected = list(iter_links(HTML, "https://example.com/"))
+        chunks = [HTML[i:i + 7] for i in range(0, len(HTML), 7)]
+        assert list(iter_links(chunks, "https://example.com/")) == expected
+
+    def test_yields_before_whole_page_is_read(self):
+        fed = []
+
+        def chunks():
+            for chunk in ('<a href="/one">1</a>', '<a href="/two">2</a>', '<p>tail</p>'):
+                fed.append(chunk)
+                yield chunk
+
+        links = iter_links(chunks(), "https://example.com/")
+        assert next(links).url == "https://example.com/one"
+        assert len(fed) == 1
+
+    def test_large_page_is_fed_in_slices(self, monkeypatch):
+        sizes = []
+        real_feed = LinkExtractor.feed
+        monkeypatch.setattr(LinkExtractor, "feed", lambda self, data: sizes.append(len(data)) or real_feed(self, data))
+        page = '<a href="/x">x</a>' * (CHUNK_CHARS // 10)
+        assert len(list(iter_links(page, "https://example.com/"))) == CHUNK_CHARS // 10
+        assert max(sizes) <= CHUNK_CHARS and len(sizes) > 1
+
+    def test_empty(self):
+        assert list(iter_links("", "https://example.com/")) == []
+        assert list(iter_links(None, "https://example.com/")) == []
+
+
+class TestCrawlUsesStreamingLinks:
+    def test_crawl_website_does_not_build_a_dom(self, monkeypatch):
+        pages = {
+            "https://example.com/": '<a href="/a">A</a><a href="/doc.pdf">Doc</a>',
+            "https://example.com/a": '<a href="/b.pdf">B</a>',
+        }
+        monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: pages[url])
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+
+        def no_dom(*args, **kwargs):
+            raise AssertionError("crawl_website built a DOM")
+
+        monkeypatch.setattr(scrape, "parse_document", no_dom)
+        result = scrape.crawl_website("https://example.com/", max_depth=1)
+        assert result["pages"] == ["https://example.com/", "https://example.com/a"]
+        assert sorted(result["pdf_links"]) == ["https://example.com/b.pdf", "https://example.com/doc.pdf"]
@@ -0,0 +1,103 @@
+import random
+
+import scrape
+from linkextract import LinkExtractor
+from neardup import SimHashIndex, hamming, simhash
+
+random.seed(7)
+VOCAB = [f"word{i}" for i in range(2000)]
+ARTICLE = " ".join(random.choice(VOCAB) for _ in range(400))
+OTHER = " ".join(random.choice(VOCAB) for _ in range(400))
+
+
+def page(body, links=""):
+    return f"<html><head><title>t</title></head><body><p>{body}</p>{links}<script>var x = 1;</script></body></html>"
+
+
+class TestSimHash:
+    def test_near_duplicates_are_close(self):
+        variant = ARTICLE + " Printed on 2024-05-01"
+        assert hamming(simhash(ARTICLE), simhash(variant)) <= 3
+
+    def test_unrelated_texts_are_far(self):
+        assert hamming(simhash(ARTICLE), simhash(OTHER)) > 10
+
+    def test_short_text_not_fingerprinted(self):
+        assert simhash("just a few words here") is None
+        assert simhash("") is None
+
+
+class TestSimHashIndex:
+    def test_banded_lookup_matches_brute_force(self):
+        index = SimHashIndex(max_distance=3)
+        stored = [random.getrandbits(64) for _ in range(300)]
+        for i, fp in enumerate(stored):
+            index.add(i, fp)
+        for base in stored[:50]:
+            probe = base
+            for bit in random.sample(range(64), random.randint(0, 5)):
+                probe ^= 1 << bit
+            expected = min((hamming(probe, fp), i) for i, fp in enumerate(stored))
+            match = index.find(probe)
+            if expected[0] <= 3:
+                assert match is not None and match[1] == expected[0]
+            else:
+                assert match is None
+
+    def test_check_reports_first_page(self):
+        index = SimHashIndex()
+        assert index.check("/a", ARTICLE) is None
+        assert index.check("/a?print=1", ARTICLE + " print view") == "/a"
+        assert index.check("/b", OTHER) is None
+        assert index.check("/tiny", "too short") is None
+        assert len(index) == 2
+
+
+class TestPageText:
+    def test_scanner_text_matches_clean_body_content(self):
+        html = page(ARTICLE[:200] + " &amp; more", '<a href="/x">Link text</a>\n<style>p{}</style>')
+        scanner = LinkExtractor("https://e.test/", collect_text=True)
+        list(scanner.links(html))
+        assert scanner.text == scrape.clean_body_content(scrape.extract_body_content(html))
+
+
+class TestCrawlSkipsDuplicateOutlinks:
+    SITE = {
+        "https://e.test/": page("Home page", '<a href="/article">A</a><a href="/article/print">Print</a>'),
+        "https://e.test/article": page(ARTICLE, '<a href="/related">Related</a>'),
+        "https://e.test/article/print": page(ARTICLE + " Printed from e.test", '<a href="/print-only">x</a>'
+                                             '<a href="/doc.pdf">PDF</a>'),
+        "https://e.test/related": page(OTHER),
+        "https://e.test/print-only": page(OTHER + " extra"),
+    }
+
+    def crawl(self, monkeypatch, **kwargs):
+        monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: self.SITE[url])
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+        return scrape.crawl_website("https://e.test/", max_depth=2, concurrency=1, **kwargs)
+
+    def test_duplicate_outlinks_skipped(self, monkeypatch):
+        result = self.crawl(monkeypatch)
+        assert "https://e.test/related" in result["pages"]
+        assert "https://e.test/print-only" not in result["pages"]
+        assert result["pdf_links"] == ["https://e.test/doc.pdf"]  # documents are still collected
+        assert result["stats"]["near_duplicates"] == 1
+
+    def test_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(scrape, "CRAWL_SKIP_NEAR_DUPLICATES", False)
+        result = self.crawl(monkeypatch)
+        assert "https://e.test/print-only" in result["pages"]
+        assert result["stats"]["near_duplicates"] == 0
+
+    def test_smart_crawl_skips_ranking_duplicates(self, monkeypatch):
+        monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: self.SITE[url])
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+        ranked = []
+
+        def ranker(goal, candidates):
+            ranked.append([u for u, _ in candidates])
+            return list(range(len(candidates)))
+
+        result = scrape.smart_crawl("https://e.test/", "articles", max_depth=2, ranker=ranker, concurrency=1)
+        assert "https://e.test/print-only" not in result["pages"]
+        assert not any("https://e.test/print-only" in urls for urls in ranked)
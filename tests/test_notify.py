@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 import notify
 
 
@@ -34,7 +36,7 @@ class TestNotifyWebhook:
             captured["json"] = json
             return FakeResp()
 
-        monkeypatch.setattr(notify.requests, "post", fake_post)
+        monkeypatch.setattr(notify, "get_session", lambda: SimpleNamespace(post=fake_post))
         ok = notify.notify_webhook("https://hooks.slack.com/x", "Hello change")
         assert ok is True
         assert captured["url"] == "https://hooks.slack.com/x"
@@ -45,7 +47,7 @@ class TestNotifyWebhook:
         def boom(url, json=None, timeout=None):
             raise Exception("connection refused")
 
-        monkeypatch.setattr(notify.requests, "post", boom)
+        monkeypatch.setattr(notify, "get_session", lambda: SimpleNamespace(post=boom))
         assert notify.notify_webhook("https://x", "msg") is False
 
     def test_no_webhook_url_returns_false(self):
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+
+import pytest
+
+import page_cache
+import scrape
+from page_cache import PageCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PageCache(str(tmp_path / "c"), ttl=60)
+
+
+class TestPageCache:
+    def test_roundtrip_and_meta(self, cache):
+        cache.put("http://a/1", "<html>one</html>", {"etag": '"e1"'})
+        assert cache.get("http://a/1") == "<html>one</html>"
+        assert cache.meta("http://a/1")["etag"] == '"e1"'
+
+    def test_sharded_compressed_layout(self, cache):
+        html = "<html>" + "repeat " * 5000 + "</html>"
+        cache.put("http://a/big", html)
+        path = cache.path("http://a/big")
+        rel = os.path.relpath(path, cache.root).split(os.sep)
+        assert len(rel) == 3 and len(rel[0]) == 2 and len(rel[1]) == 2
+        assert os.path.getsize(path) < len(html) / 10
+
+    def test_ttl_expiry(self, cache):
+        cache.put("http://a/old", "<html>old</html>")
+        stale = time.time() - 120
+        os.utime(cache.path("http://a/old"), (stale, stale))
+        assert cache.get("http://a/old") is None
+        assert cache.meta("http://a/old") is None  # stored without metadata
+
+    def test_memory_tier_serves_repeat_reads(self, cache):
+        cache.put("http://a/hot", "<html>hot</html>")
+        cache.get("http://a/hot")
+        cache.get("http://a/hot")
+        stats = cache.stats()
+        assert stats["memory_hits"] == 2
+        assert stats["disk_hits"] == 0
+
+    def test_memory_tier_notices_disk_changes(self, tmp_path):
+        root = str(tmp_path / "shared")
+        a, b = PageCache(root), PageCache(root)
+        a.put("http://a/p", "<html>v1</html>")
+        assert a.get("http://a/p") == "<html>v1</html>"
+        time.sleep(0.01)
+        b.put("http://a/p", "<html>v2</html>")
+        assert a.get("http://a/p") == "<html>v2</html>"
+
+    def test_disk_reads_do_not_hold_the_lock(self, tmp_path, monkeypatch):
+        root = str(tmp_path / "c")
+        PageCache(root).put("http://a/slow", "<html>slow</html>")
+        PageCache(root).put("http://a/fast", "<html>fast</html>")
+        cache = PageCache(root)  # empty memory tier: both gets go to disk
+        decompressing, release = threading.Event(), threading.Event()
+        real = page_cache.decompress
+
+        def decompress(codec, payload):
+            if b"slow" in real(codec, payload):
+                decompressing.set()
+                release.wait(5)
+            return real(codec, payload)
+
+        monkeypatch.setattr(page_cache, "decompress", decompress)
+        results = []
+        slow = threading.Thread(target=lambda: results.append(cache.get("http://a/slow")))
+        slow.start()
+        try:
+            assert decompressing.wait(5)
+            assert cache.get("http://a/fast") == "<html>fast</html>"  # not queued behind slow
+        finally:
+            release.set()
+            slow.join()
+        assert results == ["<html>slow</html>"]
+        assert cache.stats()["disk_hits"] == 2
+
+    def test_lru_eviction_over_budget(self, tmp_path):
+        cache = PageCache(str(tmp_path / "c"), max_bytes=1)
+        cache.put("http://a/1", "<html>1</html>")
+        budget = os.path.getsize(cache.path("http://a/1")) * 2 + 10
+        cache = PageCache(str(tmp_path / "c"), max_bytes=budget)
+        cache.put("http://a/2", "<html>2</html>")
+        cache.get("http://a/1")  # 1 is now more recently used than 2
+        cache.put("http://a/3", "<html>3</html>")
+        assert cache.get("http://a/2") is None
+        assert cache.get("http://a/1") == "<html>1</html>"
+        assert cache.get("http://a/3") == "<html>3</html>"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["disk_bytes"] <= budget
+
+    def test_refresh_keeps_body_and_merges_meta(self, cache):
+        cache.put("http://a/r", "<html>r</html>", {"etag": '"e1"', "tier": "requests"})
+        stale = time.time() - 120
+        os.utime(cache.path("http://a/r"), (stale, stale))
+        assert cache.refresh("http://a/r", {"etag": '"e2"'}) == "<html>r</html>"
+        assert cache.get("http://a/r") == "<html>r</html>"
+        assert cache.meta("http://a/r")["etag"] == '"e2"'
+        assert cache.meta("http://a/r")["tier"] == "requests"
+
+    def test_no_temp_files_left(self, cache):
+        cache.put("http://a/1", "<html>1</html>")
+        leftovers = [f for _, _, files in os.walk(cache.root) for f in files if f.endswith(".tmp")]
+        assert leftovers == []
+
+    def test_removes_legacy_flat_files(self, tmp_path):
+        root = tmp_path / "c"
+        root.mkdir()
+        (root / "0123abcd.html").write_text("<html>legacy</html>")
+        PageCache(str(root)).stats()
+        assert not (root / "0123abcd.html").exists()
+
+    def test_zlib_fallback(self, cache, monkeypatch):
+        monkeypatch.setattr(page_cache, "ZSTD_AVAILABLE", False)
+        cache.put("http://a/z", "<html>z</html>")
+        cache._memory.clear()
+        assert cache.get("http://a/z") == "<html>z</html>"
+
+
+class TestScrapeCacheStats:
+    def test_counts_hits_and_misses(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        scrape._cache_get("http://t.local/none")
+        scrape._cache_put("http://t.local/a", "<html>a</html>")
+        scrape._cache_get("http://t.local/a")
+        stats = scrape.cache_stats()
+        assert stats["misses"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["disk_entries"] == 1
@@ -0,0 +1,82 @@
+import scrape
+
+HTML = """
+<html><head><title>Reports</title><link rel="alternate" href="/feed.pdf"></head>
+<body>
+  <h1>Annual reports</h1>
+  <p>Intro text.</p><p>   </p>
+  <h2>2024</h2>
+  <p>Second <b>paragraph</b>.</p>
+  <img src="/logo.png" alt="Logo"><img alt="no src">
+  <a href="/files/2024.pdf">Report 2024</a>
+  <a href="/files/2024.pdf#page=2">Same report</a>
+  <a href="/archive#top">Archive</a>
+  <a href="https://other.com/x">External</a>
+  <a href="">Empty</a>
+  <area href="/map.docx">
+  <script>var hidden = "not text";</script>
+  <style>p { color: red; }</style>
+</body></html>
+"""
+
+
+class TestParsedPage:
+    def setup_method(self):
+        self.page = scrape.parse_page(HTML, "https://example.com/reports/")
+
+    def test_structure(self):
+        page = self.page
+        assert page.title == "Reports"
+        assert page.headings == [{"level": "h1", "text": "Annual reports"}, {"level": "h2", "text": "2024"}]
+        assert page.paragraphs == ["Intro text.", "Secondparagraph."]  # get_text(strip=True), as before
+        assert page.images == [{"src": "https://example.com/logo.png", "alt": "Logo"}]
+
+    def test_links_and_downloads(self):
+        page = self.page
+        assert [link["text"] for link in page.links] == ["Report 2024", "Same report", "Archive", "External"]
+        assert page.download_links == ["https://example.com/feed.pdf", "https://example.com/files/2024.pdf",
+                                       "https://example.com/files/2024.pdf#page=2", "https://example.com/map.docx"]
+        assert "https://example.com/files/2024.pdf#page=2" in page.hrefs
+
+    def test_candidates_same_domain_deduped(self):
+        urls = [u for u, _ in self.page.candidates]
+        assert urls == ["https://example.com/files/2024.pdf", "https://example.com/archive"]
+
+    def test_text_matches_clean_body_content(self):
+        expected = scrape.clean_body_content(scrape.extract_body_content(HTML))
+        assert self.page.text == expected
+        assert "hidden" not in self.page.text
+
+    def test_empty_html(self):
+        page = scrape.parse_page("", "https://example.com/")
+        assert (page.title, page.links, page.text) == ("", [], "")
+
+
+class TestCallersParseOnce:
+    def count_parses(self, monkeypatch):
+        count = [0]
+        real = scrape.parse_document
+
+        def counting(*args, **kwargs):
+            count[0] += 1
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(scrape, "parse_document", counting)
+        return count
+
+    def test_smart_crawl_one_parse_per_page(self, monkeypatch):
+        monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: HTML)
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+        count = self.count_parses(monkeypatch)
+        result = scrape.smart_crawl("https://example.com/", "reports", max_depth=1, max_pages=2,
+                                    ranker=lambda goal, cands: [0])
+        assert len(result["pages"]) == 2
+        assert count[0] == 2
+
+    def test_scrape_website_content_one_parse(self, monkeypatch):
+        monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: HTML)
+        count = self.count_parses(monkeypatch)
+        data = scrape.scrape_website_content("https://example.com/")
+        assert count[0] == 1
+        assert data["title"] == "Reports"
+        assert len(data["links"]) == 4
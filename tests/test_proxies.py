@@ -0,0 +1,230 @@
+from contextlib import nullcontext
+
+import scrape
+import proxies
+from proxies import ProxyHealthStore, ProxyRotator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail(rotator, proxy, times=proxies.FAILURE_THRESHOLD):
+    for _ in range(times):
+        rotator.report(proxy, ok=False)
+
+
+class TestProxyRotatorHealth:
+    def test_scrape_reexports_rotator(self):
+        assert scrape.ProxyRotator is ProxyRotator
+        assert scrape.load_proxies is proxies.load_proxies
+
+    def test_prefers_healthy_proxy(self):
+        r = ProxyRotator(["good", "flaky"])
+        for _ in range(2):
+            r.report("flaky", ok=False)
+            r.report("good", ok=True, latency=0.2)
+        picks = [r.next() for _ in range(20)]
+        assert picks.count("good") > picks.count("flaky") > 0
+
+    def test_slow_proxy_gets_fewer_picks(self):
+        r = ProxyRotator(["fast", "slow"])
+        r.report("fast", ok=True, latency=0.1)
+        r.report("slow", ok=True, latency=20)
+        picks = [r.next() for _ in range(20)]
+        assert picks.count("fast") > picks.count("slow")
+
+    def test_breaker_benches_after_consecutive_failures(self):
+        clock = FakeClock()
+        r = ProxyRotator(["dead", "ok"], clock=clock)
+        fail(r, "dead")
+        assert r.health("dead")["benched"]
+        assert {r.next() for _ in range(5)} == {"ok"}
+
+    def test_success_resets_failure_streak(self):
+        r = ProxyRotator(["p"])
+        fail(r, "p", proxies.FAILURE_THRESHOLD - 1)
+        r.report("p", ok=True)
+        fail(r, "p", proxies.FAILURE_THRESHOLD - 1)
+        assert not r.health("p")["benched"]
+
+    def test_all_benched_goes_direct(self):
+        r = ProxyRotator(["dead"], clock=FakeClock())
+        fail(r, "dead")
+        assert r.next() is None
+
+    def test_benched_proxy_retested_after_cooldown(self):
+        clock = FakeClock()
+        r = ProxyRotator(["dead", "ok"], clock=clock)
+        fail(r, "dead")
+        clock.now += proxies.COOLDOWN
+        assert r.next() == "dead"           # single half-open trial
+        assert r.next() == "ok"             # no second trial while the first is in flight
+        r.report("dead", ok=True)
+        assert not r.health("dead")["benched"]
+
+    def test_failed_trial_doubles_cooldown(self):
+        clock = FakeClock()
+        r = ProxyRotator(["dead"], clock=clock)
+        fail(r, "dead")
+        clock.now += proxies.COOLDOWN
+        assert r.next() == "dead"
+        r.report("dead", ok=False)
+        clock.now += proxies.COOLDOWN
+        assert r.next() is None
+        clock.now += proxies.COOLDOWN
+        assert r.next() == "dead"
+
+    def test_ban_counts_as_failure(self):
+        r = ProxyRotator(["p"])
+        r.report("p", ok=True, banned=True)
+        assert r.health("p")["bans"] == 1
+        assert r.health("p")["failures"] == 1
+
+    def test_unknown_proxy_report_ignored(self):
+        ProxyRotator(["p"]).report("other", ok=False)
+
+    def test_health_persists(self, tmp_path):
+        store = ProxyHealthStore(str(tmp_path / "proxies.db"))
+        clock = FakeClock()
+        fail(ProxyRotator(["dead", "ok"], store=store, clock=clock), "dead")
+        r = ProxyRotator(["dead", "ok"], store=store, clock=clock)
+        assert r.health("dead")["benched"]
+        assert r.next() == "ok"
+
+    def test_health_saves_are_throttled(self, tmp_path):
+        saved = []
+
+        class Store(ProxyHealthStore):
+            def save_many(self, rows):
+                saved.extend(rows)
+                super().save_many(rows)
+
+        store = Store(str(tmp_path / "proxies.db"))
+        clock = FakeClock()
+        r = ProxyRotator(["p", "q"], store=store, clock=clock, save_interval=30)
+        for _ in range(5):
+            r.report("p", ok=True, latency=0.2)
+        assert saved == []
+        fail(r, "q")  # benching is saved at once
+        assert [row[0] for row in saved] == ["q"]
+        clock.now += 30
+        r.report("p", ok=True, latency=0.2)
+        assert [row[0] for row in saved] == ["q", "p"]
+        r.report("p", ok=False)
+        r.flush()
+        assert saved[-1][0] == "p" and saved[-1][3] == 1  # one consecutive failure
+        r.flush()
+        assert len(saved) == 3
+        assert ProxyRotator(["p", "q"], store=store, clock=clock).health("p")["failures"] == 1
+
+
+class TestStickyProxies:
+    def test_domain_keeps_its_proxy(self):
+        r = ProxyRotator(["a", "b"])
+        assert [r.for_domain("x.com") for _ in range(3)] == ["a", "a", "a"]
+        assert r.for_domain("y.com") == "b"
+
+    def test_rotates_after_request_budget(self):
+        r = ProxyRotator(["a", "b"], sticky_requests=2)
+        assert [r.for_domain("x.com") for _ in range(3)] == ["a", "a", "b"]
+
+    def test_rotates_after_age(self):
+        clock = FakeClock()
+        r = ProxyRotator(["a", "b"], clock=clock, sticky_age=60)
+        assert r.for_domain("x.com") == "a"
+        clock.now += 61
+        assert r.for_domain("x.com") == "b"
+
+    def test_ban_rotates_only_that_domain(self):
+        r = ProxyRotator(["a", "b"])
+        assert r.for_domain("x.com") == "a"
+        assert r.for_domain("y.com") == "b"
+        assert r.for_domain("z.com") == "a"
+        r.report("a", ok=False, banned=True, domain="x.com")
+        assert r.for_domain("x.com") == "b"
+        assert r.for_domain("z.com") == "a"
+
+    def test_ban_rotation_can_be_disabled(self):
+        r = ProxyRotator(["a", "b"], rotate_on_ban=False)
+        r.for_domain("x.com")
+        r.report("a", ok=False, banned=True, domain="x.com")
+        assert r.for_domain("x.com") == "a"
+
+    def test_benched_proxy_releases_domains(self):
+        r = ProxyRotator(["a", "b"], clock=FakeClock())
+        assert r.for_domain("x.com") == "a"
+        fail(r, "a")
+        assert r.for_domain("x.com") == "b"
+
+    def test_manual_rotate(self):
+        r = ProxyRotator(["a", "b"])
+        r.for_domain("x.com")
+        r.rotate("x.com")
+        assert r.for_domain("x.com") == "b"
+
+    def test_empty_pool(self):
+        assert ProxyRotator([]).for_domain("x.com") is None
+
+
+class TestImpersonateReportsProxy:
+    def test_outcome_reported_to_rotator(self, monkeypatch):
+        class FakeResp:
+            status_code = 403
+            headers = {"Content-Type": "text/html"}
+            text = "denied"
+
+        class FakeSession:
+            def get(self, *a, **k):
+                return FakeResp()
+
+        rotator = ProxyRotator(["http://p1:8080"])
+        monkeypatch.setattr(scrape, "_proxy_rotator", rotator)
+        monkeypatch.setattr(scrape, "impersonate_session", lambda proxy=None, domain=None: nullcontext(FakeSession()))
+        monkeypatch.setattr(scrape, "discard_impersonate_sessions", lambda proxy, domain: None)
+        result = scrape.fetch_html_impersonate_result("http://site.test/", proxy="http://p1:8080")
+        assert result.kind == scrape.FETCH_BLOCKED
+        health = rotator.health("http://p1:8080")
+        assert health["bans"] == 1 and health["latency"] is not None
+
+    def test_proxy_errors_count_against_proxy(self, monkeypatch):
+        class FakeSession:
+            def get(self, *a, **k):
+                raise RuntimeError("proxy CONNECT aborted")
+
+        rotator = ProxyRotator(["http://p1:8080"])
+        monkeypatch.setattr(scrape, "_proxy_rotator", rotator)
+        monkeypatch.setattr(scrape, "impersonate_session", lambda proxy=None, domain=None: nullcontext(FakeSession()))
+        scrape.fetch_html_impersonate_result("http://site.test/", proxy="http://p1:8080")
+        assert rotator.health("http://p1:8080")["failures"] == 1
+
+    def test_block_discards_domain_sessions(self, monkeypatch):
+        class FakeResp:
+            status_code = 403
+            headers = {}
+            text = "denied"
+
+        class FakeSession:
+            def get(self, *a, **k):
+                return FakeResp()
+
+        discarded = []
+        monkeypatch.setattr(scrape, "impersonate_session", lambda proxy=None, domain=None: nullcontext(FakeSession()))
+        monkeypatch.setattr(scrape, "discard_impersonate_sessions", lambda proxy, domain: discarded.append((proxy, domain)))
+        scrape.fetch_html_impersonate_result("http://site.test/a", proxy="http://p1:8080")
+        assert discarded == [("http://p1:8080", "site.test")]
+
+    def test_cascade_uses_sticky_proxy(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(scrape, "_proxy_rotator", ProxyRotator(["p1", "p2"]))
+        monkeypatch.setattr(scrape, "fetch_html_result", lambda url, timeout=15: None)
+        used = []
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result",
+                            lambda url, proxy=None: used.append(proxy) or "<html>ok</html>")
+        for i in range(3):
+            scrape.get_page_html(f"http://sticky.test/{i}")
+        assert used == ["p1", "p1", "p1"]
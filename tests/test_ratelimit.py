@@ -0,0 +1,227 @@
+import threading
+
+import pytest
+
+import scrape
+import ratelimit
+from ratelimit import HostRateLimiter, RateStore, host_of, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def limiter(clock, **kwargs):
+    return HostRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestHostRateLimiter:
+    def test_host_of(self):
+        assert host_of("https://Example.COM/a?b") == "example.com"
+        assert host_of("example.com") == "example.com"
+
+    def test_burst_then_spaced(self, clock):
+        rl = limiter(clock, rate=1.0, burst=2)
+        waits = [rl.reserve("a") for _ in range(4)]
+        assert waits == [0, 0, 1.0, 2.0]
+
+    def test_hosts_are_independent(self, clock):
+        rl = limiter(clock, rate=1.0, burst=1)
+        assert rl.reserve("a") == 0
+        assert rl.reserve("b") == 0
+        assert rl.reserve("a") == 1.0
+
+    def test_idle_host_refills(self, clock):
+        rl = limiter(clock, rate=1.0, burst=2)
+        for _ in range(3):
+            rl.reserve("a")
+        clock.now = 10
+        assert rl.reserve("a") == 0
+        assert rl.reserve("a") == 0
+
+    def test_acquire_sleeps_for_reserved_wait(self, clock):
+        rl = limiter(clock, rate=2.0, burst=1, max_in_flight=5)
+        for _ in range(3):
+            with rl.slot("http://a.test/x"):
+                pass
+        assert clock.sleeps == [0.5, 0.5]
+
+    def test_slot_released_on_exception(self, clock):
+        rl = limiter(clock, max_in_flight=1)
+        with pytest.raises(RuntimeError):
+            with rl.slot("http://a.test/"):
+                assert rl.in_flight("a.test") == 1
+                raise RuntimeError("boom")
+        assert rl.in_flight("a.test") == 0
+
+    def test_max_in_flight_blocks_same_host_only(self):
+        rl = HostRateLimiter(rate=1000, burst=100, max_in_flight=1, sleep=lambda s: None)
+        rl.acquire("http://a.test/1")
+        other = threading.Event()
+        same = threading.Event()
+        threading.Thread(target=lambda: (rl.acquire("http://b.test/"), other.set())).start()
+        threading.Thread(target=lambda: (rl.acquire("http://a.test/2"), same.set())).start()
+        assert other.wait(1)
+        assert not same.wait(0.1)
+        rl.release("http://a.test/1")
+        assert same.wait(1)
+
+
+class TestAdaptiveRate:
+    def test_backs_off_on_429_and_503(self, clock):
+        rl = limiter(clock, rate=1.0)
+        assert rl.observe("a.test", 429) == 0.5
+        assert rl.observe("a.test", 503) == 0.25
+        assert rl.host_rate("b.test") == 1.0
+
+    def test_backoff_floor(self, clock):
+        rl = limiter(clock, rate=0.1, min_rate=0.05)
+        for _ in range(5):
+            rl.observe("a.test", 429)
+        assert rl.host_rate("a.test") == 0.05
+
+    def test_ramps_up_while_fast_and_healthy(self, clock):
+        rl = limiter(clock, rate=1.0, max_rate=1.1)
+        rl.observe("a.test", 200, latency=0.1)
+        assert rl.host_rate("a.test") == pytest.approx(1.0 + ratelimit.INCREASE_STEP)
+        for _ in range(10):
+            rl.observe("a.test", 200, latency=0.1)
+        assert rl.host_rate("a.test") == 1.1
+
+    def test_slow_response_eases_off(self, clock):
+        rl = limiter(clock, rate=1.0)
+        rl.observe("a.test", 200, latency=ratelimit.SLOW_LATENCY + 1)
+        assert rl.host_rate("a.test") == pytest.approx(ratelimit.SLOW_FACTOR)
+
+    def test_client_errors_leave_rate_alone(self, clock):
+        rl = limiter(clock, rate=1.0)
+        rl.observe("a.test", 404, latency=0.1)
+        assert rl.host_rate("a.test") == 1.0
+
+    def test_retry_after_pauses_host(self, clock):
+        rl = limiter(clock, rate=10.0, burst=5)
+        rl.observe("a.test", 429, retry_after="30")
+        assert rl.reserve("a.test") == 30
+        assert rl.reserve("b.test") == 0
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("12") == 12
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412480) == 30
+        assert parse_retry_after("99999") == ratelimit.MAX_RETRY_AFTER
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_slot_observe_measures_latency(self, clock):
+        rl = limiter(clock, rate=1.0)
+        with rl.slot("http://a.test/") as slot:
+            clock.now += ratelimit.SLOW_LATENCY + 1
+            slot.observe(200)
+        assert rl.host_rate("a.test") < 1.0
+
+    def test_learned_rate_persists(self, clock, tmp_path):
+        store = RateStore(str(tmp_path / "rates.db"))
+        limiter(clock, rate=1.0, store=store).observe("a.test", 429)
+        assert limiter(clock, rate=1.0, store=store).host_rate("a.test") == 0.5
+        assert limiter(clock, rate=1.0, store=store).host_rate("b.test") == 1.0
+
+    def test_ramp_up_saves_are_throttled(self, clock, tmp_path):
+        saved = []
+
+        class Store(RateStore):
+            def save_many(self, rates):
+                saved.extend(rates)
+                super().save_many(rates)
+
+        store = Store(str(tmp_path / "rates.db"))
+        rl = limiter(clock, rate=1.0, store=store, save_interval=30)
+        for _ in range(10):
+            rl.observe("a.test", 200, latency=0.1)
+        assert saved == []
+        clock.now += 30
+        rl.observe("a.test", 200, latency=0.1)
+        assert len(saved) == 1
+        rl.observe("a.test", 200, latency=0.1)
+        rl.observe("a.test", 503)  # a backoff is saved at once
+        assert len(saved) == 2
+        rl.observe("a.test", 200, latency=0.1)
+        rl.flush()
+        assert saved[-1] == ("a.test", rl.host_rate("a.test"))
+        rl.flush()
+        assert len(saved) == 3
+        assert limiter(clock, store=store).host_rate("a.test") == rl.host_rate("a.test")
+
+    def test_new_host_lookup_does_not_block_other_hosts(self, clock, tmp_path):
+        loading, release = threading.Event(), threading.Event()
+
+        class SlowStore(RateStore):
+            def load(self, host):
+                if host == "slow.test":
+                    loading.set()
+                    release.wait(5)
+                return super().load(host)
+
+        rl = limiter(clock, rate=1.0, store=SlowStore(str(tmp_path / "rates.db")))
+        worker = threading.Thread(target=rl.host_rate, args=("slow.test",))
+        worker.start()
+        try:
+            assert loading.wait(5)
+            host = rl.acquire("fast.test")  # would deadlock on the slow load if it held the lock
+            rl.release(host)
+        finally:
+            release.set()
+            worker.join()
+
+
+class TestFetchPathsUseLimiter:
+    def test_requests_tier_takes_a_slot(self, monkeypatch):
+        seen = []
+
+        class Spy(HostRateLimiter):
+            def acquire(self, url_or_host):
+                seen.append(url_or_host)
+                return super().acquire(url_or_host)
+
+        class FakeResp:
+            status_code = 200
+            headers = {"Content-Type": "text/html"}
+            text = "<html>ok</html>"
+
+        monkeypatch.setattr(scrape, "_rate_limiter", Spy(sleep=lambda s: None))
+        monkeypatch.setattr(scrape, "get_session",
+                            lambda: type("S", (), {"get": lambda self, *a, **k: FakeResp()})())
+        assert scrape.fetch_html("http://polite.test/page") == "<html>ok</html>"
+        assert seen == ["http://polite.test/page"]
+        assert scrape._rate_limiter.in_flight("polite.test") == 0
+
+    def test_429_response_slows_host(self, monkeypatch):
+        class FakeResp:
+            status_code = 429
+            headers = {"Retry-After": "5"}
+            text = "slow down"
+
+        monkeypatch.setattr(scrape, "get_session",
+                            lambda: type("S", (), {"get": lambda self, *a, **k: FakeResp()})())
+        before = scrape._rate_limiter.host_rate("busy.test")
+        assert scrape.fetch_html_result("http://busy.test/").ok is False
+        assert scrape._rate_limiter.host_rate("busy.test") == before * ratelimit.BACKOFF_FACTOR
+
+    def test_crawl_no_longer_sleeps_globally(self, monkeypatch):
+        assert not hasattr(scrape, "rate_limit")
+        monkeypatch.setattr(scrape, "get_page_html",
+                            lambda url, **kw: '<html><body><a href="/b">b</a></body></html>')
+        result = scrape.crawl_website("http://c.test/", max_depth=1, max_pages=3)
+        assert len(result["pages"]) >= 2
@@ -0,0 +1,222 @@
+import json
+from types import SimpleNamespace
+
+import render
+import scrape
+
+
+class FakePage:
+    def __init__(self, fail=None):
+        self.calls = []
+        self.handler = None
+        self.fail = fail
+
+    def _call(self, name, *args):
+        self.calls.append((name,) + args)
+        if self.fail == name:
+            raise TimeoutError("Timeout 10000ms exceeded")
+
+    def route(self, pattern, handler):
+        self.handler = handler
+
+    def on(self, event, handler):
+        self.listeners = getattr(self, "listeners", {})
+        self.listeners[event] = handler
+
+    def goto(self, url, **kwargs):
+        self._call("goto", url)
+
+    def wait_for_selector(self, selector, timeout=None):
+        self._call("wait_for_selector", selector)
+
+    def wait_for_load_state(self, state, timeout=None):
+        self._call("wait_for_load_state", state)
+
+    def wait_for_timeout(self, ms):
+        self._call("wait_for_timeout", ms)
+
+    def evaluate(self, script, arg=None):
+        self._call("evaluate", arg)
+
+    def content(self):
+        for response in getattr(self, "responses", []):
+            self.listeners["response"](response)
+        return "<html>rendered</html>"
+
+
+class SpinnerPage(FakePage):
+    """An SPA whose DOM is quiet (a CSS spinner) while its data request is still in flight;
+    the results only render once network idle is reached."""
+
+    def __init__(self):
+        super().__init__()
+        self.request_pending = True
+
+    def wait_for_load_state(self, state, timeout=None):
+        super().wait_for_load_state(state, timeout)
+        if state == "networkidle":
+            self.request_pending = False
+
+    def content(self):
+        return '<div class="spinner"></div>' if self.request_pending else "<ul><li>Results</li></ul>"
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = SimpleNamespace(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    def abort(self):
+        self.outcome = "abort"
+
+    def continue_(self):
+        self.outcome = "continue"
+
+
+class TestResourceBlocking:
+    def test_blocks_heavy_types_and_trackers(self):
+        assert render.should_block("image", "https://x.com/a.png")
+        assert render.should_block("font", "https://x.com/a.woff2")
+        assert render.should_block("script", "https://www.google-analytics.com/analytics.js")
+        assert not render.should_block("script", "https://x.com/app.js")
+        assert not render.should_block("document", "https://x.com/")
+        assert not render.is_tracker("https://notdoubleclick.net/")
+
+    def test_route_handler_aborts_and_continues(self):
+        page, stats = FakePage(), {}
+        render.block_resources(page, stats)
+        img, doc = FakeRoute("image", "https://x.com/a.jpg"), FakeRoute("document", "https://x.com/")
+        page.handler(img)
+        page.handler(doc)
+        assert (img.outcome, doc.outcome) == ("abort", "continue")
+        assert stats == {"blocked": 1}
+
+
+class TestReadiness:
+    def test_default_waits_for_network_idle_then_dom_quiet(self):
+        page = FakePage()
+        assert render.wait_until_ready(page, "https://x.com/") == "settled"
+        (idle, state), (evaluate, (quiet_ms, cap_ms)) = page.calls
+        assert (idle, state, evaluate, quiet_ms) == ("wait_for_load_state", "networkidle", "evaluate", render.QUIET_MS)
+        assert 0 < cap_ms <= render.SETTLE_CAP_MS
+
+    def test_pending_request_outlasts_quiet_dom(self):
+        page = SpinnerPage()
+        render.wait_until_ready(page, "https://spa.x.com/")
+        assert "Results" in page.content()
+        page = SpinnerPage()
+        render.wait_until_ready(page, "https://spa.x.com/", "mutations")
+        assert "Results" not in page.content()  # DOM-only quiescence reads the spinner
+
+    def test_mutation_strategy(self):
+        page = FakePage()
+        assert render.wait_until_ready(page, "https://x.com/", "mutations") == "mutations"
+        assert page.calls == [("evaluate", [render.QUIET_MS, render.SETTLE_CAP_MS])]
+
+    def test_domain_selector_preferred(self):
+        page = FakePage()
+        used = render.wait_until_ready(page, "https://shop.x.com/p", selectors={"x.com": "#price"})
+        assert used == "selector"
+        assert page.calls == [("wait_for_selector", "#price")]
+
+    def test_explicit_strategies(self):
+        page = FakePage()
+        render.wait_until_ready(page, "https://x.com/", "networkidle")
+        render.wait_until_ready(page, "https://x.com/", "fixed")
+        assert page.calls == [("wait_for_load_state", "networkidle"), ("wait_for_timeout", render.FIXED_WAIT_MS)]
+
+    def test_timeout_is_not_an_error(self):
+        page = FakePage(fail="wait_for_selector")
+        assert render.wait_until_ready(page, "https://x.com/", selectors={"x.com": "#never"}) == "selector"
+
+    def test_load_ready_selectors(self, tmp_path):
+        path = tmp_path / "ready.json"
+        path.write_text(json.dumps({"Example.com": ".results"}))
+        assert render.load_ready_selectors(str(path)) == {"example.com": ".results"}
+        assert render.load_ready_selectors(str(tmp_path / "missing.json")) == {}
+        path.write_text("not json")
+        assert render.load_ready_selectors(str(path)) == {}
+
+
+class FakeResponse:
+    def __init__(self, url, content_type, body=b""):
+        self.url = url
+        self.headers = {"content-type": content_type}
+        self._body = body
+
+    def body(self):
+        return self._body
+
+
+class TestNetworkHarvest:
+    def test_json_links_resolved_and_filtered(self):
+        payload = {"items": [{"file": "/files/report.pdf", "title": "Annual report"},
+                             {"file": "https://cdn.x.com/data.xlsx"}, {"page": "/about"}],
+                   "next": None, "count": 2}
+        links = render.document_links_in_json(payload, "https://x.com/api/list", scrape.is_download_link)
+        assert links == ["https://x.com/files/report.pdf", "https://cdn.x.com/data.xlsx"]
+
+    def test_recorder_collects_document_and_json_responses(self):
+        page = FakePage()
+        recorder = render.NetworkRecorder(page)
+        on_response = page.listeners["response"]
+        on_response(FakeResponse("https://x.com/viewer?id=7", "application/pdf"))
+        on_response(FakeResponse("https://x.com/api", "application/json",
+                                 json.dumps({"url": "docs/a.pdf"}).encode()))
+        on_response(FakeResponse("https://x.com/broken", "application/json", b"{not json"))
+        on_response(FakeResponse("https://x.com/app.js", "text/javascript"))
+        assert recorder.documents(scrape.is_download_link) == [
+            "https://x.com/viewer?id=7", "https://x.com/docs/a.pdf"]
+
+    def test_oversized_json_skipped(self, monkeypatch):
+        monkeypatch.setattr(render, "MAX_JSON_BYTES", 10)
+        page = FakePage()
+        recorder = render.NetworkRecorder(page)
+        page.listeners["response"](FakeResponse("https://x.com/api", "application/json",
+                                                json.dumps({"url": "/a.pdf"}).encode()))
+        assert recorder.documents(scrape.is_download_link) == []
+
+
+class TestBrowserFetchProfile:
+    def run_fetch(self, monkeypatch, page):
+        class FakePool:
+            def run(self, job, **options):
+                return job(page)
+
+        page.context = SimpleNamespace(add_cookies=lambda cookies: None)
+        monkeypatch.setattr(scrape, "get_browser_pool", lambda: FakePool())
+        return scrape._browser_fetch("https://x.com/")
+
+    def test_blocks_and_waits_for_readiness(self, monkeypatch):
+        page = FakePage()
+        assert self.run_fetch(monkeypatch, page) == "<html>rendered</html>"
+        assert page.handler is not None
+        assert ("wait_for_timeout", 2000) not in page.calls
+        assert page.calls[-1][0] == "evaluate"
+
+    def test_blocking_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(scrape, "BROWSER_BLOCK_RESOURCES", False)
+        monkeypatch.setattr(scrape, "BROWSER_READY_STRATEGY", "networkidle")
+        page = FakePage()
+        self.run_fetch(monkeypatch, page)
+        assert page.handler is None
+        assert page.calls[-1] == ("wait_for_load_state", "networkidle")
+
+    def test_harvested_documents_cached_and_crawled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(scrape, "fetch_html_result", lambda url, timeout=15: None)
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result", lambda url, proxy=None: None)
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+        page = FakePage()
+        page.responses = [FakeResponse("https://portal.test/api/docs", "application/json",
+                                       json.dumps([{"href": "/d/1.pdf"}]).encode())]
+
+        class FakePool:
+            def run(self, job, **options):
+                return job(page)
+
+        page.context = SimpleNamespace(add_cookies=lambda cookies: None)
+        monkeypatch.setattr(scrape, "get_browser_pool", lambda: FakePool())
+        result = scrape.crawl_website("https://portal.test/", max_depth=0)
+        assert result["pdf_links"] == ["https://portal.test/d/1.pdf"]
+        assert scrape.get_page_documents("https://portal.test/") == ["https://portal.test/d/1.pdf"]
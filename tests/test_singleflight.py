@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+
+import scrape
+from singleflight import SingleFlight
+
+
+def run_threads(n, target):
+    results = [None] * n
+    errors = [None] * n
+
+    def worker(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+class TestSingleFlight:
+    def test_concurrent_threads_share_one_call(self):
+        flights = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.1)
+            return "page"
+
+        results, _ = run_threads(5, lambda: flights.do("k", work))
+        assert results == ["page"] * 5
+        assert len(calls) == 1
+        assert flights.stats == {"leaders": 1, "shared": 4}
+        assert flights.in_flight() == 0
+
+    def test_different_keys_run_separately(self):
+        flights = SingleFlight()
+        assert flights.do("a", lambda: 1) == 1
+        assert flights.do("b", lambda: 2) == 2
+        assert flights.stats["leaders"] == 2
+
+    def test_sequential_calls_run_again(self):
+        flights = SingleFlight()
+        calls = []
+        flights.do("k", lambda: calls.append(1))
+        flights.do("k", lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_exception_shared_with_waiters(self):
+        flights = SingleFlight()
+
+        def boom():
+            time.sleep(0.1)
+            raise ValueError("blocked")
+
+        _, errors = run_threads(3, lambda: flights.do("k", boom))
+        assert all(isinstance(e, ValueError) for e in errors)
+        assert flights.stats["leaders"] == 1
+
+    def test_reentrant_call_does_not_deadlock(self):
+        flights = SingleFlight()
+        assert flights.do("k", lambda: flights.do("k", lambda: "inner")) == "inner"
+
+    def test_async_tasks_and_threads_share_flight(self):
+        flights = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.2)
+            return "page"
+
+        thread_result = []
+        t = threading.Thread(target=lambda: thread_result.append(flights.do("k", work)))
+
+        async def main():
+            t.start()
+            await asyncio.sleep(0.05)
+            return await asyncio.gather(*(flights.do_async("k", work) for _ in range(3)))
+
+        assert asyncio.run(main()) == ["page"] * 3
+        t.join()
+        assert thread_result == ["page"]
+        assert len(calls) == 1
+
+    def test_async_leader_reentrant_in_worker(self):
+        flights = SingleFlight()
+
+        async def main():
+            return await flights.do_async("k", lambda: flights.do("k", lambda: "nested"))
+
+        assert asyncio.run(main()) == "nested"
+
+
+class TestGetPageHtmlSingleFlight:
+    def test_concurrent_callers_trigger_one_browser_fetch(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(scrape, "fetch_html_result", lambda url, **kw: None)
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result", lambda url, **kw: None)
+        renders = []
+
+        def browser(url):
+            renders.append(url)
+            time.sleep(0.2)
+            return "<html>rendered</html>"
+
+        results, errors = run_threads(4, lambda: scrape.get_page_html("http://t.local/p", browser_fetcher=browser))
+        assert errors == [None] * 4
+        assert results == ["<html>rendered</html>"] * 4
+        assert renders == ["http://t.local/p"]
+
+    def test_batch_engine_joins_thread_flight(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        calls = []
+
+        def slow_fetch(url, **kw):
+            calls.append(url)
+            time.sleep(0.2)
+            return "<html>once</html>"
+
+        monkeypatch.setattr(scrape, "fetch_html_result", slow_fetch)
+        t = threading.Thread(target=scrape.get_page_html, args=("http://t.local/shared",))
+        t.start()
+        time.sleep(0.05)
+        pages = scrape.get_page_html_many(["http://t.local/shared"])
+        t.join()
+        assert pages["http://t.local/shared"] == "<html>once</html>"
+        assert calls == ["http://t.local/shared"]
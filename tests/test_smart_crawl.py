@@ -59,7 +59,6 @@ class TestSmartCrawl:
     def _setup(self, monkeypatch):
         monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: self.SITE[url])
         monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url, ua='*': True)
-        monkeypatch.setattr(scrape, "rate_limit", lambda: None)
 
     def test_follows_only_ranked_links(self, monkeypatch):
         self._setup(monkeypatch)
@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+
+import pytest
+
+import scrape
+from storage_state import StorageStateStore, cookie_matches
+
+STATE = {
+    "cookies": [
+        {"name": "session", "value": "abc", "domain": ".shop.test", "path": "/", "expires": -1},
+        {"name": "old", "value": "x", "domain": "shop.test", "path": "/", "expires": 100},
+        {"name": "other", "value": "y", "domain": "elsewhere.test", "path": "/", "expires": -1},
+    ],
+    "origins": [{"origin": "https://shop.test", "localStorage": [{"name": "token", "value": "t"}]}],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return StorageStateStore(str(tmp_path / "state"))
+
+
+class TestStorageStateStore:
+    def test_round_trip_across_instances(self, store):
+        store.save("https://shop.test/cart", STATE)
+        assert StorageStateStore(store.root).load("https://shop.test/other") == STATE
+
+    def test_missing_and_corrupt(self, store, tmp_path):
+        assert store.load("https://none.test/") is None
+        store.save("https://bad.test/", STATE)
+        with open(store.path("bad.test"), "w") as f:
+            f.write("{not json")
+        assert StorageStateStore(store.root).load("https://bad.test/") is None
+
+    def test_cookies_for_host(self, store):
+        store.save("https://shop.test/", STATE)
+        assert store.cookies_for("https://shop.test/a", now=1000) == {"session": "abc"}
+        assert store.cookies_for("https://www.shop.test/a", now=1000) == {"session": "abc"}
+        assert store.cookies_for("https://unknown.test/", now=1000) == {}
+
+    def test_saved_at(self, store, tmp_path):
+        assert store.saved_at("https://shop.test/") is None
+        store.save("https://shop.test/", STATE)
+        saved_at = store.saved_at("https://www.shop.test/")
+        assert saved_at is not None
+        assert StorageStateStore(store.root).saved_at("https://shop.test/") == pytest.approx(saved_at, abs=2)
+
+    def test_cookie_matches(self):
+        assert cookie_matches({"domain": ".a.com"}, "b.a.com")
+        assert cookie_matches({"domain": "a.com"}, "a.com:8443")
+        assert not cookie_matches({"domain": "a.com"}, "evila.com")
+
+
+class FakeContext:
+    def __init__(self, state):
+        self.state = state
+        self.added = []
+
+    def add_cookies(self, cookies):
+        self.added.extend(cookies)
+
+    def storage_state(self):
+        return self.state
+
+
+class FakePage:
+    def __init__(self, state):
+        self.context = FakeContext(state)
+
+    def route(self, pattern, handler):
+        pass
+
+    def on(self, event, handler):
+        pass
+
+    def goto(self, url, **kwargs):
+        pass
+
+    def evaluate(self, script, arg=None):
+        pass
+
+    def content(self):
+        return "<html>rendered</html>"
+
+
+class TestBrowserTierReusesState:
+    def run(self, monkeypatch, page):
+        options = []
+
+        class FakePool:
+            def run(self, job, **opts):
+                options.append(opts)
+                return job(page)
+
+        monkeypatch.setattr(scrape, "get_browser_pool", lambda: FakePool())
+        scrape._browser_fetch("https://shop.test/")
+        return options[0]
+
+    def test_state_saved_then_loaded_into_next_context(self, monkeypatch):
+        first = self.run(monkeypatch, FakePage(STATE))
+        assert "storage_state" not in first
+        second = self.run(monkeypatch, FakePage(STATE))
+        assert second["storage_state"] == STATE
+
+    def test_auth_cookies_seed_only_fresh_contexts(self, monkeypatch):
+        monkeypatch.setattr(scrape, "_auth", {"cookies": {"sid": "1"}, "headers": {}})
+        page = FakePage(STATE)
+        self.run(monkeypatch, page)
+        assert [c["name"] for c in page.context.added] == ["sid"]
+        page = FakePage(STATE)
+        self.run(monkeypatch, page)
+        assert page.context.added == []
+
+    def test_reuse_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(scrape, "BROWSER_REUSE_STATE", False)
+        self.run(monkeypatch, FakePage(STATE))
+        assert scrape._browser_states.load("https://shop.test/") is None
+
+    def test_browser_cookies_shared_with_http_tier(self, monkeypatch):
+        monkeypatch.setattr(scrape, "_auth", {"cookies": {"sid": "1", "session": "stale"}, "headers": {}})
+        self.run(monkeypatch, FakePage(STATE))
+        sent = []
+
+        class FakeResp:
+            status_code = 200
+            headers = {"Content-Type": "text/html"}
+            text = "<html>cheap</html>"
+
+        monkeypatch.setattr(scrape, "get_session", lambda: SimpleNamespace(
+            get=lambda url, **kw: sent.append(kw["cookies"]) or FakeResp()))
+        assert scrape.fetch_html("https://shop.test/next") == "<html>cheap</html>"
+        assert sent == [{"sid": "1", "session": "abc"}]
+
+    def test_newer_cookies_json_overrides_saved_state(self, monkeypatch):
+        self.run(monkeypatch, FakePage(STATE))
+        saved_at = scrape._browser_states.saved_at("https://shop.test/")
+        monkeypatch.setattr(scrape, "_auth", {"cookies": {"session": "renewed"}, "headers": {},
+                                              "updated_at": saved_at + 60})
+        page = FakePage(STATE)
+        options = self.run(monkeypatch, page)
+        assert options["storage_state"] == STATE
+        assert page.context.added == [{"name": "session", "value": "renewed", "url": "https://shop.test/"}]
+        assert scrape._request_cookies("https://shop.test/next") == {"session": "renewed"}
+
+    def test_older_cookies_json_loses_to_saved_state(self, monkeypatch):
+        self.run(monkeypatch, FakePage(STATE))
+        saved_at = scrape._browser_states.saved_at("https://shop.test/")
+        monkeypatch.setattr(scrape, "_auth", {"cookies": {"session": "stale"}, "headers": {},
+                                              "updated_at": saved_at - 60})
+        page = FakePage(STATE)
+        self.run(monkeypatch, page)
+        assert page.context.added == []
+        assert scrape._request_cookies("https://shop.test/next") == {"session": "abc"}
@@ -0,0 +1,109 @@
+import pytest
+
+import scrape
+import tier_affinity
+from tier_affinity import TierAffinity
+
+HOUR = 3600
+
+
+@pytest.fixture
+def affinity(tmp_path):
+    return TierAffinity(str(tmp_path / "a.db"), probe_rate=0)
+
+
+class TestTierAffinity:
+    def test_unknown_host_starts_at_cheapest(self, affinity):
+        assert affinity.start_tier("new.example") == 0
+        assert affinity.last_success("new.example") is None
+
+    def test_skips_tier_that_keeps_failing(self, affinity):
+        affinity.record("cf.example", "requests", False, now=0)
+        affinity.record("cf.example", "requests", False, now=0)
+        affinity.record("cf.example", "impersonate", True, now=0)
+        assert affinity.start_tier("cf.example", now=1) == 1
+        assert affinity.last_success("cf.example") == "impersonate"
+
+    def test_single_failure_is_not_enough(self, affinity):
+        affinity.record("flaky.example", "requests", False, now=0)
+        assert affinity.start_tier("flaky.example", now=1) == 0
+
+    def test_successes_outweigh_failures(self, affinity):
+        for _ in range(3):
+            affinity.record("ok.example", "requests", True, now=0)
+        affinity.record("ok.example", "requests", False, now=0)
+        affinity.record("ok.example", "requests", False, now=0)
+        assert affinity.start_tier("ok.example", now=1) == 0
+
+    def test_browser_tier_never_skipped(self, affinity):
+        for tier in tier_affinity.TIERS:
+            for _ in range(3):
+                affinity.record("dead.example", tier, False, now=0)
+        assert affinity.start_tier("dead.example", now=1) == len(tier_affinity.TIERS) - 1
+
+    def test_failures_decay_so_cheap_tiers_are_retried(self, affinity):
+        for _ in range(2):
+            affinity.record("cf.example", "requests", False, now=0)
+        assert affinity.start_tier("cf.example", now=HOUR) == 1
+        assert affinity.start_tier("cf.example", now=tier_affinity.HALF_LIFE) == 0
+
+    def test_random_probe_restarts_at_cheapest(self, tmp_path):
+        affinity = TierAffinity(str(tmp_path / "a.db"), probe_rate=0.5, rng=lambda: 0.1)
+        for _ in range(2):
+            affinity.record("cf.example", "requests", False, now=0)
+        assert affinity.start_tier("cf.example", now=1) == 0
+
+    def test_persists_across_instances(self, tmp_path):
+        db = str(tmp_path / "a.db")
+        for _ in range(2):
+            affinity = TierAffinity(db)
+            affinity.record("cf.example", "requests", False, now=0)
+            affinity.flush()
+        assert TierAffinity(db, probe_rate=0).start_tier("cf.example", now=1) == 1
+
+    def test_outcomes_are_written_on_a_throttle(self, tmp_path, monkeypatch):
+        writes = []
+        real_connect = TierAffinity._connect
+        monkeypatch.setattr(TierAffinity, "_connect", lambda self: writes.append(1) or real_connect(self))
+        clock = [0.0]
+        affinity = TierAffinity(str(tmp_path / "a.db"), probe_rate=0, save_interval=30, clock=lambda: clock[0])
+        affinity.start_tier("h.example")  # creating the schema and loading the host
+        writes.clear()
+        for _ in range(10):
+            affinity.record("h.example", "requests", True, now=0)
+            affinity.start_tier("h.example", now=0)
+        assert writes == []
+        clock[0] = 30
+        affinity.record("h.example", "requests", False, now=1)
+        assert len(writes) == 1
+        affinity.record("h.example", "impersonate", True, now=2)
+        affinity.flush()
+        affinity.flush()
+        assert len(writes) == 2
+        reloaded = TierAffinity(str(tmp_path / "a.db"))
+        assert reloaded.last_success("h.example") == "impersonate"
+        expected = affinity.stats("h.example", now=2)["requests"]
+        assert reloaded.stats("h.example", now=2)["requests"] == pytest.approx(expected)
+
+
+class TestGetPageHtmlUsesAffinity:
+    def test_blocked_host_starts_at_working_tier(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        calls = []
+        monkeypatch.setattr(scrape, "fetch_html_result",
+                            lambda url, timeout=15: calls.append("requests") or None)
+        monkeypatch.setattr(scrape, "fetch_html_impersonate_result",
+                            lambda url, proxy=None: calls.append("impersonate") or None)
+        browser = lambda u: calls.append("browser") or "<html>b</html>"
+        for i in range(2):
+            scrape.get_page_html(f"http://cf.local/{i}", browser_fetcher=browser)
+        calls.clear()
+        assert scrape.get_page_html("http://cf.local/next", browser_fetcher=browser) == "<html>b</html>"
+        assert calls == ["browser"]
+
+    def test_other_hosts_unaffected(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        for _ in range(2):
+            scrape._tier_affinity.record("cf.local", "requests", False)
+        monkeypatch.setattr(scrape, "fetch_html_result", lambda url, timeout=15: "<html>fast</html>")
+        assert scrape.get_page_html("http://plain.local/") == "<html>fast</html>"
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+import scrape
+from urlcanon import CanonRules, Canonicalizer, canonicalize, load_canon_rules, remove_dot_segments
+
+
+class TestCanonicalize:
+    @pytest.mark.parametrize("variant", [
+        "http://x.com/a?a=2&b=1",
+        "http://x.com/a?b=1&a=2",
+        "HTTP://X.COM:80/a/?b=1&a=2#top",
+        "http://x.com/a/?a=2&b=1&utm_source=news&utm_medium=email",
+        "http://x.com/./a?a=2&b=1&gclid=abc",
+        "http://x.com/a;jsessionid=F00?a=2&b=1&PHPSESSID=xyz",
+    ])
+    def test_variants_collapse(self, variant):
+        assert canonicalize(variant) == "http://x.com/a?a=2&b=1"
+
+    def test_root_and_ports(self):
+        assert canonicalize("https://x.com") == "https://x.com/"
+        assert canonicalize("https://x.com:443/") == "https://x.com/"
+        assert canonicalize("https://x.com:8443/") == "https://x.com:8443/"
+
+    def test_escapes_normalized(self):
+        assert canonicalize("https://x.com/%7euser/a%2fb") == "https://x.com/~user/a%2Fb"
+
+    def test_meaningful_params_and_case_kept(self):
+        assert canonicalize("https://x.com/Docs?id=7&page=2") == "https://x.com/Docs?id=7&page=2"
+
+    def test_non_http_unchanged(self):
+        assert canonicalize("mailto:a@x.com") == "mailto:a@x.com"
+        assert canonicalize("https://[bad") == "https://[bad"
+
+    def test_dot_segments(self):
+        assert remove_dot_segments("/a/b/../c/./d") == "/a/c/d"
+        assert remove_dot_segments("/a/..") == "/"
+        assert remove_dot_segments("/../x") == "/x"
+
+
+class TestRules:
+    def test_domain_rules_apply_to_subdomains(self):
+        canon = Canonicalizer({"shop.test": CanonRules(drop_params=["sort"], strip_www=True)})
+        assert canon.canonical("https://www.shop.test/list?sort=price&p=2") == "https://shop.test/list?p=2"
+        assert canon.canonical("https://other.test/list?sort=price") == "https://other.test/list?sort=price"
+
+    def test_keep_params_whitelist(self):
+        rules = CanonRules(keep_params=["id"])
+        assert canonicalize("https://x.com/v?id=3&ref=home&view=print", rules) == "https://x.com/v?id=3"
+
+    def test_trailing_slash_can_be_kept(self):
+        assert canonicalize("https://x.com/dir/", CanonRules(strip_trailing_slash=False)) == "https://x.com/dir/"
+
+    def test_load_rules(self, tmp_path):
+        path = tmp_path / "canon_rules.json"
+        path.write_text(json.dumps({"Shop.test": {"lowercase_path": True}}))
+        rules = load_canon_rules(str(path))
+        assert rules["shop.test"].lowercase_path
+        assert load_canon_rules(str(tmp_path / "missing.json")) == {}
+        path.write_text("{not json")
+        assert load_canon_rules(str(path)) == {}
+
+    def test_memoized(self):
+        canon = Canonicalizer()
+        canon.canonical("https://x.com/a?b=1")
+        canon.canonical("https://x.com/a?b=1")
+        assert canon.canonical.cache_info().hits == 1
+
+
+class TestScrapeUsesCanonicalUrls:
+    def test_cache_shared_by_variants(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(scrape, "CACHE_DIR", str(tmp_path))
+        scrape._cache_put("https://c.test/page?b=2&a=1", "<html>p</html>")
+        assert scrape._cache_get("https://c.test/page/?a=1&b=2&utm_source=x#frag") == "<html>p</html>"
+
+    def test_crawler_dedupes_variants(self, monkeypatch):
+        site = {
+            "https://c.test/": '<a href="/a?x=1&y=2">A</a><a href="/a/?y=2&x=1&utm_campaign=z">A again</a>',
+            "https://c.test/a?x=1&y=2": "",
+        }
+        fetched = []
+        monkeypatch.setattr(scrape, "get_page_html", lambda url, **kw: fetched.append(url) or site[url])
+        monkeypatch.setattr(scrape, "is_allowed_by_robots", lambda url: True)
+        result = scrape.crawl_website("https://c.test/", max_depth=1)
+        assert fetched == ["https://c.test/", "https://c.test/a?x=1&y=2"]  # fetched as found
+        assert result["pages"] == fetched
+
+    def test_single_flight_key_is_canonical(self, monkeypatch):
+        keys = []
+        monkeypatch.setattr(scrape._page_flights, "do", lambda key, fn: keys.append(key) or "<html></html>")
+        scrape.get_page_html("https://c.test/x/?utm_source=a", use_cache=False)
+        assert keys == ["https://c.test/x"]
+
+    def test_downloads_deduped(self, monkeypatch, tmp_path):
+        calls = []
+        monkeypatch.setattr(scrape, "download_pdf", lambda link, folder: calls.append(link) or link)
+        ok, failed = scrape.download_pdfs_concurrent(
+            ["https://c.test/a.pdf?utm_source=x", "https://c.test/a.pdf", "https://c.test/b.pdf"],
+            str(tmp_path), max_workers=1)
+        assert calls == ["https://c.test/a.pdf?utm_source=x", "https://c.test/b.pdf"]
+        assert failed == []
@@ -1,4 +1,5 @@
 import base64
+from types import SimpleNamespace
 
 import vision
 
@@ -39,7 +40,7 @@ class TestAnalyzeImage:
             captured["json"] = json
             return FakeResp()
 
-        monkeypatch.setattr(vision.requests, "post", fake_post)
+        monkeypatch.setattr(vision, "get_session", lambda: SimpleNamespace(post=fake_post))
         out = vision.analyze_image(b"imgbytes", "What is this?", model="llava")
         assert out == "A blue chart."
         assert captured["url"] == vision.OLLAMA_API_URL
@@ -53,6 +54,6 @@ class TestAnalyzeImage:
             def raise_for_status(self):
                 raise Exception("500 error")
 
-        monkeypatch.setattr(vision.requests, "post", lambda *a, **k: FakeResp())
+        monkeypatch.setattr(vision, "get_session", lambda: SimpleNamespace(post=lambda *a, **k: FakeResp()))
         out = vision.analyze_image(b"x", "q")
         assert "Error" in out
@@ -1,7 +1,23 @@
+import pytest
+
+import scrape
 import watch
 import watch_runner
 
 
+@pytest.fixture(autouse=True)
+def fetched(monkeypatch):
+    """Batch fetches made by run_batch (stubbed: every page is '<p>page</p>')."""
+    calls = []
+
+    def get_page_html_many(urls, use_cache=True, **kwargs):
+        calls.append((list(urls), use_cache))
+        return {url: "<p>page</p>" for url in urls}
+
+    monkeypatch.setattr(scrape, "get_page_html_many", get_page_html_many)
+    return calls
+
+
 class TestWatchedUrls:
     def test_returns_distinct_urls(self, tmp_path):
         db = str(tmp_path / "w.db")
@@ -30,7 +46,7 @@ class TestRunBatch:
             "http://a": {"first_run": False, "changed": True, "added": ["new line"], "removed": [], "previous_at": 1.0},
             "http://b": {"first_run": False, "changed": False, "added": [], "removed": [], "previous_at": 1.0},
         }
-        monkeypatch.setattr(watch_runner, "check_url", lambda url, db_path=None: results[url])
+        monkeypatch.setattr(watch_runner, "check_url", lambda url, db_path=None, fetcher=None: results[url])
 
         summary = watch_runner.run_batch(db_path=db)
         assert summary["checked"] == 2
@@ -44,7 +60,7 @@ class TestRunBatch:
         store.save_snapshot("http://a", "x")
         store.close()
 
-        def boom(url, db_path=None):
+        def boom(url, db_path=None, fetcher=None):
             raise RuntimeError("network down")
 
         monkeypatch.setattr(watch_runner, "check_url", boom)
@@ -60,8 +76,27 @@ class TestRunBatch:
         store.close()
 
         monkeypatch.setattr(watch_runner, "check_url",
-                            lambda url, db_path=None: {"first_run": False, "changed": True,
+                            lambda url, db_path=None, fetcher=None: {"first_run": False, "changed": True,
                                                        "added": ["l"], "removed": [], "previous_at": 1.0})
         seen = []
         watch_runner.run_batch(db_path=db, on_change=lambda url, res: seen.append(url))
         assert seen == ["http://a"]
+
+    def test_fetches_all_pages_in_one_fresh_batch(self, tmp_path, fetched):
+        db = str(tmp_path / "w.db")
+        store = watch.WatchStore(db)
+        store.save_snapshot("http://a", "old")
+        store.save_snapshot("http://b", "page")
+        store.close()
+        summary = watch_runner.run_batch(db_path=db)
+        assert fetched == [(["http://a", "http://b"], False)]
+        assert [c["url"] for c in summary["changes"]] == ["http://a"]
+
+    def test_failed_fetch_counts_as_error(self, tmp_path):
+        db = str(tmp_path / "w.db")
+        store = watch.WatchStore(db)
+        store.save_snapshot("http://a", "x")
+        store.close()
+        summary = watch_runner.run_batch(db_path=db, fetch_many=lambda urls: {"http://a": None})
+        assert summary["errors"] == 1
+        assert watch.WatchStore(db).last_snapshot("http://a")[0] == "x"
@@ -0,0 +1,172 @@
+"""Per-host fetch-tier affinity: remember which tier works for each domain so get_page_html can
+start the cascade there instead of waiting for cheaper tiers to time out first.
+
+Outcomes are kept as exponentially decayed success/failure counts. A tier is skipped while its
+decayed failures dominate; as they fade the tier is tried again, and a small random probe rate
+re-checks cheaper tiers early in case a site's defenses loosen.
+
+Counts live in memory: a host's are read from SQLite the first time it is seen, and changes are
+written back at most every SAVE_INTERVAL seconds per host, plus whatever flush() finds unsaved
+(scrape calls it at exit), so recording an outcome never touches the database per page.
+"""
+import logging
+import random
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = "tier_affinity.db"
+TIERS = ("requests", "impersonate", "browser")
+HALF_LIFE = 24 * 3600   # seconds for an outcome to lose half its weight
+SKIP_THRESHOLD = 1.5    # decayed failures before a tier is skipped
+PROBE_RATE = 0.05       # chance of starting at the cheapest tier anyway
+SAVE_INTERVAL = 30.0    # seconds between writes of one host's outcomes
+
+
+def decay(value, elapsed, half_life=HALF_LIFE):
+    """Exponentially decay a count over `elapsed` seconds."""
+    return value * 0.5 ** (max(elapsed, 0) / half_life)
+
+
+def is_failing(successes, failures):
+    """A tier is skipped while its decayed failures pass the threshold and outweigh successes."""
+    return failures >= SKIP_THRESHOLD and failures > successes
+
+
+class TierAffinity:
+    """Per-host tier outcomes held in memory and persisted to SQLite. Thread-safe; one instance
+    is shared by every fetch."""
+
+    def __init__(self, db_path=DB_PATH, probe_rate=PROBE_RATE, rng=random.random,
+                 save_interval=SAVE_INTERVAL, clock=time.monotonic):
+        self.db_path = db_path
+        self.probe_rate = probe_rate
+        self.save_interval = save_interval
+        self._rng = rng
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._hosts = {}      # host -> {"stats": {tier: [successes, failures, updated_at]}, "last": (tier, at)}
+        self._saved_at = {}   # host -> clock() of its last write
+        self._dirty = set()   # hosts with unsaved outcomes
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tier_stats (host TEXT, tier TEXT, successes REAL, failures REAL, "
+                    "updated_at REAL, PRIMARY KEY (host, tier))"
+                )
+                conn.execute("CREATE TABLE IF NOT EXISTS last_success (host TEXT PRIMARY KEY, tier TEXT, "
+                             "succeeded_at REAL)")
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not create tier affinity tables: {str(e)}")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _load(self, host):
+        """host's stored outcomes, read outside the lock."""
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute("SELECT tier, successes, failures, updated_at FROM tier_stats WHERE host = ?",
+                                    (host,)).fetchall()
+                last = conn.execute("SELECT tier, succeeded_at FROM last_success WHERE host = ?", (host,)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read tier stats: {str(e)}")
+            rows, last = [], None
+        return {"stats": {tier: [s, f, t] for tier, s, f, t in rows}, "last": tuple(last) if last else None}
+
+    def _host(self, host):
+        """host's in-memory entry, loaded from the database (outside the lock) the first time.
+        Callers take the lock to read or update it."""
+        with self._lock:
+            entry = self._hosts.get(host)
+        if entry is None:
+            loaded = self._load(host)
+            with self._lock:
+                entry = self._hosts.setdefault(host, loaded)
+                self._saved_at.setdefault(host, self._clock())
+        return entry
+
+    def record(self, host, tier, ok, now=None):
+        """Record one success or failure of `tier` for `host`."""
+        now = time.time() if now is None else now
+        entry = self._host(host)
+        with self._lock:
+            successes, failures, updated_at = entry["stats"].get(tier, (0.0, 0.0, now))
+            successes, failures = decay(successes, now - updated_at), decay(failures, now - updated_at)
+            if ok:
+                successes += 1
+                entry["last"] = (tier, now)
+            else:
+                failures += 1
+            entry["stats"][tier] = [successes, failures, now]
+            self._dirty.add(host)
+            save = self._clock() - self._saved_at[host] >= self.save_interval
+        if save:
+            self._save([host])
+
+    def stats(self, host, now=None):
+        """Return {tier: (successes, failures)} for host, decayed to now."""
+        now = time.time() if now is None else now
+        entry = self._host(host)
+        with self._lock:
+            return {tier: (decay(s, now - t), decay(f, now - t)) for tier, (s, f, t) in entry["stats"].items()}
+
+    def last_success(self, host):
+        """Return the tier that most recently succeeded for host, or None."""
+        entry = self._host(host)
+        with self._lock:
+            return entry["last"][0] if entry["last"] else None
+
+    def flush(self):
+        """Write every host's unsaved outcomes."""
+        with self._lock:
+            hosts = list(self._dirty)
+        if hosts:
+            self._save(hosts)
+
+    def _save(self, hosts):
+        """Write hosts' outcomes in one transaction."""
+        stats, last = [], []
+        with self._lock:
+            now = self._clock()
+            for host in hosts:
+                if host not in self._dirty:
+                    continue
+                self._dirty.discard(host)
+                self._saved_at[host] = now
+                entry = self._hosts[host]
+                stats.extend((host, tier, s, f, t) for tier, (s, f, t) in entry["stats"].items())
+                if entry["last"]:
+                    last.append((host,) + entry["last"])
+        if not (stats or last):
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.executemany("INSERT OR REPLACE INTO tier_stats VALUES (?, ?, ?, ?, ?)", stats)
+                conn.executemany("INSERT OR REPLACE INTO last_success VALUES (?, ?, ?)", last)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not record tier outcome: {str(e)}")
+
+    def start_tier(self, host, now=None):
+        """Index into TIERS where the cascade should start for host. The last tier is never skipped."""
+        stats = self.stats(host, now)
+        start = 0
+        while start < len(TIERS) - 1 and is_failing(*stats.get(TIERS[start], (0.0, 0.0))):
+            start += 1
+        if start and self._rng() < self.probe_rate:
+            logger.info(f"Probing cheaper fetch tiers again for {host}")
+            return 0
+        return start
@@ -0,0 +1,155 @@
+"""URL canonicalization: one identity per page, however a link happens to spell it.
+
+canonicalize() lowercases the scheme and host, drops default ports and fragments, resolves
+dot segments, normalizes percent-escapes, removes tracking (utm_*, gclid, ...) and session
+parameters (including ;jsessionid= path parameters), sorts the query string and drops a
+trailing slash, so http://X.com:80/a/?b=1&a=2#top and http://x.com/a?a=2&b=1 are one page.
+
+The canonical form is an identity key (seen sets, cache keys, single-flight keys, download
+dedupe); pages are still fetched from the URL as found, so relative links keep resolving
+against the real location. Rules can be tuned per domain in canon_rules.json:
+
+    {"shop.example.com": {"drop_params": ["sort", "view"], "strip_www": true},
+     "wiki.example.org": {"strip_trailing_slash": false, "lowercase_path": true}}
+
+Canonicalizer memoizes results, since crawls look up the same hot URLs over and over.
+"""
+import functools
+import json
+import logging
+import os
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+RULES_PATH = "canon_rules.json"
+MEMO_SIZE = 65536
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+}
+TRACKING_PREFIXES = ("utm_",)
+SESSION_PARAMS = {
+    "jsessionid", "phpsessid", "sessionid", "session_id", "aspsessionid", "cfid", "cftoken",
+}
+
+_SESSION_PATH_PARAM_RE = re.compile(r';(?:jsessionid|phpsessid|sessionid)=[^/?#]*', re.I)
+_ESCAPE_RE = re.compile(r'%([0-9a-fA-F]{2})')
+_UNRESERVED = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+
+
+class CanonRules:
+    """How URLs of one domain are canonicalized."""
+    __slots__ = ("drop_params", "keep_params", "strip_trailing_slash", "lowercase_path", "strip_www",
+                 "sort_query")
+
+    def __init__(self, drop_params=(), keep_params=None, strip_trailing_slash=True, lowercase_path=False,
+                 strip_www=False, sort_query=True):
+        self.drop_params = {p.lower() for p in drop_params}
+        self.keep_params = None if keep_params is None else {p.lower() for p in keep_params}
+        self.strip_trailing_slash = strip_trailing_slash
+        self.lowercase_path = lowercase_path
+        self.strip_www = strip_www
+        self.sort_query = sort_query
+
+    def drops(self, name):
+        """Whether a query parameter is noise for this domain."""
+        name = name.lower()
+        if self.keep_params is not None:
+            return name not in self.keep_params
+        return (name in self.drop_params or name in TRACKING_PARAMS or name in SESSION_PARAMS
+                or name.startswith(TRACKING_PREFIXES))
+
+
+DEFAULT_RULES = CanonRules()
+
+
+def load_canon_rules(path=RULES_PATH):
+    """Load {domain: CanonRules} from a JSON file. Missing or malformed file -> {}."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return {str(domain).lower(): CanonRules(**options) for domain, options in data.items()}
+    except Exception as e:
+        logger.warning(f"Could not load canonicalization rules from {path}: {str(e)}")
+        return {}
+
+
+def _unescape_unreserved(match):
+    char = chr(int(match.group(1), 16))
+    return char if char in _UNRESERVED else '%' + match.group(1).upper()
+
+
+def remove_dot_segments(path):
+    """RFC 3986 section 5.2.4: resolve '.' and '..' path segments."""
+    if '.' not in path:
+        return path
+    output = []
+    for segment in path.split('/'):
+        if segment == '..':
+            if len(output) > 1:
+                output.pop()
+        elif segment != '.':
+            output.append(segment)
+    if path.endswith(('/.', '/..')):
+        output.append('')
+    return '/'.join(output) or '/'
+
+
+def canonicalize(url, rules=DEFAULT_RULES):
+    """Canonical form of an http(s) URL; other URLs are returned unchanged."""
+    try:
+        parts = urlsplit(url.strip())
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            return url
+        host = parts.hostname.rstrip('.')
+        if rules.strip_www and host.startswith('www.'):
+            host = host[4:]
+        if ':' in host:
+            host = f"[{host}]"
+        port = parts.port
+    except ValueError:
+        return url
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    if parts.username is not None:
+        userinfo = parts.netloc.rpartition('@')[0]
+        netloc = f"{userinfo}@{netloc}"
+
+    path = _SESSION_PATH_PARAM_RE.sub('', parts.path)
+    path = remove_dot_segments(_ESCAPE_RE.sub(_unescape_unreserved, path)) or '/'
+    if rules.strip_trailing_slash and len(path) > 1:
+        path = path.rstrip('/') or '/'
+    if rules.lowercase_path:
+        path = path.lower()
+
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not rules.drops(k)]
+    if rules.sort_query:
+        params.sort()
+    return urlunsplit((scheme, netloc, path, urlencode(params), ''))
+
+
+class Canonicalizer:
+    """canonicalize() with per-domain rules (matched on the host or a parent domain) and a
+    memo of the last MEMO_SIZE URLs."""
+
+    def __init__(self, rules=None, memo_size=MEMO_SIZE):
+        self.rules = rules or {}
+        self.canonical = functools.lru_cache(maxsize=memo_size)(self._canonical)
+
+    def rules_for(self, url):
+        host = (urlsplit(url).hostname or "").lower()
+        while host:
+            if host in self.rules:
+                return self.rules[host]
+            host = host.partition(".")[2]
+        return DEFAULT_RULES
+
+    def _canonical(self, url):
+        try:
+            return canonicalize(url, self.rules_for(url))
+        except ValueError:
+            return url
@@ -2,7 +2,7 @@
 import base64
 import logging
 
-import requests
+from http_pool import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +29,7 @@ def analyze_image(image_bytes, prompt, model=None):
     """Send an image + prompt to the vision model. Returns the response text or an error string."""
     payload = build_vision_payload(prompt, image_bytes, model)
     try:
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=300)
+        response = get_session().post(OLLAMA_API_URL, json=payload, timeout=300)
         response.raise_for_status()
     except Exception as e:
         logger.error(f"Vision analysis failed: {str(e)}")
@@ -41,15 +41,13 @@ def analyze_image(image_bytes, prompt, model=None):
 
 
 def screenshot_page(url):
-    """Capture a full-page PNG screenshot via Playwright. Returns raw bytes."""
+    """Capture a full-page PNG screenshot on a pooled headless browser. Returns raw bytes."""
     from scrape import get_random_user_agent
-    from playwright.sync_api import sync_playwright
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        try:
-            page = browser.new_page(user_agent=get_random_user_agent())
-            page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(2000)
-            return page.screenshot(full_page=True)
-        finally:
-            browser.close()
+    from browser_pool import get_browser_pool
+
+    def capture(page):
+        page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        page.wait_for_timeout(2000)
+        return page.screenshot(full_page=True)
+
+    return get_browser_pool().run(capture, user_agent=get_random_user_agent())
@@ -3,14 +3,14 @@ import difflib
 import sqlite3
 import time
 
-from bs4 import BeautifulSoup
+from html_backend import make_soup
 
 DB_PATH = "watch_history.db"
 
 
 def normalize_content(html):
     """Reduce HTML to comparable plain text: no scripts/styles, no blank lines."""
-    soup = BeautifulSoup(html or "", "html.parser")
+    soup = make_soup(html)
     for tag in soup(["script", "style"]):
         tag.extract()
     lines = (line.strip() for line in soup.get_text(separator="\n").splitlines())
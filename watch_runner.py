@@ -21,15 +21,26 @@ def watched_urls(db_path=DB_PATH):
         store.close()
 
 
-def run_batch(db_path=DB_PATH, on_change=None):
+def run_batch(db_path=DB_PATH, on_change=None, fetch_many=None):
     """Re-check every watched URL. Returns a summary dict; calls on_change(url, result)
-    for each changed page."""
+    for each changed page. Pages are fetched fresh and concurrently up front with
+    fetch_many(urls) -> {url: html or None} (default: scrape.get_page_html_many)."""
+    if fetch_many is None:
+        from scrape import get_page_html_many
+        fetch_many = lambda urls: get_page_html_many(urls, use_cache=False)
+
     urls = watched_urls(db_path)
+    pages = fetch_many(urls) if urls else {}
     summary = {"checked": 0, "changed": 0, "errors": 0, "changes": []}
     for url in urls:
         summary["checked"] += 1
+        html = pages.get(url)
+        if html is None:
+            summary["errors"] += 1
+            logger.error(f"Check failed for {url}: page could not be fetched")
+            continue
         try:
-            result = check_url(url, db_path=db_path)
+            result = check_url(url, db_path=db_path, fetcher=lambda u, html=html: html)
         except Exception as e:
             summary["errors"] += 1
             logger.error(f"Check failed for {url}: {str(e)}")